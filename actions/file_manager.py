@@ -38,7 +38,7 @@ def file_manager(parameters: dict, player=None, session_memory=None):
         msg = "Sir, what would you like me to do with files?"
         if player:
             player.write_log(f"THENUX: {msg}")
-        edge_speak(msg, player)
+        edge_speak(msg, player, priority="clarification")
         return msg
     
     try:
@@ -79,7 +79,7 @@ def file_manager(parameters: dict, player=None, session_memory=None):
                 msg = "Sir, what should I name the file?"
                 if player:
                     player.write_log(f"THENUX: {msg}")
-                edge_speak(msg, player)
+                edge_speak(msg, player, priority="clarification")
                 return msg
             
             # Add .txt if no extension
@@ -107,7 +107,7 @@ def file_manager(parameters: dict, player=None, session_memory=None):
                 msg = "Sir, what should I name the folder?"
                 if player:
                     player.write_log(f"THENUX: {msg}")
-                edge_speak(msg, player)
+                edge_speak(msg, player, priority="clarification")
                 return msg
             
             # Create in Documents if no path specified
@@ -123,7 +123,7 @@ def file_manager(parameters: dict, player=None, session_memory=None):
                 msg = "Sir, which file should I delete?"
                 if player:
                     player.write_log(f"THENUX: {msg}")
-                edge_speak(msg, player)
+                edge_speak(msg, player, priority="clarification")
                 return msg
             
             if os.path.exists(path):
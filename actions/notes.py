@@ -65,7 +65,7 @@ def take_note(parameters: dict, player=None, session_memory=None):
         msg = "Sir, what would you like me to note?"
         if player:
             player.write_log(f"THENUX: {msg}")
-        edge_speak(msg, player)
+        edge_speak(msg, player, priority="clarification")
         return msg
     
     # Load existing notes
@@ -181,7 +181,7 @@ def delete_note(parameters: dict, player=None, session_memory=None):
         msg = "Sir, which note should I delete?"
         if player:
             player.write_log(f"THENUX: {msg}")
-        edge_speak(msg, player)
+        edge_speak(msg, player, priority="clarification")
         return msg
     
     try:
@@ -43,7 +43,7 @@ def send_message(parameters: dict, response: str | None = None, player=None, ses
 
             if player:
                 player.write_log("AI :", question_text)
-            edge_speak(question_text, player)
+            edge_speak(question_text, player, priority="clarification")
             return False  
 
     receiver = session_memory.get_parameter("receiver").strip()
@@ -29,7 +29,7 @@ def system_control(parameters: dict, player=None, session_memory=None):
         msg = "Sir, what would you like me to do?"
         if player:
             player.write_log(f"THENUX: {msg}")
-        edge_speak(msg, player)
+        edge_speak(msg, player, priority="clarification")
         return msg
     
     os_type = platform.system()
@@ -97,7 +97,7 @@ def system_control(parameters: dict, player=None, session_memory=None):
                 msg = "Sir, are you sure you want to put the computer to sleep? Say 'confirm sleep' to proceed."
                 if player:
                     player.write_log(f"THENUX: {msg}")
-                edge_speak(msg, player)
+                edge_speak(msg, player, priority="clarification")
                 return msg
             
             if os_type == "Windows":
@@ -115,7 +115,7 @@ def system_control(parameters: dict, player=None, session_memory=None):
                 msg = "Sir, are you sure you want to shutdown? Say 'confirm shutdown' to proceed."
                 if player:
                     player.write_log(f"THENUX: {msg}")
-                edge_speak(msg, player)
+                edge_speak(msg, player, priority="clarification")
                 return msg
             
             if os_type == "Windows":
@@ -133,7 +133,7 @@ def system_control(parameters: dict, player=None, session_memory=None):
                 msg = "Sir, are you sure you want to restart? Say 'confirm restart' to proceed."
                 if player:
                     player.write_log(f"THENUX: {msg}")
-                edge_speak(msg, player)
+                edge_speak(msg, player, priority="clarification")
                 return msg
             
             if os_type == "Windows":
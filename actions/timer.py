@@ -33,7 +33,7 @@ def set_timer(parameters: dict, player=None, session_memory=None):
         msg = "Sir, how long should I set the timer for?"
         if player:
             player.write_log(f"THENUX: {msg}")
-        edge_speak(msg, player)
+        edge_speak(msg, player, priority="clarification")
         return msg
     
     try:
@@ -75,7 +75,7 @@ def set_timer(parameters: dict, player=None, session_memory=None):
             alert_msg = f"Sir, {message}. Time's up!"
             if player:
                 player.write_log(f"⏰ THENUX: {alert_msg}")
-            edge_speak(alert_msg, player)
+            edge_speak(alert_msg, player, priority="alert")
             
             # Remove from active timers
             if timer_info in active_timers:
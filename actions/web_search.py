@@ -1,8 +1,9 @@
 import re
-from serpapi import GoogleSearch
+import http_client
 from tts import edge_speak
 from memory.config_manager import get_serpapi_key
 
+SERPAPI_URL = "https://serpapi.com/search.json"
 MAX_NEWS_ITEMS = 3
 
 
@@ -12,7 +13,7 @@ def clean(text: str) -> str:
     text = re.sub(r"\s+", " ", text)
     text = re.sub(r"\(.*?\)|\[.*?\]", "", text)
     text = text.strip()
-    text = re.sub(r"\.{2,}", ".")
+    text = re.sub(r"\.{2,}", ".", text)
     text = re.sub(r"\s*—\s*", " - ", text)
     return text
 
@@ -85,6 +86,13 @@ def format_news_output(news_items: list) -> str:
         return result
 
 
+def serpapi_request(params: dict) -> dict:
+    """Run a SerpAPI query over the shared keep-alive session."""
+    response = http_client.get(SERPAPI_URL, params=params, timeout=15)
+    response.raise_for_status()
+    return response.json()
+
+
 def serpapi_search(query: str) -> str:
     api_key = get_serpapi_key()
     if not api_key:
@@ -110,14 +118,12 @@ def serpapi_search(query: str) -> str:
     }
 
     try:
-        search = GoogleSearch(params)
-        data = search.get_dict()
+        data = serpapi_request(params)
         results = data.get("news_results", [])
     except Exception:
         params["engine"] = "google"
         try:
-            search = GoogleSearch(params)
-            data = search.get_dict()
+            data = serpapi_request(params)
             results = data.get("organic_results", [])
         except Exception:
             return "Sir, I couldn't connect to the search service."
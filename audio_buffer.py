@@ -0,0 +1,93 @@
+"""
+Bounded ring buffer for microphone capture (and the TTS jitter buffer).
+
+The sounddevice callback copies each block straight into a preallocated
+int16 array (no per-block allocation, no unbounded queue). The reader gets
+views into that array. When the reader falls behind by more than the
+capacity, the oldest audio is dropped and counted instead of memory
+growing; flushing is O(1).
+"""
+import threading
+
+import numpy as np
+
+
+def to_int16(samples: np.ndarray) -> np.ndarray:
+    """int16 samples as they are; float samples in [-1, 1] scaled and clipped."""
+    if samples.dtype == np.int16:
+        return samples
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+class RingBuffer:
+    """
+    Single-producer / single-consumer ring of samples. Views returned by
+    read() stay valid until the writer wraps around onto them, so they
+    should be consumed (or copied) before the next read.
+    """
+
+    def __init__(self, capacity: int, dtype=np.int16):
+        self.buffer = np.zeros(capacity, dtype=dtype)
+        self.capacity = capacity
+        self._written = 0            # total samples ever written
+        self._read = 0               # total samples ever read (or dropped)
+        self._cond = threading.Condition()
+
+        self.overflows = 0           # writes that had to drop old audio
+        self.dropped = 0             # samples dropped by overflows
+
+    def write(self, data):
+        """Copy a block (any buffer of samples, e.g. the callback's indata) in."""
+        samples = np.frombuffer(data, dtype=self.buffer.dtype)
+        skipped = max(len(samples) - self.capacity, 0)
+        if skipped:
+            samples = samples[skipped:]
+        n = len(samples)
+
+        with self._cond:
+            self.dropped += skipped
+            start = self._written % self.capacity
+            first = min(n, self.capacity - start)
+            self.buffer[start:start + first] = samples[:first]
+            if first < n:
+                self.buffer[:n - first] = samples[first:]
+            self._written += n
+
+            behind = self._written - self._read - self.capacity
+            if behind > 0:
+                self._read += behind
+                self.overflows += 1
+                self.dropped += behind
+
+            self._cond.notify()
+
+    def read(self, count: int, timeout: float | None = None) -> np.ndarray | None:
+        """
+        Wait until `count` samples are available and return a view of them
+        (fewer when the block wraps around the end). None on timeout.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._written - self._read >= count, timeout):
+                return None
+            start = self._read % self.capacity
+            n = min(count, self.capacity - start)
+            self._read += n
+            return self.buffer[start:start + n]
+
+    def clear(self):
+        """Drop everything buffered (O(1))."""
+        with self._cond:
+            self._read = self._written
+
+    def available(self) -> int:
+        with self._cond:
+            return self._written - self._read
+
+    def get_stats(self) -> dict:
+        with self._cond:
+            return {
+                "capacity": self.capacity,
+                "buffered": self._written - self._read,
+                "overflows": self.overflows,
+                "dropped_samples": self.dropped,
+            }
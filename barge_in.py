@@ -0,0 +1,125 @@
+"""
+Barge-in: catch interrupt keywords ("stop", "mute", ...) while the
+assistant is speaking.
+
+During playback the microphone feeds a small grammar recognizer that only
+knows the interrupt words. The speakers leak into the mic, so a keyword
+only counts when the mic is clearly louder than the echo expected from the
+current TTS output level; the speaker-to-mic gain is learned while nothing
+but the assistant's own voice is heard.
+"""
+import json
+import time
+
+import numpy as np
+
+from metrics import LatencyHistogram
+
+BARGE_IN_ENABLED = True
+BARGE_IN_BLOCK_MS = 100          # capture block size while barge-in is on
+BARGE_IN_LATENCY_TARGET = 0.3    # seconds from keyword audio to stop_speaking()
+
+ECHO_MARGIN = 2.0                # mic must be this many times the expected echo
+ECHO_ADAPT = 0.05                # how fast the echo gain follows the room
+ECHO_DECAY = 0.7                 # per-block decay of the output reference (room reverb)
+INITIAL_ECHO_GAIN = 0.5
+MIN_INTERRUPT_RMS = 300          # int16 RMS; quieter speech never interrupts
+LOUD_HOLD = 0.6                  # seconds a loud block keeps a later keyword valid
+
+
+class BargeInDetector:
+    """
+    Feed it the mic audio captured while TTS plays; process() returns the
+    interrupt word once one is heard above the echo.
+
+    `output_level` is a callable returning the current TTS output RMS in
+    int16 units (0 when nothing plays).
+    """
+
+    def __init__(self, recognizer, words, samplerate: int, output_level=None):
+        self.rec = recognizer
+        self.words = set(words)
+        self.samplerate = samplerate
+        self.output_level = output_level
+        self.echo_gain = INITIAL_ECHO_GAIN
+        self._reference = 0.0
+        self._last_loud = None
+
+        self.latency = LatencyHistogram()
+        self.stats = {
+            "interrupts": 0,
+            "suppressed": 0,       # keywords heard at echo level (self-triggering)
+            "missed_target": 0,
+            "audio_seconds": 0.0,
+            "cpu_time": 0.0,
+        }
+
+    def reset(self):
+        """Start of a new reply: forget half-heard words and stale levels."""
+        self.rec.Reset()
+        self._reference = 0.0
+        self._last_loud = None
+
+    def _is_loud(self, rms: float) -> bool:
+        """Louder than the echo of what the speakers are playing?"""
+        level = self.output_level() if self.output_level else 0.0
+        self._reference = max(level, self._reference * ECHO_DECAY)
+        threshold = max(ECHO_MARGIN * self.echo_gain * self._reference, MIN_INTERRUPT_RMS)
+        return rms > threshold
+
+    def _learn_echo(self, rms: float):
+        if self._reference > MIN_INTERRUPT_RMS:
+            gain = rms / self._reference
+            self.echo_gain += ECHO_ADAPT * (gain - self.echo_gain)
+
+    def process(self, data) -> str | None:
+        """One block of int16 audio; returns the interrupt word, or None."""
+        start = time.thread_time()
+        samples = np.frombuffer(data, dtype=np.int16)
+        self.stats["audio_seconds"] += len(samples) / self.samplerate
+        rms = float(np.sqrt(np.mean(samples.astype(np.float32) ** 2))) if len(samples) else 0.0
+        now = self.stats["audio_seconds"]
+
+        if self._is_loud(rms):
+            self._last_loud = now
+
+        if self.rec.AcceptWaveform(bytes(data)):
+            text = json.loads(self.rec.Result()).get("text", "")
+        else:
+            text = json.loads(self.rec.PartialResult()).get("partial", "")
+
+        keyword = next((w for w in text.split() if w in self.words), None)
+        self.stats["cpu_time"] += time.thread_time() - start
+
+        if keyword is None:
+            # Mostly the assistant's own voice: track the echo level
+            self._learn_echo(rms)
+            return None
+
+        if self._last_loud is None or now - self._last_loud > LOUD_HOLD:
+            # The speakers said it, not the user
+            self.stats["suppressed"] += 1
+            self.rec.Reset()
+            return None
+
+        self.rec.Reset()
+        self._last_loud = None
+        self.stats["interrupts"] += 1
+        return keyword
+
+    def record_latency(self, arrived: float):
+        """
+        Call once playback has been told to stop; `arrived` is the
+        perf_counter time the keyword's last block came off the microphone.
+        """
+        latency = time.perf_counter() - arrived
+        self.latency.record(latency)
+        if latency > BARGE_IN_LATENCY_TARGET:
+            self.stats["missed_target"] += 1
+            print(f"⚠️ Barge-in took {latency * 1000:.0f} ms (target {BARGE_IN_LATENCY_TARGET * 1000:.0f} ms)")
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        stats["echo_gain"] = self.echo_gain
+        stats["latency"] = self.latency.summary()
+        return stats
@@ -0,0 +1,141 @@
+"""
+Correctness and speed of llm_json.extract_json against the old
+llm.safe_json_parse (kept below as `legacy_parse` for comparison).
+
+    python benchmarks/bench_json_extract.py
+    python benchmarks/bench_json_extract.py --fuzz 5000 --number 2000
+
+The corpus (json_corpus.jsonl) holds the reply shapes models produce:
+fences, prose around the object, prose with its own braces, truncated
+replies, string-typed numbers and booleans. --fuzz adds random damage
+(mock_services.malform plus random cuts and insertions) and checks that
+the extractor never raises.
+"""
+import argparse
+import json
+import random
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from llm_json import extract_json  # noqa: E402
+from mock_services import malform, scripted_reply  # noqa: E402
+
+CORPUS = Path(__file__).with_name("json_corpus.jsonl")
+
+
+def legacy_parse(text: str) -> dict | None:
+    """The pre-extract_json parser: fences, then outermost braces."""
+    if not text:
+        return None
+    text = text.strip()
+    if "```json" in text:
+        try:
+            start = text.index("```json") + 7
+            end = text.index("```", start)
+            text = text[start:end].strip()
+        except ValueError:
+            pass
+    elif "```" in text:
+        try:
+            start = text.index("```") + 3
+            end = text.index("```", start)
+            text = text[start:end].strip()
+        except ValueError:
+            pass
+    try:
+        start = text.index("{")
+        end = text.rindex("}") + 1
+        return json.loads(text[start:end])
+    except Exception:
+        return None
+
+
+def matches(result: dict | None, expected: dict | None) -> bool:
+    if expected is None:
+        return result is None
+    if not isinstance(result, dict):
+        return False
+    intent = result.get("intent") or "chat"
+    return intent == expected["intent"] and result.get("parameters") == expected["parameters"]
+
+
+def run_corpus(number: int):
+    cases = [json.loads(line) for line in CORPUS.read_text(encoding="utf-8").splitlines() if line.strip()]
+    totals = {"legacy": [0, 0.0], "extract": [0, 0.0]}
+    both_ok = {"legacy": 0.0, "extract": 0.0}   # time on the cases the old parser handles too
+
+    print(f"{'case':<28}{'legacy':>8}{'extract':>9}{'legacy µs':>12}{'extract µs':>12}")
+    for case in cases:
+        raw, expected = case["raw"], case["expected"]
+        row = []
+        for name, func in (("legacy", legacy_parse), ("extract", extract_json)):
+            ok = matches(func(raw), expected)
+            us = timeit.timeit(lambda: func(raw), number=number) / number * 1e6
+            totals[name][0] += ok
+            totals[name][1] += us
+            row.append((ok, us))
+        (lok, lus), (eok, eus) = row
+        if lok and eok:
+            both_ok["legacy"] += lus
+            both_ok["extract"] += eus
+        print(f"{case['name']:<28}{'ok' if lok else 'FAIL':>8}{'ok' if eok else 'FAIL':>9}{lus:>12.1f}{eus:>12.1f}")
+
+    print(f"\n{'correct':<28}{totals['legacy'][0]:>8}{totals['extract'][0]:>9}   of {len(cases)}")
+    print(f"{'total µs':<28}{'':>17}{totals['legacy'][1]:>12.1f}{totals['extract'][1]:>12.1f}")
+    print(f"{'total µs (both ok)':<28}{'':>17}{both_ok['legacy']:>12.1f}{both_ok['extract']:>12.1f}")
+    return totals["extract"][0] == len(cases)
+
+
+def damage(content: str, rng: random.Random) -> str:
+    kind = rng.random()
+    if kind < 0.4:
+        return malform(content, rng)
+    if kind < 0.7:
+        return content[: rng.randint(0, len(content))]
+    pos = rng.randint(0, len(content))
+    return content[:pos] + rng.choice(["{", "}", '"', "\\", "```", "{x}", "\n"]) + content[pos:]
+
+
+def run_fuzz(count: int, seed: int):
+    rng = random.Random(seed)
+    prompts = ["open chrome", "set a timer for 5 minutes", "search for news about mars",
+               "note that the cat is fed", "how are you", "12 times 4", "weather in paris"]
+    recovered = legacy_recovered = errors = 0
+
+    for _ in range(count):
+        reply = scripted_reply(f'User message: "{rng.choice(prompts)}"', rng)
+        raw = damage(json.dumps(reply), rng)
+        try:
+            result = extract_json(raw)
+        except Exception as e:
+            errors += 1
+            print(f"❌ extract_json raised {e!r} on {raw[:120]!r}")
+            continue
+        recovered += result is not None and result["intent"] == reply["intent"]
+        legacy = legacy_parse(raw)
+        legacy_recovered += isinstance(legacy, dict) and legacy.get("intent") == reply["intent"]
+
+    print(f"\nfuzz: {count} damaged replies, intent recovered "
+          f"legacy {legacy_recovered} / extract {recovered}, exceptions {errors}")
+    return errors == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON extraction benchmark")
+    parser.add_argument("--number", type=int, default=1000, help="timing iterations per case")
+    parser.add_argument("--fuzz", type=int, default=2000, help="random damaged replies")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    ok = run_corpus(args.number)
+    ok = run_fuzz(args.fuzz, args.seed) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Offline end-to-end latency benchmark for the assistant pipeline.
+
+Feeds scripted transcripts through main.handle_utterance (the per-turn
+logic of main.ai_loop) with STT, TTS, the UI and desktop-automation
+actions stubbed, against the local OpenRouter / SerpAPI stand-in from
+mock_services.py. Reports p50/p95/p99 per stage:
+
+    prompt    building the prompt (memory block + request payload)
+    llm       waiting on the (mock) model, excluding prompt/parse time
+    parse     JSON extraction (streaming parser or extract_json)
+    dispatch  dispatch_intent() itself
+    action    running the action / speaking the reply
+    total     utterance in -> action finished
+
+Usage:
+    python benchmarks/bench_pipeline.py --repeat 5 --out bench.json
+    python benchmarks/bench_pipeline.py --out new.json --compare bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from metrics import LatencyHistogram  # noqa: E402
+from mock_services import MockConfig, start_server  # noqa: E402
+
+STAGES = ("prompt", "llm", "parse", "dispatch", "action", "total")
+ACTION_TIMEOUT = 10.0
+
+# Actions with desktop side effects are replaced by no-ops
+STUBBED_ACTIONS = ("open_app", "send_message", "weather_action", "system_control", "file_manager")
+TIMED_ACTIONS = (
+    "calculate", "set_timer", "check_timers", "cancel_timers",
+    "take_note", "list_notes", "delete_note", "web_search",
+)
+
+
+# ---------------------------------------------------------------------------
+# Stubs for hardware / GUI modules
+# ---------------------------------------------------------------------------
+
+def _noop(*args, **kwargs):
+    return None
+
+
+class _StubModule(types.ModuleType):
+    """Module whose unknown attributes are no-op functions."""
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _noop
+
+
+class StubUI:
+    def __init__(self, *args, **kwargs):
+        self.root = types.SimpleNamespace(mainloop=_noop, after=_noop)
+        self.log = []
+
+    def write_log(self, text, tag="normal"):
+        self.log.append(text)
+
+    def __getattr__(self, name):
+        return _noop
+
+
+class Turn:
+    """Per-turn stage accumulator shared with the instrumented functions."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.times = {stage: 0.0 for stage in STAGES}
+        self.seen = set()
+        self.dispatched = False
+        self.action_started = 0
+        self.action_done = threading.Event()
+
+    def add(self, stage: str, seconds: float):
+        with self.lock:
+            self.times[stage] += seconds
+            self.seen.add(stage)
+
+
+state = threading.local()
+current = {"turn": Turn()}
+
+
+def install_stubs():
+    speech = _StubModule("speech_to_text")
+    speech.record_voice = lambda *a, **k: ""
+    sys.modules["speech_to_text"] = speech
+
+    tts = _StubModule("tts")
+
+    def edge_speak(text, ui=None, *args, **kwargs):
+        # Spoken chat replies count as the turn's action; speech from
+        # inside an action is part of that action's time.
+        if getattr(state, "in_action", False):
+            return None
+        turn = current["turn"]
+        turn.add("action", 0.0)
+        turn.action_done.set()
+        return None
+
+    tts.edge_speak = edge_speak
+    tts.stop_speaking = _noop
+    sys.modules["tts"] = tts
+
+    ui = _StubModule("ui")
+    ui.ThenuxUI = StubUI
+    sys.modules["ui"] = ui
+
+    sys.modules["pyautogui"] = _StubModule("pyautogui")
+
+
+def _timed(stage: str, func):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            current["turn"].add(stage, time.perf_counter() - start)
+    return wrapper
+
+
+def _action(func):
+    def wrapper(*args, **kwargs):
+        turn = current["turn"]
+        with turn.lock:
+            turn.action_started += 1
+        state.in_action = True
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            print(f"⚠️ action {getattr(func, '__name__', func)} failed: {e}")
+        finally:
+            state.in_action = False
+            turn.add("action", time.perf_counter() - start)
+            turn.action_done.set()
+    return wrapper
+
+
+def instrument(main, llm, llm_json, notes_dir: Path):
+    """Wrap the pipeline functions so every stage is timed."""
+    main.build_memory_for_prompt = _timed("prompt", main.build_memory_for_prompt)
+    llm.build_request = _timed("prompt", llm.build_request)
+    llm.extract_json = _timed("parse", llm.extract_json)
+    llm_json.IncrementalJSONParser.feed = _timed("parse", llm_json.IncrementalJSONParser.feed)
+
+    original_llm = main.get_llm_output_async
+
+    async def timed_llm(*args, **kwargs):
+        turn = current["turn"]
+        before = turn.times["prompt"] + turn.times["parse"]
+        start = time.perf_counter()
+        try:
+            return await original_llm(*args, **kwargs)
+        finally:
+            inner = turn.times["prompt"] + turn.times["parse"] - before
+            turn.add("llm", time.perf_counter() - start - inner)
+
+    main.get_llm_output_async = timed_llm
+
+    original_dispatch = main.dispatch_intent
+
+    def timed_dispatch(*args, **kwargs):
+        current["turn"].dispatched = True
+        return _timed("dispatch", original_dispatch)(*args, **kwargs)
+
+    main.dispatch_intent = timed_dispatch
+
+    for name in STUBBED_ACTIONS:
+        setattr(main, name, _action(_noop))
+    for name in TIMED_ACTIONS:
+        setattr(main, name, _action(getattr(main, name)))
+
+    import actions.notes as notes
+    notes.NOTES_DIR = notes_dir
+    notes.NOTES_FILE = notes_dir / "notes.json"
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+async def run_turns(main, ui, transcripts, repeat: int, histograms: dict):
+    for _ in range(repeat):
+        main.temp_memory.reset()
+        for text in transcripts:
+            turn = Turn()
+            current["turn"] = turn
+
+            start = time.perf_counter()
+            await main.handle_utterance(ui, text)
+
+            if turn.dispatched or "action" in turn.seen or turn.action_started:
+                turn.action_done.wait(ACTION_TIMEOUT)
+                # Let every started action finish (e.g. search after a chat line)
+                deadline = time.perf_counter() + ACTION_TIMEOUT
+                while time.perf_counter() < deadline:
+                    await asyncio.sleep(0.001)
+                    with turn.lock:
+                        if turn.action_started == 0 or turn.action_done.is_set():
+                            break
+
+            turn.add("total", time.perf_counter() - start)
+            for stage in turn.seen:
+                histograms[stage].record(turn.times[stage])
+
+
+def summarize(histograms: dict) -> dict:
+    result = {}
+    for stage in STAGES:
+        h = histograms[stage]
+        if not h.count:
+            continue
+        summary = h.summary()
+        result[stage] = {
+            "count": summary["count"],
+            "mean_ms": summary["mean"] * 1000,
+            "p50_ms": summary["p50"] * 1000,
+            "p95_ms": summary["p95"] * 1000,
+            "p99_ms": summary["p99"] * 1000,
+        }
+    return result
+
+
+def print_report(results: dict, baseline: dict | None = None):
+    print(f"\n{'stage':<10}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}", end="")
+    print(f"{'Δp50':>10}{'Δp95':>10}" if baseline else "")
+    for stage, s in results["stages"].items():
+        line = f"{stage:<10}{s['count']:>6}{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}"
+        if baseline and stage in baseline.get("stages", {}):
+            b = baseline["stages"][stage]
+            line += f"{s['p50_ms'] - b['p50_ms']:>+10.2f}{s['p95_ms'] - b['p95_ms']:>+10.2f}"
+        print(line)
+    if baseline:
+        print(f"\n(compared with {baseline.get('commit', '?')})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline pipeline latency benchmark")
+    parser.add_argument("--transcripts", default=str(Path(__file__).with_name("transcripts.txt")))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.4)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--malformed-rate", type=float, default=0.1)
+    parser.add_argument("--serp-latency", type=float, default=0.3)
+    parser.add_argument("--no-stream", action="store_true", help="use non-streaming completions")
+    parser.add_argument("--no-router", action="store_true", help="send every utterance to the LLM")
+    parser.add_argument("--cache", action="store_true", help="enable the LLM response cache")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    args = parser.parse_args()
+
+    transcripts = [
+        line.strip() for line in Path(args.transcripts).read_text(encoding="utf-8").splitlines()
+        if line.strip() and not line.startswith("#")
+    ]
+
+    config = MockConfig(
+        llm_latency=args.llm_latency,
+        token_delay=args.token_delay,
+        malformed_rate=args.malformed_rate,
+        serp_latency=args.serp_latency,
+    )
+    server = start_server(config)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    install_stubs()
+    os.chdir(ROOT)
+
+    import llm
+    import llm_cache
+    import llm_json
+    import main as app
+    import actions.web_search as web_search
+
+    llm.OPENROUTER_URL = f"{base_url}/api/v1/chat/completions"
+    llm.STREAM_RESPONSES = not args.no_stream
+    llm.get_openrouter_key = lambda: "bench-key"
+    llm_cache.CACHE_ENABLED = args.cache
+    web_search.SERPAPI_URL = f"{base_url}/search.json"
+    web_search.get_serpapi_key = lambda: "bench-key"
+    app.update_memory = _noop
+    if args.no_router:
+        app.route_intent = lambda text: None
+
+    histograms = {stage: LatencyHistogram(window=1_000_000) for stage in STAGES}
+
+    with tempfile.TemporaryDirectory() as notes_dir:
+        instrument(app, llm, llm_json, Path(notes_dir))
+        asyncio.run(run_turns(app, StubUI(), transcripts, args.repeat, histograms))
+
+    server.shutdown()
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        "turns": len(transcripts) * args.repeat,
+        "stages": summarize(histograms),
+    }
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+
+    print_report(results, baseline)
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nResults written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+End-of-speech to finalized-text latency for each STT profile.
+
+    python benchmarks/bench_stt_endpointing.py --model vosk-model-small-en-us-0.15 --corpus wavs/
+
+The corpus is a folder of 16 kHz mono 16-bit WAV files, one utterance
+each. The end of speech is read from an optional sidecar "<name>.json"
+({"speech_end": 1.84}) or estimated from the signal energy.
+
+Every file is streamed through speech_to_text.CaptureService.process_block
+in capture-sized blocks, followed by trailing silence. Blocks "arrive" in
+audio time and recognition cost is added on top, so the reported latency
+is what a live microphone would see: block wait + endpoint silence +
+recognizer time.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import speech_to_text  # noqa: E402
+from stt_config import STT_PROFILES, get_profile, block_size, create_recognizer  # noqa: E402
+
+SAMPLE_RATE = 16000
+TRAILING_SILENCE = 3.0       # seconds appended after each file
+
+
+def read_wav(path: Path) -> np.ndarray:
+    with wave.open(str(path), "rb") as wav:
+        if wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise ValueError(f"{path.name}: expected 16 kHz mono 16-bit PCM")
+        return np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+
+
+def speech_end(path: Path, samples: np.ndarray) -> float:
+    sidecar = path.with_suffix(".json")
+    if sidecar.exists():
+        return float(json.loads(sidecar.read_text(encoding="utf-8"))["speech_end"])
+
+    frame = SAMPLE_RATE // 100
+    frames = samples[: len(samples) // frame * frame].reshape(-1, frame).astype(np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    voiced = np.nonzero(rms > 0.1 * rms.max())[0]
+    return (voiced[-1] + 1) * frame / SAMPLE_RATE if len(voiced) else 0.0
+
+
+def run_file(model, profile: dict, samples: np.ndarray, noise_level: float) -> list[tuple[float, str]]:
+    """[(finish time in audio seconds, text)] for every finalized utterance."""
+    service = speech_to_text.CaptureService(model, SAMPLE_RATE, profile)
+    service.rec = create_recognizer(model, SAMPLE_RATE, profile)
+
+    rng = np.random.default_rng(0)
+    tail = (rng.normal(0, noise_level, int(TRAILING_SILENCE * SAMPLE_RATE))).astype(np.int16)
+    audio = np.concatenate([samples, tail])
+
+    block = block_size(profile, SAMPLE_RATE)
+    finished = 0.0
+    results = []
+    for i in range(0, len(audio) - block + 1, block):
+        arrival = (i + block) / SAMPLE_RATE
+        start = time.perf_counter()
+        text = service.process_block(audio[i:i + block].tobytes())
+        finished = max(arrival, finished) + time.perf_counter() - start
+        if text:
+            results.append((finished, text))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="STT endpointing latency per profile")
+    parser.add_argument("--model", required=True, help="Vosk model folder")
+    parser.add_argument("--corpus", required=True, help="folder of 16 kHz mono WAV files")
+    parser.add_argument("--profiles", nargs="*", default=list(STT_PROFILES))
+    parser.add_argument("--noise", type=float, default=30.0, help="RMS of the trailing silence")
+    parser.add_argument("--out", help="write results JSON here")
+    args = parser.parse_args()
+
+    import vosk
+    vosk.SetLogLevel(-1)
+    model = vosk.Model(args.model)
+
+    files = sorted(Path(args.corpus).glob("*.wav"))
+    if not files:
+        sys.exit(f"No WAV files in {args.corpus}")
+    corpus = [(f, read_wav(f)) for f in files]
+
+    results = {}
+    print(f"{'profile':<14}{'files':>6}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}{'split':>7}{'missed':>8}")
+    for name in args.profiles:
+        profile = get_profile(name)
+        latencies = []
+        split = missed = 0
+        for path, samples in corpus:
+            finals = run_file(model, profile, samples, args.noise)
+            if not finals:
+                missed += 1
+                continue
+            split += len(finals) > 1
+            latencies.append(finals[-1][0] - speech_end(path, samples))
+
+        ms = sorted(x * 1000 for x in latencies)
+        p95 = ms[min(int(len(ms) * 0.95), len(ms) - 1)] if ms else None
+        results[name] = {
+            "profile": profile,
+            "files": len(corpus),
+            "p50_ms": statistics.median(ms) if ms else None,
+            "p95_ms": p95,
+            "max_ms": ms[-1] if ms else None,
+            "split_utterances": split,
+            "missed": missed,
+        }
+        if ms:
+            print(f"{name:<14}{len(corpus):>6}{results[name]['p50_ms']:>9.0f}{p95:>9.0f}{ms[-1]:>9.0f}"
+                  f"{split:>7}{missed:>8}")
+        else:
+            print(f"{name:<14}{len(corpus):>6}{'-':>9}{'-':>9}{'-':>9}{split:>7}{missed:>8}")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\nResults written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+CPU time and time to first audio of the TTS receive paths: raw 16-bit PCM
+played straight from the received bytes (tts_backends.EDGE_PCM_FORMAT)
+against MP3 decoded as it streams in and MP3 decoded after the download.
+
+    python benchmarks/bench_tts_decode.py
+    python benchmarks/bench_tts_decode.py --seconds 20 --bandwidth 1000 --rtt 0.08
+
+Offline: a synthetic voice-like signal is encoded once as 48 kbps MP3
+(what edge-tts sends) and as raw PCM, cut into chunks of --chunk-ms of
+audio and pushed through each path into the player's int16 jitter buffer.
+Chunk arrival is simulated from --rtt and --bandwidth (raw PCM is 8x the
+bytes of MP3, so a slow link can eat the decoding savings); processing
+time is measured.
+
+    cpu ms/s  process CPU per second of audio (median of --runs)
+    first ms  simulated request -> PREROLL_MS of audio in the buffer
+"""
+import argparse
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import tts  # noqa: E402
+from audio_buffer import RingBuffer, to_int16  # noqa: E402
+from tts_backends import Int16Chunker  # noqa: E402
+
+SAMPLE_RATE = tts.OUTPUT_SAMPLE_RATE
+MP3_BITRATE = 48000
+
+
+def voice_like(seconds: float) -> np.ndarray:
+    """Harmonics of a drifting pitch with a syllable-rate envelope."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 120 + 20 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    signal = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) ** 0.5
+    signal = signal * envelope + rng.normal(0, 0.01, len(t))
+    return (0.3 * signal / np.abs(signal).max()).astype(np.float32)
+
+
+def encode_mp3(pcm: np.ndarray) -> bytes:
+    buf = io.BytesIO()
+    container = tts.av.open(buf, "w", format="mp3")
+    stream = container.add_stream("libmp3lame", rate=SAMPLE_RATE, layout="mono")
+    stream.bit_rate = MP3_BITRATE
+    for start in range(0, len(pcm), 1152):
+        frame = tts.av.AudioFrame.from_ndarray(pcm[None, start:start + 1152], format="flt", layout="mono")
+        frame.sample_rate = SAMPLE_RATE
+        for packet in stream.encode(frame):
+            container.mux(packet)
+    for packet in stream.encode(None):
+        container.mux(packet)
+    container.close()
+    return buf.getvalue()
+
+
+def chunked(data: bytes, seconds: float, chunk_ms: int) -> list[bytes]:
+    size = max(int(len(data) / seconds * chunk_ms / 1000), 1)
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def arrivals(chunks: list[bytes], rtt: float, bandwidth_kbps: float) -> list[float]:
+    received, times = 0, []
+    for chunk in chunks:
+        received += len(chunk)
+        times.append(rtt + received * 8 / (bandwidth_kbps * 1000))
+    return times
+
+
+def run_streaming(chunks, times, decode, flush=None) -> tuple[float, float]:
+    """(first audio, cpu seconds) for a path that handles each chunk as it arrives."""
+    ring = RingBuffer(len(chunks) * SAMPLE_RATE, np.int16)
+    preroll = SAMPLE_RATE * tts.PREROLL_MS // 1000
+    clock, first, buffered = 0.0, None, 0
+    cpu = time.process_time()
+    for chunk, arrived in zip(chunks, times):
+        start = time.perf_counter()
+        samples = to_int16(decode(chunk))
+        ring.write(samples)
+        clock = max(clock, arrived) + time.perf_counter() - start
+        buffered += len(samples)
+        if first is None and buffered >= preroll:
+            first = clock
+    if flush is not None:
+        start = time.perf_counter()
+        ring.write(to_int16(flush()))
+        clock += time.perf_counter() - start
+    return first if first is not None else clock, time.process_time() - cpu
+
+
+def run_buffered(chunks, times) -> tuple[float, float]:
+    ring = RingBuffer(len(chunks) * SAMPLE_RATE, np.int16)
+    cpu = time.process_time()
+    start = time.perf_counter()
+    pcm, _ = tts.decode_mp3(b"".join(chunks))
+    ring.write(to_int16(pcm))
+    return times[-1] + time.perf_counter() - start, time.process_time() - cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS receive path: raw PCM vs MP3 decoding")
+    parser.add_argument("--seconds", type=float, default=8.0, help="length of the reply")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--chunk-ms", type=int, default=100, help="audio per received chunk")
+    parser.add_argument("--bandwidth", type=float, default=5000, help="link speed (kbit/s)")
+    parser.add_argument("--rtt", type=float, default=0.05, help="request -> first byte (s)")
+    args = parser.parse_args()
+
+    if tts.av is None:
+        sys.exit("PyAV is not installed (pip install av)")
+
+    pcm = voice_like(args.seconds)
+    mp3 = encode_mp3(pcm)
+    raw = to_int16(pcm).tobytes()
+    mp3_chunks = chunked(mp3, args.seconds, args.chunk_ms)
+    raw_chunks = chunked(raw, args.seconds, args.chunk_ms)
+    mp3_times = arrivals(mp3_chunks, args.rtt, args.bandwidth)
+    raw_times = arrivals(raw_chunks, args.rtt, args.bandwidth)
+
+    def mp3_streaming():
+        decoder = tts.Mp3StreamDecoder()
+        return run_streaming(mp3_chunks, mp3_times, decoder.decode, decoder.flush)
+
+    paths = {
+        "mp3 buffered": lambda: run_buffered(mp3_chunks, mp3_times),
+        "mp3 streaming": mp3_streaming,
+        "raw pcm": lambda: run_streaming(raw_chunks, raw_times, Int16Chunker().feed),
+    }
+
+    print(f"{args.seconds:.0f}s reply: MP3 {len(mp3) / 1024:.0f} KB, raw PCM {len(raw) / 1024:.0f} KB, "
+          f"link {args.bandwidth:.0f} kbit/s, rtt {args.rtt * 1000:.0f} ms\n")
+    print(f"{'path':<15}{'cpu ms/s':>10}{'first ms':>10}")
+    for name, run in paths.items():
+        results = [run() for _ in range(args.runs)]
+        first = statistics.median(r[0] for r in results) * 1000
+        cpu = statistics.median(r[1] for r in results) * 1000 / args.seconds
+        print(f"{name:<15}{cpu:>10.2f}{first:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Time to first audio for TTS: streaming decode (tts.STREAMING_PLAYBACK)
+against the old download-everything-then-decode path.
+
+    python benchmarks/bench_tts_latency.py
+    python benchmarks/bench_tts_latency.py --runs 5 --text "Short answer."
+
+Needs network access to edge-tts and PyAV; no audio device is used.
+"Streaming" is the time until PREROLL_MS of audio is decoded (when the
+player would start); "buffered" is the time until the whole MP3 has been
+downloaded and decoded.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import tts  # noqa: E402
+
+TEXTS = [
+    "Done, sir.",
+    "The weather in London is fourteen degrees and cloudy, with light rain expected this evening.",
+    "Here is a longer answer. The Apollo program ran from 1961 to 1972 and landed twelve astronauts "
+    "on the Moon across six missions. It began under President Kennedy, who set the goal of a crewed "
+    "landing before the end of the decade, and it ended after Apollo 17 in December 1972.",
+]
+
+
+async def streaming(text: str) -> tuple[float, float]:
+    """(time to preroll decoded, audio seconds)."""
+    start = time.perf_counter()
+    decoder = tts.Mp3StreamDecoder()
+    first = None
+    samples = 0
+    async for chunk in tts.synthesize(text):
+        samples += len(decoder.decode(chunk))
+        if first is None and decoder.samplerate and samples >= decoder.samplerate * tts.PREROLL_MS // 1000:
+            first = time.perf_counter() - start
+    samples += len(decoder.flush())
+    if first is None:
+        first = time.perf_counter() - start
+    return first, samples / (decoder.samplerate or tts.OUTPUT_SAMPLE_RATE)
+
+
+async def buffered(text: str) -> tuple[float, float]:
+    start = time.perf_counter()
+    data = b"".join([chunk async for chunk in tts.synthesize(text)])
+    pcm, samplerate = tts.decode_mp3(data)
+    return time.perf_counter() - start, len(pcm) / samplerate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS time to first audio")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--text", action="append", help="text to speak (repeatable)")
+    args = parser.parse_args()
+
+    if tts.av is None:
+        sys.exit("PyAV is not installed (pip install av)")
+
+    print(f"{'audio s':>8}{'buffered ms':>13}{'streaming ms':>14}{'saved':>8}")
+    for text in args.text or TEXTS:
+        old, new = [], []
+        for _ in range(args.runs):
+            seconds, duration = asyncio.run(buffered(text))
+            old.append(seconds)
+            seconds, duration = asyncio.run(streaming(text))
+            new.append(seconds)
+        b, s = statistics.median(old) * 1000, statistics.median(new) * 1000
+        print(f"{duration:>8.1f}{b:>13.0f}{s:>14.0f}{1 - s / b:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Microphone re-enable gap after spoken replies: the old fixed 0.5 s sleep
+against the drain-aware release (tts.MIC_RELEASE_POLICY).
+
+    python benchmarks/bench_turn_gap.py
+    python benchmarks/bench_turn_gap.py --latency 0.12 --echo-tau 0.1 --replies 12
+
+Synthetic replies are replayed through the real tts speech worker and
+player, with sounddevice replaced by a simulated output device (fixed
+output latency, DAC timestamps) and the microphone by a room model: the
+mic hears the played audio through `--echo-gain`, decaying with
+`--echo-tau` after it stops, on top of a constant noise floor. Runs in
+real time.
+
+    gap    last sample leaves the speaker -> microphone re-enabled
+    early  re-enabled while the echo was still above the quiet threshold
+"""
+import argparse
+import math
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import types
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+SAMPLE_RATE = 24000
+MIC_BLOCK = 0.1             # capture block (seconds), as with barge-in on
+NOISE = 100.0               # mic noise floor (int16 RMS)
+QUIET_RATIO = 2.0           # speech_to_text.ECHO_QUIET_RATIO
+
+
+class Room:
+    """Played blocks (dac start, dac end, RMS) -> what the microphone hears."""
+
+    def __init__(self, gain: float, tau: float):
+        self.gain = gain
+        self.tau = tau
+        self.blocks = []
+        self.lock = threading.Lock()
+
+    def play(self, start: float, end: float, rms: float):
+        if rms > 0:
+            with self.lock:
+                self.blocks.append((start, end, rms))
+                del self.blocks[:-64]
+
+    def level(self, t: float) -> float:
+        echo = 0.0
+        with self.lock:
+            for start, end, rms in self.blocks:
+                if start <= t <= end:
+                    echo = max(echo, rms)
+                elif t > end:
+                    echo = max(echo, rms * math.exp(-(t - end) / self.tau))
+        return NOISE + self.gain * echo
+
+    def quiet_after(self, end: float) -> float:
+        """First time after `end` the mic is below the quiet threshold."""
+        t = end
+        while self.level(t) >= QUIET_RATIO * NOISE:
+            t += 0.001
+        return t
+
+    def mic_quiet(self) -> bool:
+        # The capture side only sees whole blocks
+        t = math.floor(time.perf_counter() / MIC_BLOCK) * MIC_BLOCK
+        return self.level(t) < QUIET_RATIO * NOISE
+
+
+def install_stubs(room: Room, latency: float, released: list):
+    sd = types.ModuleType("sounddevice")
+
+    class OutputStream:
+        def __init__(self, samplerate, channels, dtype, blocksize, callback):
+            self.samplerate = samplerate
+            self.dtype = dtype
+            self.blocksize = blocksize
+            self.callback = callback
+            self.latency = latency
+            self.running = False
+
+        def start(self):
+            self.running = True
+            threading.Thread(target=self._run, daemon=True).start()
+
+        def _run(self):
+            period = self.blocksize / self.samplerate
+            next_time = time.perf_counter()
+            while self.running:
+                now = time.perf_counter()
+                info = types.SimpleNamespace(currentTime=now, outputBufferDacTime=now + latency)
+                out = np.zeros((self.blocksize, 1), self.dtype)
+                self.callback(out, self.blocksize, info, None)
+                rms = float(np.sqrt(np.mean(np.square(out, dtype=np.float32))))
+                room.play(now + latency, now + latency + period, rms)
+                next_time += period
+                time.sleep(max(next_time - time.perf_counter(), 0))
+
+        def stop(self):
+            self.running = False
+
+        def close(self):
+            pass
+
+    sd.OutputStream = OutputStream
+    sd.query_devices = lambda kind=None: {"name": "simulated"}
+    sys.modules["sounddevice"] = sd
+    sys.modules.setdefault("edge_tts", types.ModuleType("edge_tts"))
+
+    speech = types.ModuleType("speech_to_text")
+
+    def set_speaking(speaking):
+        if not speaking:
+            released.append(time.perf_counter())
+
+    speech.set_speaking = set_speaking
+    speech.is_mic_quiet = room.mic_quiet
+    sys.modules["speech_to_text"] = speech
+
+
+def tone(seconds: float, rng) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = np.minimum(1.0, np.minimum(t, t[-1] - t) / 0.02)
+    return (0.25 * envelope * np.sin(2 * np.pi * rng.uniform(150, 300) * t)).astype(np.float32)
+
+
+def run(policy: str, args, room: Room, released: list) -> list[tuple[float, float]]:
+    import tts
+
+    tts.MIC_RELEASE_POLICY = policy
+    rng = np.random.default_rng(0)
+    results = []
+    for i in range(args.replies):
+        audio = tone(rng.uniform(0.5, 1.5), rng)
+
+        async def synthesize_pcm(text, queue, streaming, key=None, policy=None, audio=audio):
+            queue.put_nowait((audio, SAMPLE_RATE))
+            queue.put_nowait(None)
+
+        tts._synthesize_pcm = synthesize_pcm
+        released.clear()
+        tts.edge_speak(f"reply {i}", blocking=True)
+        while not released:
+            time.sleep(0.01)
+
+        played_out = tts.get_player().played_out_at
+        safe = room.quiet_after(played_out)
+        results.append((released[0] - played_out, max(safe - released[0], 0.0)))
+        time.sleep(0.3)   # the user's turn
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mic re-enable gap after TTS replies")
+    parser.add_argument("--replies", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.06, help="output device latency (s)")
+    parser.add_argument("--echo-gain", type=float, default=0.3)
+    parser.add_argument("--echo-tau", type=float, default=0.05, help="room echo decay constant (s)")
+    args = parser.parse_args()
+
+    room = Room(args.echo_gain, args.echo_tau)
+    released = []
+    install_stubs(room, args.latency, released)
+
+    import tts
+    import tts_cache
+    tts_cache.TTS_CACHE_ENABLED = False
+    tts._echo_tail = tts.EchoTail(Path(tempfile.mkdtemp()) / "audio_devices.json")
+
+    print(f"{'policy':<8}{'gap p50 ms':>12}{'gap p95 ms':>12}{'early':>7}{'max early ms':>14}")
+    for policy in ("fixed", "drain"):
+        results = run(policy, args, room, released)
+        gaps = sorted(g * 1000 for g, _ in results)
+        early = [e * 1000 for _, e in results if e > 0.001]
+        p95 = gaps[min(int(len(gaps) * 0.95), len(gaps) - 1)]
+        print(f"{policy:<8}{statistics.median(gaps):>12.0f}{p95:>12.0f}{len(early):>7}"
+              f"{max(early, default=0):>14.0f}")
+    print(f"\ncalibrated echo tail: {tts._echo_tail.tail * 1000:.0f} ms "
+          f"over {tts._echo_tail.measurements} replies")
+
+
+if __name__ == "__main__":
+    main()
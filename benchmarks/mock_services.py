@@ -0,0 +1,209 @@
+"""
+Local stand-ins for the OpenRouter chat-completions API and the SerpAPI
+search API, for offline benchmarks.
+
+    python benchmarks/mock_services.py --port 8765 --llm-latency 0.4 --malformed-rate 0.1
+
+Endpoints:
+    POST /api/v1/chat/completions   (OpenRouter, streaming and non-streaming)
+    GET  /search.json               (SerpAPI, engine=google_news / google)
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class MockConfig:
+    def __init__(self, llm_latency=0.4, token_delay=0.01, chunk_chars=8,
+                 malformed_rate=0.0, serp_latency=0.3, seed=1234):
+        self.llm_latency = llm_latency          # seconds before the first byte
+        self.token_delay = token_delay          # seconds between stream chunks
+        self.chunk_chars = chunk_chars          # characters per stream chunk
+        self.malformed_rate = malformed_rate    # fraction of malformed replies
+        self.serp_latency = serp_latency
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def chance(self, rate: float) -> bool:
+        with self.lock:
+            return self.random.random() < rate
+
+
+# user text pattern -> (intent, parameters, text)
+SCRIPT = [
+    (r"open (\w+)", lambda m: ("open_app", {"app_name": m.group(1)}, f"Opening {m.group(1)}, sir.")),
+    (r"weather in (\w+)", lambda m: ("weather_report", {"city": m.group(1), "time": "today"}, None)),
+    (r"(?:search|news) (?:for |about )?(.+)", lambda m: ("search", {"query": m.group(1)}, None)),
+    (r"note (?:that )?(.+)", lambda m: ("take_note", {"content": m.group(1)}, None)),
+    (r"timer for (\d+) (\w+)", lambda m: ("set_timer", {"duration": int(m.group(1)), "unit": m.group(2)}, None)),
+    (r"(\d+) (plus|minus|times) (\d+)", lambda m: ("calculate", {"expression": m.group(0)}, None)),
+    (r"message to (\w+) saying (.+)", lambda m: ("send_message", {
+        "receiver": m.group(1), "message_text": m.group(2), "platform": "WhatsApp"}, None)),
+]
+
+CHAT_REPLIES = [
+    "Of course, sir. I am always here to help.",
+    "That is an excellent question, sir. The short answer is yes, and the longer answer involves a bit more nuance.",
+    "Certainly, sir. Here is a thought: keep it simple, and the rest follows.",
+]
+
+
+def scripted_reply(user_prompt: str, rng: random.Random) -> dict:
+    m = re.search(r'User message: "(.*)"', user_prompt)
+    text = (m.group(1) if m else user_prompt).lower()
+
+    for pattern, build in SCRIPT:
+        match = re.search(pattern, text)
+        if match:
+            intent, parameters, reply = build(match)
+            break
+    else:
+        intent, parameters, reply = "chat", {}, rng.choice(CHAT_REPLIES)
+
+    return {
+        "intent": intent,
+        "parameters": parameters,
+        "needs_clarification": False,
+        "text": reply,
+        "memory_update": {"identity": {}, "preferences": {}, "relationships": {}, "emotional_state": {}},
+    }
+
+
+def malform(content: str, rng: random.Random) -> str:
+    """Damage a reply the way real models do."""
+    kind = rng.choice(["fence", "prose", "truncated", "trailing"])
+    if kind == "fence":
+        return f"Here you go:\n```json\n{content}\n```"
+    if kind == "prose":
+        return f"Sure {{as requested}}! {content} Let me know {{if}} you need more."
+    if kind == "truncated":
+        return content[: max(1, len(content) - rng.randint(1, 15))]
+    return content + "\n\nNote: the braces } above are JSON."
+
+
+def news_results(query: str, count: int = 5) -> list[dict]:
+    return [
+        {
+            "title": f"Headline {i + 1} about {query} as reported by the wire services",
+            "snippet": f"In a development related to {query}, officials said on Monday that "
+                       f"further details would be released later in the week.",
+        }
+        for i in range(count)
+    ]
+
+
+def make_handler(config: MockConfig):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive, like the real services
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send_json(self, status: int, body: dict):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_HEAD(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_POST(self):
+            if not self.path.startswith("/api/v1/chat/completions"):
+                return self._send_json(404, {"error": {"message": "not found"}})
+
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            user_prompt = request.get("messages", [{}])[-1].get("content", "")
+
+            content = json.dumps(scripted_reply(user_prompt, config.random))
+            if config.chance(config.malformed_rate):
+                content = malform(content, config.random)
+
+            time.sleep(config.llm_latency)
+
+            if not request.get("stream"):
+                return self._send_json(200, {
+                    "model": request.get("model"),
+                    "choices": [{"message": {"role": "assistant", "content": content}}],
+                })
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            def send(line: str):
+                data = (line + "\n\n").encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            send(": OPENROUTER PROCESSING")
+            for i in range(0, len(content), config.chunk_chars):
+                piece = content[i:i + config.chunk_chars]
+                send("data: " + json.dumps({"choices": [{"delta": {"content": piece}}]}))
+                time.sleep(config.token_delay)
+            send("data: [DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/search.json":
+                return self._send_json(404, {"error": "not found"})
+
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            time.sleep(config.serp_latency)
+
+            results = news_results(params.get("q", "something"))
+            if params.get("engine") == "google_news":
+                return self._send_json(200, {"news_results": results})
+            return self._send_json(200, {"organic_results": results})
+
+    return Handler
+
+
+def start_server(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start the mock server in a background thread; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenRouter / SerpAPI server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--llm-latency", type=float, default=0.4)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--serp-latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        llm_latency=args.llm_latency,
+        token_delay=args.token_delay,
+        malformed_rate=args.malformed_rate,
+        serp_latency=args.serp_latency,
+    )
+    server = start_server(config, args.host, args.port)
+    print(f"Mock services on http://{args.host}:{server.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
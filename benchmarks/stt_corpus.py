@@ -0,0 +1,185 @@
+"""
+Offline transcription of a folder of WAV files with the same Vosk setup as
+speech_to_text (model lookup, STT profile, VAD and endpointing), fanned out
+over a process pool with the model loaded once per worker.
+
+Benchmark (real-time factor, throughput, WER against references):
+    python benchmarks/stt_corpus.py wavs/ --workers 4
+
+Batch transcription to JSONL:
+    python benchmarks/stt_corpus.py wavs/ --out transcripts.jsonl
+
+References are read from "<name>.txt" next to each WAV, or from a JSONL
+file given with --refs ({"file": "a.wav", "text": "..."} per line).
+Files must be mono 16-bit PCM; any sample rate is accepted.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+# Set per worker process by _init_worker
+_model = None
+_profile = None
+
+
+def _init_worker(model_path: str, profile_name: str | None):
+    global _model, _profile
+    sys.path.insert(0, str(ROOT))
+    import vosk
+    from stt_config import get_profile
+
+    vosk.SetLogLevel(-1)
+    _model = vosk.Model(model_path)
+    _profile = get_profile(profile_name)
+
+
+def transcribe(path: str) -> dict:
+    """Run one file through CaptureService.process_block, like live capture."""
+    import speech_to_text
+    from stt_config import block_size, create_recognizer
+
+    try:
+        with wave.open(path, "rb") as wav:
+            if wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+                raise ValueError("expected mono 16-bit PCM")
+            rate = wav.getframerate()
+            samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+    except Exception as e:
+        return {"file": path, "error": str(e)}
+
+    start = time.perf_counter()
+    cpu = time.process_time()
+
+    service = speech_to_text.CaptureService(_model, rate, _profile)
+    service.rec = create_recognizer(_model, rate, _profile)
+
+    # Trailing silence so the last utterance is endpointed
+    audio = np.concatenate([samples, np.zeros(int(rate * (_profile["end_silence"] + 0.5)), np.int16)])
+    block = block_size(_profile, rate)
+    texts = []
+    for i in range(0, len(audio), block):
+        text = service.process_block(audio[i:i + block])
+        if text:
+            texts.append(text)
+
+    tail = json.loads(service.rec.FinalResult()).get("text", "")
+    if tail:
+        texts.append(tail)
+
+    duration = len(samples) / rate
+    elapsed = time.perf_counter() - start
+    return {
+        "file": path,
+        "text": " ".join(texts),
+        "duration": duration,
+        "seconds": elapsed,
+        "cpu_seconds": time.process_time() - cpu,
+        "rtf": elapsed / duration if duration else 0.0,
+    }
+
+
+def normalize(text: str) -> list[str]:
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def word_errors(reference: str, hypothesis: str) -> tuple[int, int]:
+    """(edit distance in words, reference word count)."""
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (r != h))
+    return row[-1], len(ref)
+
+
+def load_references(files: list[Path], refs_file: str | None) -> dict:
+    refs = {}
+    for f in files:
+        txt = f.with_suffix(".txt")
+        if txt.exists():
+            refs[f.name] = txt.read_text(encoding="utf-8").strip()
+    if refs_file:
+        for line in Path(refs_file).read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                entry = json.loads(line)
+                refs[Path(entry["file"]).name] = entry["text"]
+    return refs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Vosk transcription benchmark / batch tool")
+    parser.add_argument("corpus", help="folder of WAV files (searched recursively)")
+    parser.add_argument("--model", help="Vosk model folder (default: speech_to_text's lookup)")
+    parser.add_argument("--profile", help="STT profile (default: stt_config.STT_PROFILE)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--refs", help="JSONL reference transcripts")
+    parser.add_argument("--out", help="write transcripts as JSONL")
+    args = parser.parse_args()
+
+    model_path = args.model
+    if not model_path:
+        from speech_to_text import find_model_path
+        found = find_model_path()
+        if found is None:
+            sys.exit("Vosk model not found; pass --model")
+        model_path = str(found)
+
+    files = sorted(Path(args.corpus).rglob("*.wav"))
+    if not files:
+        sys.exit(f"No WAV files in {args.corpus}")
+    refs = load_references(files, args.refs)
+
+    print(f"Transcribing {len(files)} files with {args.workers} workers ({model_path})")
+    wall = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(model_path, args.profile)) as pool:
+        futures = [pool.submit(transcribe, str(f)) for f in files]
+        for future in as_completed(futures):
+            result = future.result()
+            name = Path(result["file"]).name
+            if "error" in result:
+                print(f"❌ {name}: {result['error']}")
+            elif name in refs:
+                result["reference"] = refs[name]
+                result["errors"], result["ref_words"] = word_errors(refs[name], result["text"])
+            results.append(result)
+    wall = time.perf_counter() - wall
+
+    done = [r for r in results if "error" not in r]
+    audio = sum(r["duration"] for r in done)
+    busy = sum(r["seconds"] for r in done)
+    scored = [r for r in done if "errors" in r]
+
+    print(f"\nfiles          {len(done)} ok, {len(results) - len(done)} failed")
+    print(f"audio          {audio:.1f}s")
+    print(f"wall time      {wall:.1f}s")
+    if audio:
+        print(f"RTF            {busy / audio:.3f} per worker (lower is faster)")
+        print(f"throughput     {audio / wall:.1f} audio-hours per wall-hour")
+    if scored:
+        ref_words = sum(r["ref_words"] for r in scored)
+        wer = sum(r["errors"] for r in scored) / ref_words if ref_words else 0.0
+        print(f"WER            {wer:.1%} over {len(scored)} files with references")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for r in sorted(results, key=lambda r: r["file"]):
+                f.write(json.dumps(r) + "\n")
+        print(f"\nTranscripts written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
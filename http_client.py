@@ -0,0 +1,191 @@
+"""
+Shared HTTP client - one long-lived, pooled connection manager for every
+network call (OpenRouter, SerpAPI and future network actions).
+
+Reusing the pool keeps TCP/TLS connections alive between turns, so only the
+first request pays for DNS + handshake.
+"""
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+import requests
+from requests.adapters import HTTPAdapter
+
+# Pool / timeout settings
+POOL_CONNECTIONS = 4      # number of hosts kept in the pool
+POOL_MAXSIZE = 8          # keep-alive connections per host
+CONNECT_TIMEOUT = 5       # seconds to establish a connection
+READ_TIMEOUT = 30         # seconds to wait for the response
+MAX_RETRIES = 1           # retries on connection errors only (never on reads)
+
+# Optional HTTP/2 transport (pip install "httpx[http2]")
+USE_HTTP2 = False
+
+_session = None
+_session_lock = threading.Lock()
+
+# Async client (httpx.AsyncClient), one per event loop
+_async_clients = {}
+
+
+def _http2_available() -> bool:
+    try:
+        import httpx  # noqa: F401
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _create_session():
+    if USE_HTTP2 and _http2_available():
+        import httpx
+
+        print("✓ HTTP client: using HTTP/2 transport")
+        return httpx.Client(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=POOL_CONNECTIONS * POOL_MAXSIZE,
+                max_keepalive_connections=POOL_MAXSIZE,
+            ),
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        )
+
+    if USE_HTTP2:
+        print("⚠️ HTTP/2 requested but httpx[http2] is not installed, using HTTP/1.1")
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=MAX_RETRIES,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _create_session()
+    return _session
+
+
+def _timeout(timeout):
+    if timeout is None:
+        return (CONNECT_TIMEOUT, READ_TIMEOUT)
+    if isinstance(timeout, (int, float)):
+        return (min(CONNECT_TIMEOUT, timeout), timeout)
+    return timeout
+
+
+def _request(method: str, url: str, **kwargs):
+    connect, read = _timeout(kwargs.pop("timeout", None))
+    session = get_session()
+    if isinstance(session, requests.Session):
+        kwargs["timeout"] = (connect, read)
+    else:
+        import httpx
+        kwargs["timeout"] = httpx.Timeout(read, connect=connect)
+    return session.request(method, url, **kwargs)
+
+
+def post(url: str, **kwargs):
+    """POST through the pooled session. `timeout` may be a number or (connect, read)."""
+    return _request("POST", url, **kwargs)
+
+
+def get(url: str, **kwargs):
+    """GET through the pooled session. `timeout` may be a number or (connect, read)."""
+    return _request("GET", url, **kwargs)
+
+
+def warm_up(url: str):
+    """
+    Open a connection to `url` in the background so the first real request
+    finds a live socket in the pool. Errors are ignored.
+    """
+    def _warm():
+        try:
+            _request("HEAD", url, timeout=CONNECT_TIMEOUT)
+        except Exception:
+            pass
+
+    threading.Thread(target=_warm, daemon=True).start()
+
+
+def get_async_client():
+    """
+    Return the pooled httpx.AsyncClient for the running event loop.
+    Requests made through it can be cancelled with task.cancel().
+    """
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=USE_HTTP2 and _http2_available(),
+            limits=httpx.Limits(
+                max_connections=POOL_CONNECTIONS * POOL_MAXSIZE,
+                max_keepalive_connections=POOL_MAXSIZE,
+            ),
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def async_post(url: str, **kwargs):
+    """Non-blocking POST through the pooled async client."""
+    import httpx
+
+    connect, read = _timeout(kwargs.pop("timeout", None))
+    client = get_async_client()
+    return await client.post(url, timeout=httpx.Timeout(read, connect=connect), **kwargs)
+
+
+@asynccontextmanager
+async def async_stream(method: str, url: str, **kwargs):
+    """Non-blocking streaming request; yields an httpx.Response (use aiter_lines())."""
+    import httpx
+
+    connect, read = _timeout(kwargs.pop("timeout", None))
+    client = get_async_client()
+    timeout = httpx.Timeout(read, connect=connect)
+    async with client.stream(method, url, timeout=timeout, **kwargs) as response:
+        yield response
+
+
+async def aclose():
+    """Close the async client of the running event loop."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def is_timeout(error: Exception | None) -> bool:
+    """True for a timeout raised by either transport (or an expired deadline)."""
+    if error is None:
+        return False
+    if isinstance(error, (requests.exceptions.Timeout, asyncio.TimeoutError)):
+        return True
+    try:
+        import httpx
+        return isinstance(error, httpx.TimeoutException)
+    except ImportError:
+        return False
+
+
+def close():
+    """Close all pooled connections (called on shutdown)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
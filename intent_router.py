@@ -0,0 +1,287 @@
+"""
+Fast-path intent router - resolves simple, unambiguous commands locally
+before the LLM is called.
+
+Every rule returns the same dict shape as llm.get_llm_output_async, so
+main.ai_loop can use the result unchanged. Anything that doesn't match
+returns None and goes to the LLM as before.
+"""
+import re
+import time
+import threading
+
+# ---------------------------------------------------------------------------
+# Number words (Vosk transcribes "twenty five", not "25")
+# ---------------------------------------------------------------------------
+
+_UNITS = {
+    "zero": 0, "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4,
+    "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+    "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+    "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18,
+    "nineteen": 19,
+}
+_TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+}
+_SCALES = {"hundred": 100, "thousand": 1000, "million": 1000000}
+
+_NUMBER_WORD = "|".join(sorted(list(_UNITS) + list(_TENS) + list(_SCALES), key=len, reverse=True))
+_NUMBER = rf"(?:\d+(?:\.\d+)?|(?:(?:{_NUMBER_WORD})(?:[\s-]+(?:and\s+)?(?:{_NUMBER_WORD}))*))"
+
+
+def words_to_number(text: str) -> float | None:
+    """Convert "25", "twenty five" or "one hundred and five" to a number."""
+    text = text.strip().lower()
+    if not text:
+        return None
+
+    try:
+        return float(text)
+    except ValueError:
+        pass
+
+    total = 0
+    current = 0
+    seen = False
+    for word in re.split(r"[\s-]+", text):
+        if word == "and":
+            continue
+        if word in _UNITS:
+            current += _UNITS[word]
+        elif word in _TENS:
+            current += _TENS[word]
+        elif word == "hundred":
+            current = max(current, 1) * 100
+        elif word in _SCALES:
+            total += max(current, 1) * _SCALES[word]
+            current = 0
+        else:
+            return None
+        seen = True
+
+    return float(total + current) if seen else None
+
+
+def _number_text(value: float) -> str:
+    return str(int(value)) if value.is_integer() else str(value)
+
+
+def _digits(text: str) -> str:
+    """Replace every spelled-out number in `text` with digits."""
+    def _sub(match):
+        value = words_to_number(match.group(0))
+        return _number_text(value) if value is not None else match.group(0)
+
+    return re.sub(rf"\b{_NUMBER}\b", _sub, text)
+
+
+# ---------------------------------------------------------------------------
+# Rules
+# ---------------------------------------------------------------------------
+
+_FILLER = re.compile(
+    r"^(?:(?:hey|ok|okay)\s+)?(?:(?:thenux|jarvis)[\s,]+)?"
+    r"(?:(?:please|can you|could you|would you)\s+)*"
+)
+_TRAILING = re.compile(r"(?:[\s,]+(?:please|for me|now|sir))+$")
+
+_UNIT_ALIASES = {
+    "second": "seconds", "seconds": "seconds", "sec": "seconds", "secs": "seconds",
+    "minute": "minutes", "minutes": "minutes", "min": "minutes", "mins": "minutes",
+    "hour": "hours", "hours": "hours", "hr": "hours", "hrs": "hours",
+}
+
+_FOLDERS = ("downloads", "documents", "desktop", "pictures", "music", "videos")
+
+_SET_TIMER = re.compile(
+    rf"^(?:set|start|create)\s+(?:an?\s+|the\s+)?(?:timer|alarm|countdown)\s+(?:for\s+)?"
+    rf"(?P<n>{_NUMBER})\s+(?P<unit>seconds?|secs?|minutes?|mins?|hours?|hrs?)"
+    rf"(?:\s+(?:to|for|called|that says)\s+(?P<msg>.+))?$"
+    rf"|^(?:remind me|alert me|wake me up)\s+in\s+(?P<n2>{_NUMBER})\s+"
+    rf"(?P<unit2>seconds?|secs?|minutes?|mins?|hours?|hrs?)(?:\s+to\s+(?P<msg2>.+))?$"
+    rf"|^(?P<n3>{_NUMBER})\s+(?P<unit3>seconds?|minutes?|hours?)\s+timer$"
+)
+_CHECK_TIMERS = re.compile(
+    r"^(?:(?:what|which|any)\s+(?:active\s+)?timers?(?:\s+(?:are|is)\s+(?:active|running|set|left))?"
+    r"|(?:check|show|list)\s+(?:(?:my|the|all|active)\s+)*timers?"
+    r"|how much time (?:is )?left(?: on (?:my|the) timers?)?"
+    r"|(?:do i have|are there)\s+(?:any\s+)?(?:active\s+)?timers?)$"
+)
+_CANCEL_TIMERS = re.compile(
+    r"^(?:cancel|clear|delete|remove|reset)\s+(?:(?:all|my|the|active)\s+)*(?:timers?|alarms?)$"
+)
+_CALCULATE = re.compile(
+    rf"^(?:what(?:'s| is)|calculate|compute|how much is|whats)\s+"
+    rf"(?P<expr>(?:the\s+)?(?:square root of\s+{_NUMBER}"
+    rf"|{_NUMBER}(?:\s*(?:plus|minus|times|multiplied by|divided by|over|to the power of|[-+*/^x])\s*{_NUMBER})+"
+    rf"|{_NUMBER}\s+(?:squared|cubed)"
+    rf"|{_NUMBER}\s+percent of\s+{_NUMBER}))$"
+)
+_LIST_NOTES = re.compile(
+    r"^(?:(?:show|list|read|tell)\s+(?:me\s+)?(?:(?:all|my|the)\s+)*notes"
+    r"|what are my notes|what notes do i have|do i have any notes)"
+    r"(?:\s+(?:about|on|for|with)\s+(?P<search>.+))?$"
+)
+_SYSTEM_CONTROL = [
+    (re.compile(r"^(?:(?:turn|crank)\s+(?:the\s+)?volume\s+up|(?:turn\s+it|volume)\s+up"
+                r"|(?:increase|raise)\s+(?:the\s+)?volume|louder|make it louder)$"), "volume_up"),
+    (re.compile(r"^(?:(?:turn)\s+(?:the\s+)?volume\s+down|(?:turn\s+it|volume)\s+down"
+                r"|(?:decrease|lower|reduce)\s+(?:the\s+)?volume|quieter|make it quieter)$"), "volume_down"),
+    (re.compile(r"^(?:lock\s+(?:the\s+|my\s+)?(?:computer|screen|pc|laptop)|lock it|lock screen)$"), "lock"),
+    (re.compile(r"^(?:(?P<confirm>confirm)\s+)?(?:put\s+(?:the\s+)?(?:computer|pc|laptop)\s+to\s+sleep|sleep)$"), "sleep"),
+    (re.compile(r"^(?:(?P<confirm>confirm)\s+)?(?:shut\s*down|power off)(?:\s+(?:the\s+)?(?:computer|pc|laptop))?$"), "shutdown"),
+    (re.compile(r"^(?:(?P<confirm>confirm)\s+)?(?:restart|reboot)(?:\s+(?:the\s+)?(?:computer|pc|laptop))?$"), "restart"),
+]
+_OPEN_FOLDER = re.compile(
+    rf"^(?:open|show|go to)\s+(?:(?:the|my)\s+)?(?P<folder>{'|'.join(_FOLDERS)})(?:\s+(?:folder|directory))?$"
+)
+
+
+def _result(intent: str, parameters: dict) -> dict:
+    return {
+        "intent": intent,
+        "parameters": parameters,
+        "needs_clarification": False,
+        "text": None,
+        "memory_update": None
+    }
+
+
+def _match_set_timer(text: str) -> dict | None:
+    m = _SET_TIMER.match(text)
+    if not m:
+        return None
+    number = m.group("n") or m.group("n2") or m.group("n3")
+    unit = m.group("unit") or m.group("unit2") or m.group("unit3")
+    message = m.group("msg") or m.group("msg2")
+
+    duration = words_to_number(number)
+    if duration is None or not duration.is_integer() or duration <= 0:
+        return None
+
+    parameters = {"duration": int(duration), "unit": _UNIT_ALIASES[unit]}
+    if message:
+        parameters["message"] = message
+    return _result("set_timer", parameters)
+
+
+def _match_calculate(text: str) -> dict | None:
+    m = _CALCULATE.match(text)
+    if not m:
+        return None
+    expression = _digits(m.group("expr"))
+    expression = re.sub(r"^the\s+", "", expression)
+    expression = re.sub(r"(?<=\d)\s*x\s*(?=\d)", " times ", expression)
+    expression = expression.replace("to the power of", "^")
+    m_pct = re.match(r"^(\S+)\s+percent of\s+(\S+)$", expression)
+    if m_pct:
+        expression = f"{m_pct.group(1)} / 100 * {m_pct.group(2)}"
+    return _result("calculate", {"expression": expression})
+
+
+def _match_list_notes(text: str) -> dict | None:
+    m = _LIST_NOTES.match(text)
+    if not m:
+        return None
+    parameters = {"limit": 5}
+    if m.group("search"):
+        parameters["search"] = m.group("search")
+    return _result("list_notes", parameters)
+
+
+def _match_system_control(text: str) -> dict | None:
+    for pattern, action in _SYSTEM_CONTROL:
+        m = pattern.match(text)
+        if m:
+            confirm = "confirm" in pattern.groupindex and bool(m.group("confirm"))
+            return _result("system_control", {"action": action, "confirm": confirm})
+    return None
+
+
+def _match_open_folder(text: str) -> dict | None:
+    m = _OPEN_FOLDER.match(text)
+    if not m:
+        return None
+    return _result("file_manager", {"action": "open_folder", "path": m.group("folder")})
+
+
+# Order matters: the first rule that matches wins.
+RULES = [
+    ("cancel_timers", lambda t: _result("cancel_timers", {}) if _CANCEL_TIMERS.match(t) else None),
+    ("check_timers", lambda t: _result("check_timers", {}) if _CHECK_TIMERS.match(t) else None),
+    ("set_timer", _match_set_timer),
+    ("calculate", _match_calculate),
+    ("list_notes", _match_list_notes),
+    ("system_control", _match_system_control),
+    ("open_folder", _match_open_folder),
+]
+
+# ---------------------------------------------------------------------------
+# Stats
+# ---------------------------------------------------------------------------
+
+_stats_lock = threading.Lock()
+_stats = {
+    "total": 0,
+    "misses": 0,
+    "hits": {name: 0 for name, _ in RULES},
+    "route_time": 0.0,
+}
+
+
+def normalize(text: str) -> str:
+    text = text.lower().strip()
+    text = re.sub(r"[?!.,]+$", "", text)
+    text = re.sub(r"\s+", " ", text)
+    text = _FILLER.sub("", text)
+    text = _TRAILING.sub("", text)
+    return text.strip()
+
+
+def route_intent(user_text: str) -> dict | None:
+    """
+    Return an LLM-shaped result for a simple command, or None to fall
+    through to the LLM.
+    """
+    start = time.perf_counter()
+    text = normalize(user_text or "")
+
+    result = None
+    hit = None
+    if text:
+        for name, rule in RULES:
+            result = rule(text)
+            if result:
+                hit = name
+                break
+
+    with _stats_lock:
+        _stats["total"] += 1
+        _stats["route_time"] += time.perf_counter() - start
+        if hit:
+            _stats["hits"][hit] += 1
+        else:
+            _stats["misses"] += 1
+
+    return result
+
+
+def get_router_stats() -> dict:
+    """Per-intent hit counts and rates, i.e. how many LLM calls were saved."""
+    with _stats_lock:
+        total = _stats["total"]
+        hits = dict(_stats["hits"])
+        saved = sum(hits.values())
+        return {
+            "total": total,
+            "llm_calls_saved": saved,
+            "hit_rate": saved / total if total else 0.0,
+            "per_intent": {
+                name: {"hits": count, "rate": count / total if total else 0.0}
+                for name, count in hits.items()
+            },
+            "misses": _stats["misses"],
+            "avg_route_us": (_stats["route_time"] / total * 1e6) if total else 0.0,
+        }
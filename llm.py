@@ -1,12 +1,39 @@
 import os
 import json
-import requests
+import asyncio
 import sys
+import time
 from pathlib import Path
 
+import http_client
+import llm_cache
+from llm_json import (
+    IncrementalJSONParser, parse_sse_line, SSE_DONE,
+    extract_json, coerce_result, coerce_parameters, is_intent_object,
+)
+from model_pool import ModelPool
+from prompt_compiler import PromptCompiler
+
 OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
 MODEL = "arcee-ai/trinity-large-preview:free"
 
+# Models in order of preference. Slow requests are hedged to the next one,
+# failing ones are skipped for a while (see model_pool.py).
+MODELS = [
+    MODEL,
+    "meta-llama/llama-3.3-70b-instruct:free",
+    "mistralai/mistral-small-3.1-24b-instruct:free",
+]
+
+# At most this many models are asked at the same time for one request
+MAX_PARALLEL_REQUESTS = 2
+
+# Stream completions (SSE) so actions / speech can start before the model finishes
+STREAM_RESPONSES = True
+
+# Seconds before a request is given up
+LLM_TIMEOUT = 30
+
 def get_base_dir():
     if getattr(sys, "frozen", False):
         return Path(sys.executable).parent
@@ -44,77 +71,31 @@ def load_system_prompt() -> str:
 
 SYSTEM_PROMPT = load_system_prompt()
 
-def safe_json_parse(text: str) -> dict | None:
-    if not text:
-        return None
-
-    text = text.strip()
-
-    if "```json" in text:
-        try:
-            start = text.index("```json") + 7
-            end = text.index("```", start)
-            text = text[start:end].strip()
-        except:
-            pass
-    elif "```" in text:
-        try:
-            start = text.index("```") + 3
-            end = text.index("```", start)
-            text = text[start:end].strip()
-        except:
-            pass
+model_pool = ModelPool(MODELS)
+prompt_compiler = PromptCompiler(SYSTEM_PROMPT)
 
-    try:
-        start = text.index("{")
-        end = text.rindex("}") + 1
-        json_str = text[start:end]
-        return json.loads(json_str)
-    except Exception as e:
-        print(f"⚠️ JSON parse error: {e}")
-        print(f"⚠️ Raw text preview: {text[:200]}")
-        return None
-
-def get_llm_output(user_text: str, memory_block: dict | None = None) -> dict:
-
-    if not user_text or not user_text.strip():
-        return {
-            "intent": "chat",
-            "parameters": {},
-            "needs_clarification": False,
-            "text": "Sir, I didn't catch that.",
-            "memory_update": None
-        }
-
-    api_key = get_openrouter_key()
-    if not api_key:
-        print("❌ OPENROUTER API KEY NOT FOUND")
-        return {
-            "intent": "chat",
-            "parameters": {},
-            "needs_clarification": False,
-            "text": "OpenRouter API key is missing, Sir.",
-            "memory_update": None
-        }
-
-    memory_str = ""
-    if memory_block:
-        memory_str = "\n".join(f"{k}: {v}" for k, v in memory_block.items())
+def _chat_result(text: str | None) -> dict:
+    return {
+        "intent": "chat",
+        "parameters": {},
+        "needs_clarification": False,
+        "text": text,
+        "memory_update": None
+    }
 
-    user_prompt = f"""User message: "{user_text}"
 
-Known user memory:
-{memory_str if memory_str else "No memory available"}"""
+def build_request(user_text: str, memory_block: dict | None, api_key: str, stream: bool = False):
+    """Return (headers, payload) for an OpenRouter chat completion."""
+    messages, _ = prompt_compiler.compile(user_text, memory_block)
 
     payload = {
         "model": MODEL,
-        "messages": [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt}
-        ],
+        "messages": messages,
         "temperature": 0.2,
         "max_tokens": 500
     }
+    if stream:
+        payload["stream"] = True
 
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -123,62 +104,244 @@ Known user memory:
         "X-Title": "Jarvis-Assistant"
     }
 
+    return headers, payload
+
+
+def _precheck(user_text: str) -> tuple[str | None, dict | None]:
+    """Return (api_key, None) when a request can be made, else (None, result)."""
+    if not user_text or not user_text.strip():
+        return None, _chat_result("Sir, I didn't catch that.")
+
+    api_key = get_openrouter_key()
+    if not api_key:
+        print("❌ OPENROUTER API KEY NOT FOUND")
+        return None, _chat_result("OpenRouter API key is missing, Sir.")
+
+    return api_key, None
+
+
+def _content_result(content: str) -> tuple[dict, bool]:
+    """(result, valid) for a complete completion; valid means it parsed as JSON."""
+    result = extract_json(content)
+
+    if result:
+        return result, True
+
+    print(f"⚠️ JSON parse error, raw text preview: {(content or '')[:200]}")
+    return _chat_result(content), False
+
+
+def _stream_result(parser: IncrementalJSONParser) -> tuple[dict, bool]:
+    if parser.done and is_intent_object(parser.fields):
+        return coerce_result(parser.fields), True
+
+    # Stream ended without a complete intent object (truncated, or prose
+    # braces came first) - fall back to the full extractor
+    return _content_result(parser.buffer)
+
+
+def _error_result(e: Exception) -> dict:
+    if http_client.is_timeout(e):
+        print("❌ OpenRouter timeout")
+        return _chat_result("Sir, the request timed out.")
+
+    print(f"❌ LLM ERROR: {e}")
+    return _chat_result("Sir, a system error occurred.")
+
+
+def _api_error_result(model: str, status_code: int, body: str) -> dict:
+    print(f"❌ OpenRouter API Error ({model}): {body}")
+    return _chat_result(f"Sir, API error ({status_code}).")
+
+
+def _make_parser(on_field, on_text, claim) -> IncrementalJSONParser:
+    """
+    Parser whose callbacks only fire while `claim()` returns True (used to
+    forward the events of the winning hedged request only).
+    """
+    intent = {}
+
+    def _field(key, value):
+        if key == "intent":
+            intent["value"] = value
+        elif key == "parameters":
+            value = coerce_parameters(intent.get("value"), value)
+        if claim() and on_field:
+            on_field(key, value)
+
+    def _text(_key, delta):
+        if claim() and on_text:
+            on_text(delta)
+
+    return IncrementalJSONParser(on_field=_field, on_text=_text)
+
+
+def _cache_key(user_text: str, memory_block: dict | None) -> str | None:
+    return llm_cache.make_key(user_text, memory_block, ",".join(MODELS), SYSTEM_PROMPT)
+
+
+async def _attempt_async(model, headers, payload, stream, parser, deadline) -> tuple[dict, bool, Exception | None]:
+    """One request to one model: (result, valid, error)."""
+    payload = {**payload, "model": model}
     try:
-        response = requests.post(
-            OPENROUTER_URL,
-            headers=headers,
-            json=payload,
-            timeout=30
+        if not stream:
+            response = await http_client.async_post(
+                OPENROUTER_URL, headers=headers, json=payload, timeout=deadline
+            )
+            if response.status_code != 200:
+                return _api_error_result(model, response.status_code, response.text), False, None
+            content = response.json()["choices"][0]["message"]["content"]
+            return (*_content_result(content), None)
+
+        async with http_client.async_stream(
+            "POST", OPENROUTER_URL, headers=headers, json=payload, timeout=deadline
+        ) as response:
+            if response.status_code != 200:
+                body = (await response.aread()).decode("utf-8", errors="replace")
+                return _api_error_result(model, response.status_code, body), False, None
+
+            async for line in response.aiter_lines():
+                delta = parse_sse_line(line)
+                if delta is SSE_DONE:
+                    break
+                if delta:
+                    parser.feed(delta)
+
+        return (*_stream_result(parser), None)
+
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        return _error_result(e), False, e
+
+
+async def get_llm_output_async(
+    user_text: str,
+    memory_block: dict | None = None,
+    on_field=None,
+    on_text=None,
+    deadline: float | None = None,
+    stream: bool | None = None
+) -> dict:
+    """
+    Ask the LLM for the intent object, without blocking the asyncio loop.
+
+    - Cancellable: task.cancel() aborts the HTTP request immediately
+      (asyncio.CancelledError is not swallowed).
+    - `deadline` is the total time budget in seconds (default LLM_TIMEOUT);
+      when it runs out the usual "request timed out" result is returned.
+    - Streams (and calls on_field / on_text) when `stream` is true, which
+      defaults to STREAM_RESPONSES.
+    - Hedged: if the current model hasn't answered within its adaptive
+      threshold (see model_pool), the next model in MODELS is asked as
+      well. The first valid JSON wins and the other request is cancelled.
+      When streaming, the first request to produce a field wins.
+    """
+    api_key, early = _precheck(user_text)
+    if early:
+        return early
+
+    cache_key = _cache_key(user_text, memory_block)
+    cached = await asyncio.to_thread(llm_cache.lookup, cache_key)
+    if cached:
+        return cached
+
+    if stream is None:
+        stream = STREAM_RESPONSES
+    if deadline is None:
+        deadline = LLM_TIMEOUT
+
+    headers, payload = build_request(user_text, memory_block, api_key, stream=stream)
+
+    queue = model_pool.candidates()
+    pending: dict[asyncio.Task, dict] = {}
+    winner = {"attempt": None}
+
+    def launch(hedged: bool):
+        attempt = {"model": queue.pop(0), "start": time.perf_counter(), "hedged": hedged}
+
+        def claim() -> bool:
+            if winner["attempt"] is None:
+                winner["attempt"] = attempt
+                for task, other in pending.items():
+                    if other is not attempt:
+                        task.cancel()
+            return winner["attempt"] is attempt
+
+        parser = _make_parser(on_field, on_text, claim)
+        task = asyncio.create_task(
+            _attempt_async(attempt["model"], headers, payload, stream, parser, deadline)
         )
+        pending[task] = attempt
+        if hedged:
+            print(f"⏱ Hedging LLM request to {attempt['model']}")
 
-        if response.status_code != 200:
-            print(f"❌ OpenRouter API Error: {response.text}")
-            return {
-                "intent": "chat",
-                "parameters": {},
-                "needs_clarification": False,
-                "text": f"Sir, API error ({response.status_code}).",
-                "memory_update": None
-            }
-
-        data = response.json()
-        content = data["choices"][0]["message"]["content"]
-
-        parsed = safe_json_parse(content)
-
-        if parsed:
-            return {
-                "intent": parsed.get("intent", "chat"),
-                "parameters": parsed.get("parameters", {}),
-                "needs_clarification": parsed.get("needs_clarification", False),
-                "text": parsed.get("text"),
-                "memory_update": parsed.get("memory_update")
-            }
-
-        return {
-            "intent": "chat",
-            "parameters": {},
-            "needs_clarification": False,
-            "text": content,
-            "memory_update": None
-        }
-
-    except requests.exceptions.Timeout:
-        print("❌ OpenRouter timeout")
-        return {
-            "intent": "chat",
-            "parameters": {},
-            "needs_clarification": False,
-            "text": "Sir, the request timed out.",
-            "memory_update": None
-        }
+    async def _hedged() -> dict:
+        fallback = None
+        launch(hedged=False)
+
+        while pending:
+            timeout = None
+            if queue and winner["attempt"] is None and len(pending) < MAX_PARALLEL_REQUESTS:
+                newest = list(pending.values())[-1]
+                waited = time.perf_counter() - newest["start"]
+                timeout = max(model_pool.hedge_delay(newest["model"]) - waited, 0)
+
+            done, _ = await asyncio.wait(
+                pending.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if not done:
+                launch(hedged=True)
+                continue
+
+            for task in done:
+                attempt = pending.pop(task)
+                if task.cancelled():
+                    continue
 
+                result, valid, error = task.result()
+                if valid:
+                    model_pool.record_success(
+                        attempt["model"], time.perf_counter() - attempt["start"], attempt["hedged"]
+                    )
+                    # Written in the background: the reply shouldn't wait on the disk
+                    asyncio.get_running_loop().run_in_executor(
+                        None, llm_cache.store, cache_key, result
+                    )
+                    return result
+
+                model_pool.record_failure(attempt["model"], timeout=http_client.is_timeout(error))
+                fallback = result
+                if winner["attempt"] is attempt:
+                    return result
+
+            # Every request so far failed - fall back to the next model
+            if not pending and queue and winner["attempt"] is None:
+                launch(hedged=False)
+
+        return fallback or _chat_result("Sir, a system error occurred.")
+
+    try:
+        return await asyncio.wait_for(_hedged(), timeout=deadline)
+    except asyncio.TimeoutError as e:
+        for attempt in pending.values():
+            model_pool.record_failure(attempt["model"], timeout=True)
+        return _error_result(e)
+    except asyncio.CancelledError:
+        raise
     except Exception as e:
-        print(f"❌ LLM ERROR: {e}")
-        return {
-            "intent": "chat",
-            "parameters": {},
-            "needs_clarification": False,
-            "text": "Sir, a system error occurred.",
-            "memory_update": None
-        }
\ No newline at end of file
+        return _error_result(e)
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def get_model_stats() -> dict:
+    """Per-model health and latency histograms."""
+    return model_pool.get_stats()
+
+
+def get_prompt_stats() -> dict:
+    """Prompt token counts (see prompt_compiler.py)."""
+    return prompt_compiler.get_stats()
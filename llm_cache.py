@@ -0,0 +1,265 @@
+"""
+LLM response cache - in-process LRU backed by an on-disk SQLite store.
+
+Keyed on the normalized utterance, the memory fields that change the
+answer, the model and the system prompt, so a repeated request skips the
+OpenRouter round trip entirely.
+"""
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from intent_router import normalize
+
+
+def get_base_dir():
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).parent
+    return Path(__file__).resolve().parent
+
+
+BASE_DIR = get_base_dir()
+CACHE_DIR = BASE_DIR / "cache"
+CACHE_DB = CACHE_DIR / "llm_cache.sqlite3"
+
+CACHE_ENABLED = True
+CACHE_TTL = 24 * 3600        # seconds an entry stays valid
+MEMORY_MAX_ENTRIES = 256     # in-process LRU size
+DISK_MAX_ENTRIES = 5000      # on-disk size cap
+
+# Only these intents are stored. Intents whose reply depends on the exact
+# wording or on conversation state (messages, note contents, chat) are
+# left out by default.
+CACHEABLE_INTENTS = {
+    "open_app", "search", "weather_report", "calculate", "set_timer",
+    "check_timers", "cancel_timers", "list_notes", "system_control",
+    "file_manager",
+}
+
+# memory_block fields that never take part in the key (they change every
+# turn and would make every key unique).
+IGNORED_MEMORY_FIELDS = {"recent_conversation"}
+
+# Utterances with these words ("open it", "search for that again") are
+# resolved from the recent conversation, which is not part of the key, so
+# they are never cached.
+CONTEXT_WORDS = {
+    "it", "its", "that", "this", "these", "those", "them", "they", "there",
+    "he", "him", "his", "she", "her", "again", "same", "one", "previous",
+}
+
+
+def _hash(value) -> str:
+    data = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _has_content(value) -> bool:
+    if isinstance(value, dict):
+        return any(_has_content(v) for v in value.values())
+    return value not in (None, "", [], {})
+
+
+class LLMCache:
+
+    def __init__(self, path: Path = CACHE_DB, ttl: float = CACHE_TTL,
+                 memory_max: int = MEMORY_MAX_ENTRIES, disk_max: int = DISK_MAX_ENTRIES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.memory_max = memory_max
+        self.disk_max = disk_max
+
+        self._lru: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        self.stats = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "stores": 0,
+            "evictions": 0,
+            "memory_evictions": 0,
+            "expirations": 0,
+        }
+
+    # ---------------- disk ----------------
+
+    def _conn(self):
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY,"
+                " created REAL NOT NULL,"
+                " accessed REAL NOT NULL,"
+                " result TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache(accessed)")
+            self._db.commit()
+        return self._db
+
+    def _disk_get(self, key: str):
+        row = self._conn().execute(
+            "SELECT created, result FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def _disk_put(self, key: str, created: float, result: dict):
+        db = self._conn()
+        db.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, created, accessed, result) VALUES (?, ?, ?, ?)",
+            (key, created, created, json.dumps(result, ensure_ascii=False))
+        )
+        count = db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        if count > self.disk_max:
+            over = count - self.disk_max
+            db.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY accessed LIMIT ?)", (over,)
+            )
+            self.stats["evictions"] += over
+        db.commit()
+
+    # ---------------- public ----------------
+
+    def get(self, key: str) -> dict | None:
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            source = "memory_hits"
+
+            if entry is None:
+                try:
+                    entry = self._disk_get(key)
+                except Exception as e:
+                    print(f"⚠️ LLM cache read failed: {e}")
+                    entry = None
+                source = "disk_hits"
+
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+
+            created, result = entry
+            if now - created > self.ttl:
+                self._lru.pop(key, None)
+                try:
+                    self._conn().execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn().commit()
+                except Exception:
+                    pass
+                self.stats["expirations"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            self._remember(key, created, result)
+            if source == "disk_hits":
+                try:
+                    self._conn().execute("UPDATE llm_cache SET accessed = ? WHERE key = ?", (now, key))
+                    self._conn().commit()
+                except Exception:
+                    pass
+
+            self.stats["hits"] += 1
+            self.stats[source] += 1
+            return json.loads(json.dumps(result))
+
+    def put(self, key: str, result: dict):
+        created = time.time()
+        result = json.loads(json.dumps(result))
+        with self._lock:
+            self._remember(key, created, result)
+            try:
+                self._disk_put(key, created, result)
+            except Exception as e:
+                print(f"⚠️ LLM cache write failed: {e}")
+            self.stats["stores"] += 1
+
+    def _remember(self, key: str, created: float, result: dict):
+        self._lru[key] = (created, result)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.memory_max:
+            self._lru.popitem(last=False)
+            self.stats["memory_evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+            try:
+                self._conn().execute("DELETE FROM llm_cache")
+                self._conn().commit()
+            except Exception:
+                pass
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            stats["memory_entries"] = len(self._lru)
+            return stats
+
+
+_cache = LLMCache()
+
+
+def make_key(user_text: str, memory_block: dict | None, model: str, system_prompt: str) -> str | None:
+    """
+    Cache key for a request, or None when the request must not be cached
+    (e.g. while a multi-step intent is collecting parameters).
+    """
+    if not CACHE_ENABLED:
+        return None
+
+    memory_block = memory_block or {}
+    if memory_block.get("_pending_intent"):
+        return None
+
+    text = normalize(user_text or "")
+    if not text:
+        return None
+    if CONTEXT_WORDS.intersection(text.split()):
+        return None
+
+    relevant = {k: v for k, v in memory_block.items() if k not in IGNORED_MEMORY_FIELDS}
+    return _hash([text, _hash(relevant), model, _hash(system_prompt)])
+
+
+def lookup(key: str | None) -> dict | None:
+    if key is None:
+        with _cache._lock:
+            _cache.stats["bypassed"] += 1
+        return None
+    return _cache.get(key)
+
+
+def store(key: str | None, result: dict):
+    """Store a parsed LLM result if its intent is cacheable."""
+    if key is None or not isinstance(result, dict):
+        return
+    if result.get("intent") not in CACHEABLE_INTENTS:
+        return
+    if result.get("needs_clarification"):
+        return
+    if _has_content(result.get("memory_update")):
+        return
+    _cache.put(key, result)
+
+
+def get_cache_stats() -> dict:
+    return _cache.get_stats()
+
+
+def clear_cache():
+    _cache.clear()
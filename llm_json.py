@@ -0,0 +1,471 @@
+"""
+JSON helpers for LLM output - extraction of the intent object from a
+complete reply, and incremental parsing of streamed completions.
+"""
+import json
+import math
+import re
+
+from intent_router import words_to_number
+
+# Models sometimes put raw newlines inside strings; accept them.
+_decoder = json.JSONDecoder(strict=False)
+
+
+SSE_DONE = object()
+
+
+def parse_sse_line(line) -> str | object | None:
+    """
+    Return the content delta carried by one OpenAI-compatible SSE line,
+    SSE_DONE for the final "data: [DONE]" line, or None when the line
+    carries no content (comments such as ": OPENROUTER PROCESSING").
+    """
+    if not line:
+        return None
+    if isinstance(line, bytes):
+        line = line.decode("utf-8", errors="replace")
+    if not line.startswith("data:"):
+        return None
+
+    data = line[5:].strip()
+    if data == "[DONE]":
+        return SSE_DONE
+
+    try:
+        event = json.loads(data)
+    except ValueError:
+        return None
+
+    if "error" in event:
+        raise RuntimeError(event["error"].get("message", "stream error"))
+
+    choices = event.get("choices") or []
+    if not choices:
+        return None
+
+    return (choices[0].get("delta") or {}).get("content") or None
+
+
+# ---------------------------------------------------------------------------
+# Extraction of the intent object from a complete reply
+# ---------------------------------------------------------------------------
+
+# Characters that change the scanner's state; everything else is skipped in C
+_STRUCTURE = re.compile(r'[{}"\\]')
+_REPAIR_STRUCTURE = re.compile(r'[{}\[\]",\\]')
+_INTENT_START = re.compile(r'\{\s*"intent"')
+_NUMBER_IN_TEXT = re.compile(r"-?\d+(?:\.\d+)?")
+
+_TRUE_WORDS = {"true", "yes", "y", "1", "confirm", "confirmed"}
+_FALSE_WORDS = {"false", "no", "n", "0", "none", "null", ""}
+
+# Repair attempts for truncated output, cutting back one field at a time
+MAX_REPAIR_CUTS = 4
+
+
+def _to_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        number = value
+    elif isinstance(value, str):
+        try:
+            number = float(value)        # plain "5" / "2.5", the common case
+        except ValueError:
+            number = words_to_number(value)
+            if number is None:
+                match = _NUMBER_IN_TEXT.search(value)
+                if not match:
+                    return None
+                number = float(match.group())
+    else:
+        return None
+
+    # "inf", "nan", 1e400
+    if not math.isfinite(number):
+        return None
+    return int(number) if number == int(number) else number
+
+
+def _to_int(value):
+    number = _to_number(value)
+    if number is None or number != int(number):
+        return None
+    return int(number)
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    if isinstance(value, str):
+        word = value.strip().lower()
+        if word in _TRUE_WORDS:
+            return True
+        if word in _FALSE_WORDS:
+            return False
+    return None
+
+
+def _to_str(value):
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return None
+
+
+# Expected parameter types per intent (see core/prompt.txt). Values that
+# can't be coerced are dropped so the action's own default / clarification
+# applies; parameters not listed here are passed through unchanged.
+PARAMETER_TYPES = {
+    "send_message": {"receiver": _to_str, "message_text": _to_str, "platform": _to_str},
+    "open_app": {"app_name": _to_str},
+    "search": {"query": _to_str},
+    "weather_report": {"city": _to_str, "time": _to_str},
+    "calculate": {"expression": _to_str},
+    "set_timer": {"duration": _to_number, "unit": _to_str, "message": _to_str},
+    "take_note": {"content": _to_str, "title": _to_str},
+    "list_notes": {"search": _to_str, "limit": _to_int},
+    "delete_note": {"note_id": _to_int, "all": _to_bool},
+    "system_control": {"action": _to_str, "confirm": _to_bool},
+    "file_manager": {"action": _to_str, "path": _to_str, "content": _to_str},
+}
+
+
+def coerce_parameters(intent: str | None, parameters) -> dict:
+    """Validate and coerce `parameters` against PARAMETER_TYPES[intent]."""
+    if not isinstance(parameters, dict):
+        return {}
+
+    types = PARAMETER_TYPES.get(intent)
+    if not types:
+        return parameters
+
+    coerced = {}
+    for key, value in parameters.items():
+        convert = types.get(key)
+        if convert is not None and value is not None:
+            value = convert(value)
+            if value is None:
+                continue
+        coerced[key] = value
+    return coerced
+
+
+def coerce_result(parsed: dict) -> dict:
+    """Normalize a parsed reply into the result dict used by main.py."""
+    intent = parsed.get("intent")
+    intent = intent.strip() if isinstance(intent, str) and intent.strip() else "chat"
+
+    text = parsed.get("text")
+    if text is not None and not isinstance(text, str):
+        text = _to_str(text)
+
+    memory_update = parsed.get("memory_update")
+
+    return {
+        "intent": intent,
+        "parameters": coerce_parameters(intent, parsed.get("parameters")),
+        "needs_clarification": bool(_to_bool(parsed.get("needs_clarification", False))),
+        "text": text,
+        "memory_update": memory_update if isinstance(memory_update, dict) else None,
+    }
+
+
+def is_intent_object(value) -> bool:
+    return isinstance(value, dict) and "intent" in value
+
+
+def _balanced_objects(text: str):
+    """
+    Yield (start, end) for every balanced top-level {...} in `text`, in a
+    single pass. Braces inside JSON strings are ignored; quotes outside an
+    object (prose) are not treated as strings.
+    """
+    depth = 0
+    in_string = False
+    skip_to = -1
+    start = -1
+
+    for match in _STRUCTURE.finditer(text):
+        i = match.start()
+        if i < skip_to:
+            continue
+        c = text[i]
+
+        if in_string:
+            if c == "\\":
+                skip_to = i + 2
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = depth > 0
+        elif c == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif c == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                yield start, i + 1
+
+
+def _decode_at(text: str, start: int):
+    try:
+        value, _ = _decoder.raw_decode(text, start)
+    except ValueError:
+        return None
+    return value
+
+
+def _repair_truncated(text: str, start: int):
+    """
+    Close a reply that was cut off (max_tokens, dropped stream): close the
+    open string and brackets, or cut back to an earlier comma.
+    """
+    stack = []
+    in_string = False
+    skip_to = -1
+    cuts = []                       # (comma position, closers at that point)
+
+    for match in _REPAIR_STRUCTURE.finditer(text, start):
+        i = match.start()
+        if i < skip_to:
+            continue
+        c = text[i]
+
+        if in_string:
+            if c == "\\":
+                skip_to = i + 2
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in "{[":
+            stack.append("}" if c == "{" else "]")
+        elif c in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                return None         # balanced - not a truncation
+        elif c == ",":
+            cuts.append((i, "".join(reversed(stack))))
+
+    closers = "".join(reversed(stack))
+    candidates = [text[start:] + ('"' if in_string else "") + closers]
+    candidates += [text[start:pos] + tail for pos, tail in reversed(cuts[-MAX_REPAIR_CUTS:])]
+
+    for candidate in candidates:
+        value = _decode_at(candidate, 0)
+        if is_intent_object(value):
+            return value
+    return None
+
+
+def extract_json(text: str) -> dict | None:
+    """
+    Return the first JSON object in an LLM reply that has an "intent",
+    coerced with coerce_result(), or None.
+
+    Handles ```json fences, prose around the object (including prose with
+    its own braces), trailing text and truncated replies.
+    """
+    if not text:
+        return None
+
+    key = text.find('"intent"')
+    if key == -1:
+        return None
+
+    # Fast path: the object that opens right before the first "intent" key
+    start = text.rfind("{", 0, key)
+    if start != -1:
+        value = _decode_at(text, start)
+        if is_intent_object(value):
+            return coerce_result(value)
+
+    # "intent" quoted earlier (in prose or a string) - scan every balanced
+    # object, decoding only the ones that can hold an intent
+    for start, end in _balanced_objects(text):
+        if text.find('"intent"', start, end) == -1:
+            continue
+        value = _decode_at(text, start)
+        if is_intent_object(value):
+            return coerce_result(value)
+
+    # No complete object - the reply may have been cut off
+    match = _INTENT_START.search(text)
+    if match:
+        value = _repair_truncated(text, match.start())
+        if value is not None:
+            return coerce_result(value)
+
+    return None
+
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON object that arrives in pieces.
+
+    Every top-level field is reported through `on_field(key, value)` as soon
+    as its value closes. The top-level string fields listed in
+    `stream_fields` (default: "text") are also reported piece by piece
+    through `on_text(key, delta)` while they arrive.
+
+    Text before the first "{" (prose, ```json fences) is ignored.
+    """
+
+    def __init__(self, on_field=None, on_text=None, stream_fields=("text",)):
+        self.on_field = on_field
+        self.on_text = on_text
+        self.stream_fields = set(stream_fields)
+
+        self.buffer = ""
+        self.fields = {}
+        self.done = False
+
+        self._pos = 0
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+        self._expect = "key"          # key / colon / value / comma
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+
+        self._streaming = False       # inside a streamed top-level string
+        self._streamed_len = 0        # decoded characters already emitted
+
+    def feed(self, chunk: str):
+        if not chunk:
+            return
+        self.buffer += chunk
+        if self.done:
+            # Keep the rest of the reply for extract_json() in case the
+            # object that closed was not the intent object
+            return
+        self._scan()
+        if self._streaming:
+            self._emit_text(final=False)
+
+    def _scan(self):
+        buf = self.buffer
+        i = self._pos
+        n = len(buf)
+
+        while i < n:
+            c = buf[i]
+
+            if not self._started:
+                if c == "{":
+                    self._started = True
+                    self._depth = 1
+                    self._expect = "key"
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._close_string(i)
+                i += 1
+                continue
+
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    if self._expect == "key":
+                        self._key_start = i
+                    elif self._expect == "value":
+                        self._value_start = i
+                        self._expect = "string"
+                        if self._key in self.stream_fields:
+                            self._streaming = True
+                            self._streamed_len = 0
+            elif c in "{[":
+                if self._depth == 1 and self._expect == "value":
+                    self._value_start = i
+                    self._expect = "nested"
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._expect == "nested":
+                    self._close_value(i + 1)
+                elif self._depth == 0:
+                    if self._expect == "scalar":
+                        self._close_value(i)
+                    self.done = True
+                    self._pos = i + 1
+                    return
+            elif self._depth == 1:
+                if c == ":" and self._expect == "colon":
+                    self._expect = "value"
+                elif c == ",":
+                    if self._expect == "scalar":
+                        self._close_value(i)
+                    self._expect = "key"
+                elif self._expect == "value" and not c.isspace():
+                    self._value_start = i
+                    self._expect = "scalar"
+
+            i += 1
+
+        self._pos = i
+
+    def _close_string(self, i: int):
+        if self._expect == "key":
+            try:
+                self._key = _decoder.decode(self.buffer[self._key_start:i + 1])
+            except ValueError:
+                self._key = None
+            self._expect = "colon"
+        elif self._expect == "string":
+            if self._streaming:
+                self._emit_text(final=True, end=i)
+                self._streaming = False
+            self._close_value(i + 1)
+
+    def _close_value(self, end: int):
+        raw = self.buffer[self._value_start:end].strip()
+        try:
+            value = _decoder.decode(raw)
+        except ValueError:
+            value = None
+
+        self.fields[self._key] = value
+        self._expect = "comma"
+        if self.on_field and self._key is not None:
+            self.on_field(self._key, value)
+
+    def _emit_text(self, final: bool, end: int | None = None):
+        raw = self.buffer[self._value_start + 1:end if end is not None else len(self.buffer)]
+
+        decoded = None
+        # A partial chunk may end inside an escape sequence ("\\u00" ...),
+        # so back off a few characters until the prefix decodes.
+        for trim in range(1 if final else 7):
+            try:
+                decoded = _decoder.decode(f'"{raw[:len(raw) - trim]}"')
+                break
+            except ValueError:
+                continue
+        if decoded is None:
+            return
+
+        delta = decoded[self._streamed_len:]
+        if delta:
+            self._streamed_len = len(decoded)
+            if self.on_text:
+                self.on_text(self._key, delta)
@@ -1,10 +1,26 @@
+import time
+
+# Startup timings are measured from here, before the heavy imports
+START_TIME = time.perf_counter()
+
 import asyncio
+import re
 import threading
 
-from speech_to_text import record_voice
-from llm import get_llm_output
-from tts import edge_speak, stop_speaking
+from speech_to_text import (
+    get_capture_service, start_model_loading, wait_for_model, stop_capture, get_capture_stats,
+    WAKE_WORDS,
+)
+from llm import get_llm_output_async, get_model_stats, get_prompt_stats, OPENROUTER_URL
+from tts import (
+    edge_speak, stop_speaking, get_output_level, get_tts_stats, get_speech_queue_stats, get_backend_stats,
+)
+from tts_cache import get_tts_cache_stats
 from ui import ThenuxUI
+from intent_router import route_intent, get_router_stats
+from speculation import SpeculativeLLM, SPECULATIVE_DISPATCH
+import http_client
+from llm_cache import get_cache_stats
 import sys
 from pathlib import Path
 
@@ -23,6 +39,19 @@ from memory.temporary_memory import TemporaryMemory
 
 interrupt_commands = ["mute", "quit", "exit", "stop"]
 
+# Intents that can start while the rest of the streamed reply is still
+# arriving (they only need `intent` + `parameters`).
+EARLY_DISPATCH_INTENTS = {
+    "weather_report", "search", "calculate", "set_timer", "check_timers",
+    "cancel_timers", "take_note", "list_notes", "delete_note",
+    "system_control", "file_manager"
+}
+
+# Chat replies are spoken sentence by sentence while the "text" field is
+# still streaming in, instead of after it closes.
+SPEAK_WHILE_STREAMING = True
+_SENTENCE_BOUNDARY = re.compile(r"[.!?](?=\s)")
+
 temp_memory = TemporaryMemory()
 
 def get_base_dir():
@@ -32,171 +61,111 @@ def get_base_dir():
 
 BASE_DIR = get_base_dir()
 
-async def get_voice_input():
-    return await asyncio.to_thread(record_voice)
+def minimal_memory_for_prompt(memory: dict) -> dict:
+    result = {}
 
-async def ai_loop(ui: ThenuxUI):
-    while True:
-        
-        user_text = await get_voice_input()
-
-        if not user_text:
-            continue
+    identity = memory.get("identity", {})
+    preferences = memory.get("preferences", {})
+    relationships = memory.get("relationships", {})
+    emotional_state = memory.get("emotional_state", {})
 
-        if any(cmd in user_text.lower() for cmd in interrupt_commands):
-            stop_speaking()
-            temp_memory.reset()
-            continue
+    if "name" in identity:
+        result["user_name"] = identity["name"].get("value")
 
-        ui.write_log(f"You: {user_text}")
+    for k in ["favorite_color", "favorite_food", "favorite_music"]:
+        if k in preferences:
+            val = preferences[k].get("value")
+            if isinstance(val, dict) and "value" in val:
+                val = val["value"]
+            result[k] = val
 
-        if temp_memory.get_current_question():
-            param = temp_memory.get_current_question()
-            temp_memory.update_parameters({param: user_text})
-            temp_memory.clear_current_question()
-            user_text = temp_memory.get_last_user_text()
+    for rel, info in relationships.items():
+        if isinstance(info, dict) and "name" in info and "value" in info["name"]:
+            result[f"{rel}_name"] = info["name"]["value"]
 
-        temp_memory.set_last_user_text(user_text)
+    for event, info in emotional_state.items():
+        if "value" in info:
+            result[f"emotion_{event}"] = info["value"]
 
-        long_term_memory = load_memory()
+    return {k: v for k, v in result.items() if v}
 
-        def minimal_memory_for_prompt(memory: dict) -> dict:
-            result = {}
+def build_memory_for_prompt(upcoming_user_text: str | None = None) -> dict:
+    """
+    `upcoming_user_text` adds a user line that isn't in the session history
+    yet (speculative requests run before the utterance is final).
+    """
+    memory_for_prompt = minimal_memory_for_prompt(load_memory())
 
-            identity = memory.get("identity", {})
-            preferences = memory.get("preferences", {})
-            relationships = memory.get("relationships", {})
-            emotional_state = memory.get("emotional_state", {})
+    history_lines = temp_memory.get_history_for_prompt()
+    if upcoming_user_text:
+        history_lines = "\n".join(filter(None, [history_lines, f"User: {upcoming_user_text}"]))
+    recent_history = "\n".join(history_lines.split("\n")[-5:])
+    if recent_history:
+        memory_for_prompt["recent_conversation"] = recent_history
 
-            if "name" in identity:
-                result["user_name"] = identity["name"].get("value")
+    if temp_memory.has_pending_intent():
+        memory_for_prompt["_pending_intent"] = temp_memory.pending_intent
+        memory_for_prompt["_collected_params"] = str(temp_memory.get_parameters())
 
-            for k in ["favorite_color", "favorite_food", "favorite_music"]:
-                if k in preferences:
-                    val = preferences[k].get("value")
-                    if isinstance(val, dict) and "value" in val:
-                        val = val["value"]
-                    result[k] = val
+    return memory_for_prompt
 
-            for rel, info in relationships.items():
-                if isinstance(info, dict) and "name" in info and "value" in info["name"]:
-                    result[f"{rel}_name"] = info["name"]["value"]
+def dispatch_intent(ui: ThenuxUI, intent: str, parameters: dict, response: str | None):
+    if intent == "send_message":
+        temp_memory.set_pending_intent("send_message")
+        temp_memory.update_parameters(parameters)
 
-            for event, info in emotional_state.items():
-                if "value" in info:
-                    result[f"emotion_{event}"] = info["value"]
-
-            return {k: v for k, v in result.items() if v}
+        if all(temp_memory.get_parameter(p) for p in ["receiver", "message_text", "platform"]):
+            threading.Thread(
+                target=send_message,
+                kwargs={
+                    "parameters": temp_memory.get_parameters(),
+                    "player": ui,
+                    "session_memory": temp_memory
+                },
+                daemon=True
+            ).start()
 
-        memory_for_prompt = minimal_memory_for_prompt(long_term_memory)
+    elif intent == "open_app":
+        if parameters.get("app_name"):
+            threading.Thread(
+                target=open_app,
+                kwargs={
+                    "parameters": parameters,
+                    "response": response,
+                    "player": ui,
+                    "session_memory": temp_memory
+                },
+                daemon=True
+            ).start()
 
-        history_lines = temp_memory.get_history_for_prompt()
-        recent_history = "\n".join(history_lines.split("\n")[-5:])
-        if recent_history:
-            memory_for_prompt["recent_conversation"] = recent_history
+    elif intent == "weather_report":
+        if parameters.get("city"):
+            threading.Thread(
+                target=weather_action,
+                kwargs={
+                    "parameters": parameters,
+                    "player": ui,
+                    "session_memory": temp_memory
+                },
+                daemon=True
+            ).start()
 
-        if temp_memory.has_pending_intent():
-            memory_for_prompt["_pending_intent"] = temp_memory.pending_intent
-            memory_for_prompt["_collected_params"] = str(temp_memory.get_parameters())
+    elif intent == "search":
+        if parameters.get("query"):
+            threading.Thread(
+                target=web_search,
+                kwargs={
+                    "parameters": parameters,
+                    "player": ui,
+                    "session_memory": temp_memory
+                },
+                daemon=True
+            ).start()
 
-        try:
-            llm_output = get_llm_output(
-                user_text=user_text,
-                memory_block=memory_for_prompt
-            )
-        except Exception as e:
-            ui.write_log(f"AI ERROR: {e}")
-            continue
-
-        intent = llm_output.get("intent", "chat")
-        parameters = llm_output.get("parameters", {})
-        response = llm_output.get("text")
-        memory_update = llm_output.get("memory_update")
-
-        if memory_update and isinstance(memory_update, dict):
-            update_memory(memory_update)
-
-        temp_memory.set_last_ai_response(response)
-
-        if intent == "send_message":
-            temp_memory.set_pending_intent("send_message")
-            temp_memory.update_parameters(parameters)
-
-            if all(temp_memory.get_parameter(p) for p in ["receiver", "message_text", "platform"]):
-                threading.Thread(
-                    target=send_message,
-                    kwargs={
-                        "parameters": temp_memory.get_parameters(),
-                        "player": ui,
-                        "session_memory": temp_memory
-                    },
-                    daemon=True
-                ).start()
-
-        elif intent == "open_app":
-            if parameters.get("app_name"):
-                threading.Thread(
-                    target=open_app,
-                    kwargs={
-                        "parameters": parameters,
-                        "response": response,
-                        "player": ui,
-                        "session_memory": temp_memory
-                    },
-                    daemon=True
-                ).start()
-
-        elif intent == "weather_report":
-            if parameters.get("city"):
-                threading.Thread(
-                    target=weather_action,
-                    kwargs={
-                        "parameters": parameters,
-                        "player": ui,
-                        "session_memory": temp_memory
-                    },
-                    daemon=True
-                ).start()
-
-        elif intent == "search":
-            if parameters.get("query"):
-                threading.Thread(
-                    target=web_search,
-                    kwargs={
-                        "parameters": parameters,
-                        "player": ui,
-                        "session_memory": temp_memory
-                    },
-                    daemon=True
-                ).start()
-
-        elif intent == "calculate":
-            if parameters.get("expression"):
-                threading.Thread(
-                    target=calculate,
-                    kwargs={
-                        "parameters": parameters,
-                        "player": ui,
-                        "session_memory": temp_memory
-                    },
-                    daemon=True
-                ).start()
-
-        elif intent == "set_timer":
-            if parameters.get("duration"):
-                threading.Thread(
-                    target=set_timer,
-                    kwargs={
-                        "parameters": parameters,
-                        "player": ui,
-                        "session_memory": temp_memory
-                    },
-                    daemon=True
-                ).start()
-
-        elif intent == "check_timers":
+    elif intent == "calculate":
+        if parameters.get("expression"):
             threading.Thread(
-                target=check_timers,
+                target=calculate,
                 kwargs={
                     "parameters": parameters,
                     "player": ui,
@@ -205,9 +174,10 @@ async def ai_loop(ui: ThenuxUI):
                 daemon=True
             ).start()
 
-        elif intent == "cancel_timers":
+    elif intent == "set_timer":
+        if parameters.get("duration"):
             threading.Thread(
-                target=cancel_timers,
+                target=set_timer,
                 kwargs={
                     "parameters": parameters,
                     "player": ui,
@@ -216,21 +186,32 @@ async def ai_loop(ui: ThenuxUI):
                 daemon=True
             ).start()
 
-        elif intent == "take_note":
-            if parameters.get("content"):
-                threading.Thread(
-                    target=take_note,
-                    kwargs={
-                        "parameters": parameters,
-                        "player": ui,
-                        "session_memory": temp_memory
-                    },
-                    daemon=True
-                ).start()
-
-        elif intent == "list_notes":
+    elif intent == "check_timers":
+        threading.Thread(
+            target=check_timers,
+            kwargs={
+                "parameters": parameters,
+                "player": ui,
+                "session_memory": temp_memory
+            },
+            daemon=True
+        ).start()
+
+    elif intent == "cancel_timers":
+        threading.Thread(
+            target=cancel_timers,
+            kwargs={
+                "parameters": parameters,
+                "player": ui,
+                "session_memory": temp_memory
+            },
+            daemon=True
+        ).start()
+
+    elif intent == "take_note":
+        if parameters.get("content"):
             threading.Thread(
-                target=list_notes,
+                target=take_note,
                 kwargs={
                     "parameters": parameters,
                     "player": ui,
@@ -239,9 +220,32 @@ async def ai_loop(ui: ThenuxUI):
                 daemon=True
             ).start()
 
-        elif intent == "delete_note":
+    elif intent == "list_notes":
+        threading.Thread(
+            target=list_notes,
+            kwargs={
+                "parameters": parameters,
+                "player": ui,
+                "session_memory": temp_memory
+            },
+            daemon=True
+        ).start()
+
+    elif intent == "delete_note":
+        threading.Thread(
+            target=delete_note,
+            kwargs={
+                "parameters": parameters,
+                "player": ui,
+                "session_memory": temp_memory
+            },
+            daemon=True
+        ).start()
+
+    elif intent == "system_control":
+        if parameters.get("action"):
             threading.Thread(
-                target=delete_note,
+                target=system_control,
                 kwargs={
                     "parameters": parameters,
                     "player": ui,
@@ -250,45 +254,309 @@ async def ai_loop(ui: ThenuxUI):
                 daemon=True
             ).start()
 
-        elif intent == "system_control":
-            if parameters.get("action"):
-                threading.Thread(
-                    target=system_control,
-                    kwargs={
-                        "parameters": parameters,
-                        "player": ui,
-                        "session_memory": temp_memory
-                    },
-                    daemon=True
-                ).start()
-
-        elif intent == "file_manager":
-            if parameters.get("action"):
-                threading.Thread(
-                    target=file_manager,
-                    kwargs={
-                        "parameters": parameters,
-                        "player": ui,
-                        "session_memory": temp_memory
-                    },
-                    daemon=True
-                ).start()
+    elif intent == "file_manager":
+        if parameters.get("action"):
+            threading.Thread(
+                target=file_manager,
+                kwargs={
+                    "parameters": parameters,
+                    "player": ui,
+                    "session_memory": temp_memory
+                },
+                daemon=True
+            ).start()
 
+    else:
+        if response:
+            ui.write_log(f"AI: {response}")
+            edge_speak(response, ui)
+
+async def handle_utterance(ui: ThenuxUI, user_text: str, speculator: SpeculativeLLM | None = None):
+    """Process one utterance: route / ask the LLM, then dispatch the intent."""
+    ui.write_log(f"You: {user_text}")
+
+    answered_question = bool(temp_memory.get_current_question())
+    if answered_question:
+        param = temp_memory.get_current_question()
+        temp_memory.update_parameters({param: user_text})
+        temp_memory.clear_current_question()
+        user_text = temp_memory.get_last_user_text()
+
+    temp_memory.set_last_user_text(user_text)
+
+    # Simple commands are resolved locally; everything else goes to the LLM
+    routed = None if temp_memory.has_pending_intent() else route_intent(user_text)
+
+    # A speculative request (from partial transcripts) is only reused when
+    # it was made for exactly this text and no multi-step state applies
+    speculated = None
+    if speculator:
+        usable = not (routed or answered_question or temp_memory.has_pending_intent())
+        speculated = await speculator.resolve(user_text if usable else "")
+
+    fields = {}
+    dispatched = set()
+    unspoken = {"text": "", "started": False}   # streamed reply text not handed to TTS yet
+
+    def speak_streamed(final: bool):
+        text = unspoken["text"]
+        if final:
+            cut = len(text)
         else:
-            if response:
-                ui.write_log(f"AI: {response}")
-                edge_speak(response, ui)
+            boundaries = list(_SENTENCE_BOUNDARY.finditer(text))
+            cut = boundaries[-1].end() if boundaries else 0
+        piece = text[:cut].strip()
+        unspoken["text"] = text[cut:]
+        if piece:
+            unspoken["started"] = True
+            edge_speak(piece, ui)
+
+    def on_text(delta):
+        unspoken["text"] += delta
+        if SPEAK_WHILE_STREAMING and fields.get("intent") == "chat" and "chat" not in dispatched:
+            speak_streamed(final=False)
+
+    def on_field(name, value):
+        # Streaming: start the action (or the spoken reply) as soon as
+        # the fields it needs have arrived, before the model finishes.
+        fields[name] = value
+        intent = fields.get("intent")
+        if not intent or intent in dispatched:
+            return
+        if intent == "chat":
+            if name == "text" and value:
+                dispatched.add(intent)
+                ui.write_log(f"AI: {value}")
+                if unspoken["started"]:
+                    speak_streamed(final=True)   # the rest after the last full sentence
+                else:
+                    edge_speak(value, ui)
+        elif intent in EARLY_DISPATCH_INTENTS and "parameters" in fields:
+            dispatched.add(intent)
+            dispatch_intent(ui, intent, fields.get("parameters") or {}, fields.get("text"))
+
+    try:
+        if routed:
+            llm_output = routed
+        elif speculated:
+            llm_output = speculated
+        else:
+            llm_output = await get_llm_output_async(
+                user_text=user_text,
+                memory_block=build_memory_for_prompt(),
+                on_field=on_field,
+                on_text=on_text
+            )
+    except asyncio.CancelledError:
+        ui.write_log("⏹ Request cancelled.", "system")
+        raise
+    except Exception as e:
+        ui.write_log(f"AI ERROR: {e}")
+        return
+
+    intent = llm_output.get("intent", "chat")
+    parameters = llm_output.get("parameters", {})
+    response = llm_output.get("text")
+    memory_update = llm_output.get("memory_update")
+
+    if memory_update and isinstance(memory_update, dict):
+        update_memory(memory_update)
+
+    temp_memory.set_last_ai_response(response)
 
-        await asyncio.sleep(0.01)
+    if intent == "chat" and intent not in dispatched and unspoken["started"]:
+        # The stream broke off after speaking had begun: only say the rest
+        dispatched.add(intent)
+        ui.write_log(f"AI: {response}")
+        speak_streamed(final=True)
+
+    if intent not in dispatched:
+        dispatch_intent(ui, intent, parameters, response)
+
+async def ai_loop(ui: ThenuxUI):
+    # The loop keeps listening while a request is in flight; a newer
+    # utterance or an interrupt command cancels the stale request.
+    current_task: asyncio.Task | None = None
+
+    speculator = None
+    if SPECULATIVE_DISPATCH:
+        # Speculative requests run without early dispatch, so nothing
+        # happens until the final transcript confirms them.
+        speculator = SpeculativeLLM(
+            asyncio.get_running_loop(),
+            request=lambda text: get_llm_output_async(
+                user_text=text,
+                memory_block=build_memory_for_prompt(upcoming_user_text=text)
+            ),
+            should_speculate=lambda text: (
+                not temp_memory.get_current_question()
+                and not temp_memory.has_pending_intent()
+                and route_intent(text) is None
+            )
+        )
+
+    # The Vosk model loads in the background while the window is already up
+    ui.set_mic_status("⏳ Loading speech model...", "#ffaa00")
+    try:
+        await wait_for_model()
+    except Exception as e:
+        ui.set_mic_status("❌ Speech model missing", "#ff4444")
+        ui.write_log(f"❌ Speech recognition unavailable: {e}. "
+                     f"Download vosk-model-small-en-us-0.15 next to THENUX.", "system")
+        return
+
+    # One microphone stream and recognizer for the whole session
+    capture = get_capture_service()
+
+    def show_mode(mode):
+        if mode == "idle":
+            ui.set_mic_status(f"💤 Say \"{WAKE_WORDS[0].capitalize()}\"...", "#666666")
+        else:
+            ui.set_mic_status("🎤 Listening...", "#00ff88")
+
+    loop = asyncio.get_running_loop()
+
+    def cancel_current():
+        if current_task and not current_task.done():
+            current_task.cancel()
+        temp_memory.reset()
+
+    def on_barge_in(word):
+        # Runs on the capture thread: silence playback right away, then
+        # cancel the in-flight reply on the event loop
+        stop_speaking()
+        loop.call_soon_threadsafe(cancel_current)
+
+    capture.on_mode_change = show_mode
+    capture.enable_barge_in(interrupt_commands, on_barge_in, get_output_level)
+    await asyncio.to_thread(capture.start)
+    show_mode(capture.mode)
+    print(f"⏱ Import to first listen: {time.perf_counter() - START_TIME:.2f}s")
+    print("🎙 I'm listening, sir...")
+
+    try:
+        async for user_text in capture.listen(speculator.on_partial if speculator else None):
+            print("👤 You:", user_text)
+
+            if any(cmd in user_text.lower() for cmd in interrupt_commands):
+                if current_task and not current_task.done():
+                    current_task.cancel()
+                if speculator:
+                    await speculator.resolve("")
+                stop_speaking()
+                temp_memory.reset()
+                continue
+
+            if current_task and not current_task.done():
+                current_task.cancel()
+
+            current_task = asyncio.create_task(handle_utterance(ui, user_text, speculator))
+
+            await asyncio.sleep(0.01)
+    finally:
+        # Shutting down: let the in-flight requests unwind before their
+        # connection pool goes away
+        in_flight = [
+            task for task in (current_task, speculator.task if speculator else None)
+            if task and not task.done()
+        ]
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+        await http_client.aclose()
 
 def main():
+    # Start the slow Vosk model load first; the window doesn't wait for it
+    start_model_loading()
+
     ui = ThenuxUI(BASE_DIR / "face.png", size=(900, 900))
+    ui.root.after_idle(
+        lambda: print(f"⏱ Import to first frame: {time.perf_counter() - START_TIME:.2f}s")
+    )
 
     def runner():
         asyncio.run(ai_loop(ui))
 
+    # Open the OpenRouter connection while the UI starts up
+    http_client.warm_up(OPENROUTER_URL)
+
     threading.Thread(target=runner, daemon=True).start()
     ui.root.mainloop()
+    stop_capture()
+    http_client.close()
+
+    stats = get_router_stats()
+    print(f"⚡ Fast-path router: {stats['llm_calls_saved']}/{stats['total']} LLM calls saved "
+          f"({stats['hit_rate']:.0%}, avg {stats['avg_route_us']:.0f} µs)")
+
+    cache = get_cache_stats()
+    print(f"💾 LLM cache: {cache['hits']} hits, {cache['misses']} misses, "
+          f"{cache['evictions']} evictions ({cache['hit_rate']:.0%} hit rate)")
+
+    capture = get_capture_stats()
+    if capture:
+        print(f"🎙 Capture: {capture['utterances']} utterances, {capture['stream_opens']} stream opens, "
+              f"avg turn gap {capture['turn_gap_avg']:.2f}s, max backlog {capture['backlog_max']} blocks, "
+              f"{capture['ring']['overflows']} buffer overflows")
+        for mode, m in capture["modes"].items():
+            if m["seconds"]:
+                rss = f", max RSS {m['rss_max'] / 2**20:.0f} MB" if m["rss_max"] else ""
+                print(f"   {mode}: {m['seconds']:.0f}s, recognition CPU {m['cpu_percent']:.1f}%{rss}")
+        if "vad" in capture:
+            print(f"🔇 VAD: {capture['vad_skipped_ratio']:.0%} of frames skipped, "
+                  f"~{capture['vad_cpu_saved']:.1f}s recognizer CPU saved")
+        if "barge_in" in capture:
+            barge = capture["barge_in"]
+            p95 = barge["latency"]["p95"]
+            print(f"✋ Barge-in: {barge['interrupts']} interrupts, {barge['suppressed']} echo keywords ignored, "
+                  f"p95 {f'{p95 * 1000:.0f} ms' if p95 is not None else 'n/a'}, "
+                  f"{barge['missed_target']} over target")
+
+    speech = get_tts_stats()
+    if speech and speech["time_to_first_audio"]:
+        for mode, ttfa in speech["time_to_first_audio"].items():
+            print(f"🔊 TTS ({mode}): {ttfa['count']} replies, time to first audio "
+                  f"p50 {ttfa['p50'] * 1000:.0f} ms, p95 {ttfa['p95'] * 1000:.0f} ms")
+        gap = speech["sentence_gap"]
+        if gap["count"]:
+            print(f"   sentence gaps p95 {gap['p95'] * 1000:.0f} ms, {speech['gaps_over_target']} over target")
+        print(f"   {speech['underruns']} buffer underruns")
+        phrases = get_tts_cache_stats()
+        print(f"   phrase cache: {phrases['hits']} hits, {phrases['misses']} misses "
+              f"({phrases['hit_rate']:.0%} hit rate), {phrases['entries']} phrases, "
+              f"{phrases['bytes'] / 2**20:.1f} MB")
+
+    backends = get_backend_stats()
+    if backends:
+        for name, b in backends["backends"].items():
+            if b["successes"] or b["failures"]:
+                p90 = b["latency"]["p90"]
+                print(f"🔈 TTS {name}: {b['successes']} ok, {b['failures']} failed ({b['timeouts']} timeouts), "
+                      f"first audio p90 {f'{p90:.2f}s' if p90 else 'n/a'}")
+                if b.get("formats", {}).get("mp3"):
+                    print(f"   {name}: {b['formats']['pcm']} raw PCM, {b['formats']['mp3']} MP3-decoded sentences")
+        if backends["failovers"]:
+            print(f"   {backends['failovers']} failovers")
+
+    queue = get_speech_queue_stats()
+    if queue:
+        waits = ", ".join(f"{p} p95 {w['p95']:.2f}s" for p, w in queue["wait_time"].items())
+        print(f"🗣 Speech queue: {queue['spoken']} spoken, {queue['merged']} merged, "
+              f"{queue['dropped_stale']} stale dropped, max depth {queue['max_depth']}"
+              + (f" ({waits})" if waits else ""))
+        release = queue["release_delay"]
+        if release["count"]:
+            print(f"   mic back {release['p50'] * 1000:.0f} ms (p50) after the last sample played, "
+                  f"echo tail {queue['echo_tail']['seconds'] * 1000:.0f} ms on {queue['echo_tail']['device']}")
+
+    prompt = get_prompt_stats()
+    print(f"🧮 Prompt: avg {prompt['avg_tokens']:.0f} tokens over {prompt['requests']} requests "
+          f"({prompt['saved_ratio']:.0%} fewer than the full prompt, {prompt['over_budget']} over budget)")
+
+    for model, info in get_model_stats().items():
+        p90 = info["latency"]["p90"]
+        print(f"🧠 {model}: {info['successes']} ok, {info['failures']} failed, "
+              f"{info['hedges_won']} hedges won, p90 {f'{p90:.2f}s' if p90 else 'n/a'}")
 
 
 if __name__ == "__main__":
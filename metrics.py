@@ -0,0 +1,61 @@
+"""
+Lightweight latency metrics shared by the LLM, STT and TTS pipelines.
+"""
+import bisect
+import threading
+from collections import deque
+
+# Bucket upper bounds in seconds (last bucket is open-ended)
+DEFAULT_BUCKETS = (0.05, 0.1, 0.2, 0.35, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0)
+
+
+class LatencyHistogram:
+    """
+    Bucketed latency histogram plus a window of recent samples for
+    percentiles (so the percentiles follow current behaviour).
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window: int = 200):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.recent = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.recent.append(seconds)
+            self.count += 1
+            self.total += seconds
+
+    def percentile(self, p: float) -> float | None:
+        """p in [0, 100] over the recent window, None when empty."""
+        with self._lock:
+            if not self.recent:
+                return None
+            ordered = sorted(self.recent)
+        k = (len(ordered) - 1) * p / 100.0
+        lo = int(k)
+        hi = min(lo + 1, len(ordered) - 1)
+        return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+    def summary(self) -> dict:
+        with self._lock:
+            count = self.count
+            mean = self.total / count if count else None
+            buckets = {
+                (f"<={b}s" if i < len(self.buckets) else f">{self.buckets[-1]}s"): c
+                for i, (b, c) in enumerate(zip(self.buckets + (None,), self.counts))
+                if c
+            }
+        return {
+            "count": count,
+            "mean": mean,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": buckets,
+        }
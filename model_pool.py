@@ -0,0 +1,100 @@
+"""
+Model pool - per-model health (circuit breaker) and latency tracking used
+by llm.py to hedge slow requests and fall back to other models.
+"""
+import threading
+import time
+
+from metrics import LatencyHistogram
+
+# Circuit breaker
+FAILURE_THRESHOLD = 3      # consecutive failures / timeouts before a model is skipped
+COOLDOWN = 60.0            # seconds a tripped model is skipped before a retry
+
+# Hedging threshold (seconds), adapted to the model's own p90
+HEDGE_DELAY = 4.0          # used until enough samples exist
+HEDGE_PERCENTILE = 90
+HEDGE_MIN_DELAY = 1.0
+HEDGE_MAX_DELAY = 10.0
+HEDGE_MIN_SAMPLES = 10
+
+
+class ModelHealth:
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latency = LatencyHistogram()
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0          # circuit open (model skipped) until this time
+        self.hedges_won = 0
+
+    def is_available(self, now: float) -> bool:
+        # After the cooldown the breaker is half-open: one request is let
+        # through and its outcome closes or re-opens it.
+        return now >= self.open_until
+
+    def hedge_delay(self) -> float:
+        if self.latency.count < HEDGE_MIN_SAMPLES:
+            return HEDGE_DELAY
+        p = self.latency.percentile(HEDGE_PERCENTILE) or HEDGE_DELAY
+        return min(max(p, HEDGE_MIN_DELAY), HEDGE_MAX_DELAY)
+
+
+class ModelPool:
+
+    def __init__(self, models):
+        self.models = list(models)
+        self.health = {m: ModelHealth(m) for m in self.models}
+        self._lock = threading.Lock()
+
+    def candidates(self) -> list[str]:
+        """Models to try, in configured order, skipping tripped ones."""
+        now = time.monotonic()
+        with self._lock:
+            available = [m for m in self.models if self.health[m].is_available(now)]
+        # Never end up with nothing to try - fall back to the full list
+        return available or list(self.models)
+
+    def hedge_delay(self, model: str) -> float:
+        return self.health[model].hedge_delay()
+
+    def record_success(self, model: str, seconds: float, hedged: bool = False):
+        h = self.health[model]
+        h.latency.record(seconds)
+        with self._lock:
+            h.successes += 1
+            h.consecutive_failures = 0
+            h.open_until = 0.0
+            if hedged:
+                h.hedges_won += 1
+
+    def record_failure(self, model: str, timeout: bool = False):
+        h = self.health[model]
+        with self._lock:
+            h.failures += 1
+            if timeout:
+                h.timeouts += 1
+            h.consecutive_failures += 1
+            if h.consecutive_failures >= FAILURE_THRESHOLD:
+                h.open_until = time.monotonic() + COOLDOWN
+                print(f"⚠️ Model {model} skipped for {COOLDOWN:.0f}s after "
+                      f"{h.consecutive_failures} failures")
+
+    def get_stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                m: {
+                    "successes": h.successes,
+                    "failures": h.failures,
+                    "timeouts": h.timeouts,
+                    "hedges_won": h.hedges_won,
+                    "circuit_open": not h.is_available(now),
+                    "hedge_delay": h.hedge_delay(),
+                    "latency": h.latency.summary(),
+                }
+                for m, h in self.health.items()
+            }
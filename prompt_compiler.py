@@ -0,0 +1,273 @@
+"""
+Prompt compiler - builds the messages for one LLM request from
+core/prompt.txt without sending every intent's rules every time.
+
+prompt.txt is split once into
+  - a stable prefix (persona, intent list, general rules, output format)
+    that is byte-identical for every request, so providers can reuse
+    their prompt prefix cache, and
+  - per-intent sections (the intent's bullet under "Parameter Rules:").
+
+A request gets the prefix plus only the sections suggested by a cheap
+keyword pre-classifier or by the pending multi-step intent. The memory
+block is then trimmed to PROMPT_TOKEN_BUDGET in priority order
+(oldest conversation lines first, then low-value memory).
+"""
+import re
+import threading
+
+# Approximate input-token budget for one request (system + user message)
+PROMPT_TOKEN_BUDGET = 1000
+
+# When the pre-classifier finds nothing the request is most likely chat,
+# which needs no parameter rules. Set True to send every section instead.
+INCLUDE_ALL_WHEN_UNSURE = False
+
+# Words that suggest an intent. Broad on purpose: a false positive only
+# costs a few tokens, a miss costs the intent's rules.
+INTENT_KEYWORDS = {
+    "send_message": r"message|text|tell|send|whatsapp|telegram|ask (?:him|her|them)",
+    "open_app": r"open|launch|start|run",
+    "search": r"search|news|look up|google|find|who|what|when|where|latest",
+    "weather_report": r"weather|temperature|forecast|rain|sunny|hot|cold|degrees",
+    "calculate": r"calculate|plus|minus|times|divided|multiplied|percent|square|root|\d",
+    "set_timer": r"timer|remind|alarm|countdown|minutes?|seconds?|hours?",
+    "take_note": r"note|write down|jot",
+    "list_notes": r"notes?",
+    "delete_note": r"notes?|delete|remove",
+    "system_control": r"volume|mute|louder|quieter|lock|sleep|shut ?down|restart|reboot",
+    "file_manager": r"folder|file|directory|downloads|documents|desktop|create|delete",
+}
+
+_KEYWORD_PATTERNS = {
+    intent: re.compile(rf"\b(?:{words})\b", re.IGNORECASE)
+    for intent, words in INTENT_KEYWORDS.items()
+}
+
+# Memory keys that are never trimmed (multi-step state)
+PROTECTED_MEMORY = ("_pending_intent", "_collected_params")
+
+# Lower number = trimmed first, after the conversation history
+_MEMORY_TRIM_PRIORITY = (
+    (re.compile(r"^emotion_"), 0),
+    (re.compile(r"^favorite_"), 1),
+    (re.compile(r"_name$"), 2),
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English)."""
+    return (len(text) + 3) // 4 if text else 0
+
+
+def split_prompt(prompt_text: str) -> tuple[str, dict, list]:
+    """
+    Split prompt.txt into (prefix, {intent: section}, intents).
+
+    Intent names come from the "Intents:" list. Every bullet under
+    "Parameter Rules:" that names an intent becomes that intent's section;
+    bullets that name none (general rules) stay in the prefix.
+    """
+    lines = prompt_text.splitlines()
+
+    intents = []
+    rules_start = None
+    for i, line in enumerate(lines):
+        heading = line.strip()
+        if heading == "Intents:":
+            for item in lines[i + 1:]:
+                if not item.strip():
+                    break
+                intents.append(item.strip().lstrip("- ").strip())
+        elif heading == "Parameter Rules:":
+            rules_start = i + 1
+
+    if rules_start is None or not intents:
+        return prompt_text, {}, intents
+
+    names = re.compile(r"\b(" + "|".join(map(re.escape, intents)) + r")\b")
+
+    # Group the rule lines into bullets (deeper-indented lines continue a bullet)
+    bullets = []
+    end = rules_start
+    top_indent = None
+    for line in lines[rules_start:]:
+        if not line.strip() or not line[:1].isspace():
+            break
+        indent = len(line) - len(line.lstrip())
+        if top_indent is None:
+            top_indent = indent
+        if indent <= top_indent or not bullets:
+            bullets.append([line])
+        else:
+            bullets[-1].append(line)
+        end += 1
+
+    sections = {}
+    general = []
+    for bullet in bullets:
+        text = "\n".join(bullet)
+        # The first intent named is the one the bullet is about
+        # ("list_notes → search (optional)" is not a search rule)
+        match = names.search(bullet[0])
+        if not match:
+            general.append(text)
+            continue
+        intent = match.group(1)
+        sections[intent] = f"{sections[intent]}\n{text}" if intent in sections else text
+
+    prefix = "\n".join(lines[:rules_start] + general + lines[end:])
+    return prefix, sections, intents
+
+
+def format_memory(memory_block: dict | None) -> str:
+    if not memory_block:
+        return ""
+    return "\n".join(f"{k}: {v}" for k, v in memory_block.items())
+
+
+def build_user_prompt(user_text: str, memory_block: dict | None) -> str:
+    memory_str = format_memory(memory_block)
+    return f"""User message: "{user_text}"
+
+Known user memory:
+{memory_str if memory_str else "No memory available"}"""
+
+
+class PromptCompiler:
+
+    def __init__(self, prompt_text: str, budget: int = PROMPT_TOKEN_BUDGET):
+        self.budget = budget
+        self.prefix, self.sections, self.intents = split_prompt(prompt_text)
+        self.full_tokens = estimate_tokens(prompt_text)
+        self.prefix_tokens = estimate_tokens(self.prefix)
+
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "tokens": 0,
+            "full_prompt_tokens": 0,
+            "max_tokens": 0,
+            "over_budget": 0,
+            "trimmed_history_lines": 0,
+            "trimmed_memory_keys": 0,
+            "sections": {},
+        }
+
+    def classify(self, user_text: str, memory_block: dict | None = None) -> list[str]:
+        """Intents whose rules this request should carry."""
+        suggested = []
+        pending = (memory_block or {}).get("_pending_intent")
+        if pending in self.sections:
+            suggested.append(pending)
+
+        for intent, pattern in _KEYWORD_PATTERNS.items():
+            if intent in self.sections and intent not in suggested and pattern.search(user_text or ""):
+                suggested.append(intent)
+
+        if not suggested and INCLUDE_ALL_WHEN_UNSURE:
+            suggested = list(self.sections)
+        return suggested
+
+    def system_prompt(self, intents: list[str]) -> str:
+        # Keep the prompt file's order so the same set always gives the same text
+        rules = list(dict.fromkeys(self.sections[i] for i in self.sections if i in intents))
+        if not rules:
+            return self.prefix
+        return self.prefix + "\n\nParameter Rules for this request:\n" + "\n".join(rules)
+
+    def _trim(self, user_text: str, memory_block: dict, available: int) -> tuple[dict, int, int]:
+        """Drop history lines, then low-priority memory, until the user prompt fits."""
+        memory = dict(memory_block)
+        history_lines = 0
+        memory_keys = 0
+
+        def size():
+            return estimate_tokens(build_user_prompt(user_text, memory))
+
+        history = memory.get("recent_conversation", "")
+        lines = history.split("\n") if history else []
+        while lines and size() > available:
+            lines.pop(0)
+            history_lines += 1
+            if lines:
+                memory["recent_conversation"] = "\n".join(lines)
+            else:
+                memory.pop("recent_conversation", None)
+
+        def priority(key):
+            for pattern, rank in _MEMORY_TRIM_PRIORITY:
+                if pattern.search(key):
+                    return rank
+            return len(_MEMORY_TRIM_PRIORITY)
+
+        removable = sorted(
+            (k for k in memory if k not in PROTECTED_MEMORY and k != "recent_conversation"),
+            key=priority,
+        )
+        for key in removable:
+            if size() <= available:
+                break
+            memory.pop(key)
+            memory_keys += 1
+
+        return memory, history_lines, memory_keys
+
+    def compile(self, user_text: str, memory_block: dict | None = None) -> tuple[list[dict], dict]:
+        """Return (messages, info) for one request."""
+        intents = self.classify(user_text, memory_block)
+        system = self.system_prompt(intents)
+        system_tokens = estimate_tokens(system)
+
+        memory = memory_block or {}
+        history_lines = memory_keys = 0
+        user_prompt = build_user_prompt(user_text, memory)
+        user_tokens = estimate_tokens(user_prompt)
+
+        if system_tokens + user_tokens > self.budget and memory:
+            memory, history_lines, memory_keys = self._trim(user_text, memory, self.budget - system_tokens)
+            user_prompt = build_user_prompt(user_text, memory)
+            user_tokens = estimate_tokens(user_prompt)
+
+        tokens = system_tokens + user_tokens
+        over_budget = tokens > self.budget
+        if history_lines or memory_keys or over_budget:
+            print(f"✂️ Prompt {tokens}/{self.budget} tokens "
+                  f"(dropped {history_lines} history lines, {memory_keys} memory keys)")
+
+        with self._lock:
+            s = self.stats
+            s["requests"] += 1
+            s["tokens"] += tokens
+            s["full_prompt_tokens"] += self.full_tokens + estimate_tokens(build_user_prompt(user_text, memory_block))
+            s["max_tokens"] = max(s["max_tokens"], tokens)
+            s["over_budget"] += over_budget
+            s["trimmed_history_lines"] += history_lines
+            s["trimmed_memory_keys"] += memory_keys
+            for intent in intents:
+                s["sections"][intent] = s["sections"].get(intent, 0) + 1
+
+        messages = [
+            {"role": "system", "content": system},
+            {"role": "user", "content": user_prompt},
+        ]
+        info = {
+            "tokens": tokens,
+            "system_tokens": system_tokens,
+            "user_tokens": user_tokens,
+            "sections": intents,
+            "over_budget": over_budget,
+        }
+        return messages, info
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["sections"] = dict(self.stats["sections"])
+        requests = stats["requests"]
+        stats["prefix_tokens"] = self.prefix_tokens
+        stats["avg_tokens"] = stats["tokens"] / requests if requests else 0.0
+        stats["saved_ratio"] = (
+            1 - stats["tokens"] / stats["full_prompt_tokens"] if stats["full_prompt_tokens"] else 0.0
+        )
+        return stats
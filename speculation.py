@@ -0,0 +1,145 @@
+"""
+Speculative LLM dispatch - start the LLM request from Vosk partial
+transcripts before the utterance is finalized.
+
+When the partial text has stayed the same for STABLE_CHUNKS audio chunks,
+a request is started for it. When the final text arrives, the speculative
+result is reused if the text matches, otherwise it is cancelled and the
+caller issues a normal request.
+"""
+import asyncio
+import threading
+import time
+
+from intent_router import normalize
+
+SPECULATIVE_DISPATCH = False   # optional mode, off by default
+STABLE_CHUNKS = 2              # identical partials in a row before speculating
+MIN_WORDS = 2                  # don't speculate on one-word fragments
+
+
+class SpeculativeLLM:
+    """
+    `request(text)` is a coroutine function that performs the LLM request
+    without side effects (no early dispatch). `should_speculate(text)`
+    can veto speculation (pending multi-step intents, fast-path commands).
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, request, should_speculate=None):
+        self.loop = loop
+        self.request = request
+        self.should_speculate = should_speculate or (lambda text: True)
+
+        self._lock = threading.Lock()
+        self._last_partial = ""
+        self._stable = 0
+
+        self.task: asyncio.Task | None = None
+        self.text = None
+        self.started = 0.0
+        self.finished = None
+
+        self.stats = {
+            "turns": 0,
+            "speculated": 0,
+            "reused": 0,
+            "mismatched": 0,
+            "requests_started": 0,
+            "requests_wasted": 0,
+            "time_saved": 0.0,
+            "time_wasted": 0.0,
+        }
+
+    # ---------------- STT thread ----------------
+
+    def on_partial(self, partial: str):
+        """Called by speech_to_text for every audio chunk (from its thread)."""
+        key = normalize(partial or "")
+        with self._lock:
+            if key and key == self._last_partial:
+                self._stable += 1
+            else:
+                self._last_partial = key
+                self._stable = 1 if key else 0
+
+            ready = (
+                self._stable == STABLE_CHUNKS
+                and len(key.split()) >= MIN_WORDS
+            )
+
+        if ready:
+            self.loop.call_soon_threadsafe(self._start, key, partial)
+
+    # ---------------- event loop ----------------
+
+    def _start(self, key: str, text: str):
+        if self.text == key and self.task is not None:
+            return
+        if not self.should_speculate(text):
+            return
+
+        self._discard()
+        self.text = key
+        self.started = time.perf_counter()
+        self.finished = None
+        self.task = self.loop.create_task(self.request(text))
+        self.task.add_done_callback(self._on_done)
+        self.stats["requests_started"] += 1
+
+    def _on_done(self, task: asyncio.Task):
+        if task is self.task:
+            self.finished = time.perf_counter()
+
+    def _discard(self):
+        """Cancel the running speculation and count it as wasted work."""
+        if self.task is None:
+            return
+        end = self.finished or time.perf_counter()
+        self.task.cancel()
+        self.stats["requests_wasted"] += 1
+        self.stats["time_wasted"] += end - self.started
+        self.task = None
+        self.text = None
+
+    async def resolve(self, final_text: str) -> dict | None:
+        """
+        Return the speculative result for `final_text`, or None when there
+        was no matching speculation (the caller then makes a normal request).
+        """
+        now = time.perf_counter()
+        with self._lock:
+            self._last_partial = ""
+            self._stable = 0
+
+        self.stats["turns"] += 1
+        if self.task is None:
+            return None
+
+        self.stats["speculated"] += 1
+
+        if normalize(final_text or "") != self.text:
+            wasted = (self.finished or now) - self.started
+            self._discard()
+            self.stats["mismatched"] += 1
+            print(f"🔮 Speculation missed (\"{final_text}\"), wasted {wasted:.2f}s")
+            return None
+
+        task = self.task
+        self.task = None
+        self.text = None
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+
+        saved = min(now, self.finished or now) - self.started
+        self.stats["reused"] += 1
+        self.stats["time_saved"] += saved
+        print(f"🔮 Speculation reused, saved {saved:.2f}s")
+        return result
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        stats["reuse_rate"] = stats["reused"] / stats["speculated"] if stats["speculated"] else 0.0
+        return stats
@@ -1,12 +1,26 @@
 import sounddevice as sd
-import vosk
-import queue
+import asyncio
+import concurrent.futures
+import time
 import sys
 import json
 import threading
+from collections import deque
 from pathlib import Path
 import os
 
+import numpy as np
+
+from audio_buffer import RingBuffer
+from vad import VoiceActivityGate, VAD_ENABLED, INITIAL_NOISE_FLOOR
+from stt_config import get_profile, block_size, create_recognizer
+from barge_in import BargeInDetector, BARGE_IN_ENABLED, BARGE_IN_BLOCK_MS
+
+try:
+    import psutil   # optional, for memory figures in the capture stats
+except ImportError:
+    psutil = None
+
 def get_base_dir():
     if getattr(sys, "frozen", False):
         # Running as compiled executable
@@ -22,54 +36,123 @@ MODEL_PATHS = [
     Path.home() / "Downloads" / "THENUX-JARVIS" / "thenux_assistant" / "vosk-model-small-en-us-0.15",
 ]
 
-MODEL_PATH = None
-for path in MODEL_PATHS:
-    if path.exists():
-        MODEL_PATH = path
-        print(f"✓ Found Vosk model at: {MODEL_PATH}")
-        break
-
-if MODEL_PATH is None:
-    print("=" * 60)
-    print("⚠️  VOSK MODEL NOT FOUND!")
-    print("=" * 60)
-    print("\nPlease download the Vosk model:")
-    print("1. Visit: https://alphacephei.com/vosk/models")
-    print("2. Download: vosk-model-small-en-us-0.15")
-    print("3. Extract it to the same folder as THENUX.exe")
-    print("\nThe folder should be named: vosk-model-small-en-us-0.15")
-    print(f"\nExpected location: {BASE_DIR / 'vosk-model-small-en-us-0.15'}")
-    print("=" * 60)
-    input("\nPress Enter to exit...")
-    sys.exit(1)
+MODEL_NOT_FOUND_HELP = f"""{"=" * 60}
+⚠️  VOSK MODEL NOT FOUND!
+{"=" * 60}
+
+Please download the Vosk model:
+1. Visit: https://alphacephei.com/vosk/models
+2. Download: vosk-model-small-en-us-0.15
+3. Extract it to the same folder as THENUX.exe
+
+The folder should be named: vosk-model-small-en-us-0.15
+
+Expected location: {BASE_DIR / 'vosk-model-small-en-us-0.15'}
+{"=" * 60}"""
+
+def find_model_path() -> Path | None:
+    for path in MODEL_PATHS:
+        if path.exists():
+            return path
+    return None
+
+# The Vosk model takes seconds to load, so it is loaded in a background
+# thread started at launch; callers wait on this future.
+_model_future: concurrent.futures.Future | None = None
+_model_lock = threading.Lock()
+
+def _load_model(future: concurrent.futures.Future):
+    start = time.perf_counter()
+    try:
+        model_path = find_model_path()
+        if model_path is None:
+            print(MODEL_NOT_FOUND_HELP)
+            raise FileNotFoundError("Vosk model not found")
+        print(f"✓ Found Vosk model at: {model_path}")
+
+        import vosk
+        model = vosk.Model(str(model_path))
+        print(f"✓ Vosk model loaded successfully ({time.perf_counter() - start:.1f}s)")
+        future.set_result(model)
+    except Exception as e:
+        print(f"✗ Error loading Vosk model: {e}")
+        future.set_exception(e)
+
+def start_model_loading() -> concurrent.futures.Future:
+    """Start loading the Vosk model in the background (once); returns its future."""
+    global _model_future
+    with _model_lock:
+        if _model_future is None:
+            _model_future = concurrent.futures.Future()
+            threading.Thread(target=_load_model, args=(_model_future,), daemon=True).start()
+        return _model_future
+
+async def wait_for_model():
+    """Await the Vosk model from async code (raises if it couldn't be loaded)."""
+    return await asyncio.wrap_future(start_model_loading())
+
+def get_model(timeout: float | None = None):
+    """Blocking access to the Vosk model."""
+    return start_model_loading().result(timeout)
+
+SAMPLE_RATE = 16000         # block size and endpointing come from stt_config.STT_PROFILE
+
+# Wake-word mode: while idle only a tiny grammar recognizer runs; the full
+# recognizer (and so the LLM pipeline) starts once a wake word is heard.
+# Words must exist in the Vosk model's vocabulary to be recognized.
+WAKE_WORD_MODE = False
+WAKE_WORDS = ["jarvis", "thenux"]
+WAKE_IDLE_TIMEOUT = 30.0     # seconds without speech before going back to idle (needs VAD_ENABLED)
+WAKE_REPLAY_BLOCKS = 8       # speech replayed to the full recognizer on wake ("jarvis open chrome")
+
+RING_SECONDS = 10            # capture buffer; older audio is dropped if the reader falls behind
+ECHO_QUIET_RATIO = 2.0       # after a reply the mic is quiet again below this x the noise floor
 
-try:
-    model = vosk.Model(str(MODEL_PATH))
-    print("✓ Vosk model loaded successfully")
-except Exception as e:
-    print(f"✗ Error loading Vosk model: {e}")
-    print(f"Model path: {MODEL_PATH}")
-    input("\nPress Enter to exit...")
-    sys.exit(1)
-
-q = queue.Queue()
 stop_listening_flag = threading.Event()
 is_speaking = False  # Track if AI is currently speaking
 
-def callback(indata, frames, time, status):
+def callback(indata, frames, time_info, status):
     if status:
         print(status, file=sys.stderr)
-    # Only record when AI is not speaking
+        if _capture:
+            _capture.stats["status_errors"] += 1
+    if not _capture:
+        return
+    # Only record when AI is not speaking; while it speaks the audio goes
+    # to the barge-in detector instead
     if not is_speaking:
-        q.put(bytes(indata))
+        _capture.ring.write(indata)
+        return
+    # Mic level while speaking, so tts can tell when the echo has died down
+    # (squares go into a preallocated buffer: no allocation per block)
+    samples = np.frombuffer(indata, dtype=np.int16)
+    n = len(samples)
+    if n > len(_capture.level_buffer):
+        _capture.level_buffer = np.zeros(n, dtype=np.float32)
+    squares = _capture.level_buffer[:n]
+    np.multiply(samples, samples, out=squares, dtype=np.float32)
+    _capture.mic_level = float(np.sqrt(squares.mean())) if n else 0.0
+    _capture.mic_level_at = time.perf_counter()
+    if _capture.barge_in:
+        _capture.barge_ring.write(indata)
+        _capture.barge_arrived = time.perf_counter()
 
 def clear_queue():
-    """Clear the audio queue to prevent AI voice from being picked up"""
-    while not q.empty():
-        try:
-            q.get_nowait()
-        except queue.Empty:
-            break
+    """Clear the buffered audio to prevent AI voice from being picked up"""
+    if _capture:
+        _capture.ring.clear()
+
+def is_mic_quiet() -> bool | None:
+    """
+    Whether the latest mic block (captured while speaking) is back near
+    the noise floor; None when there is no live capture to ask.
+    """
+    if not _capture or _capture.stream is None:
+        return None
+    if time.perf_counter() - _capture.mic_level_at > 0.5:
+        return None
+    floor = _capture.vad.noise_floor if _capture.vad else INITIAL_NOISE_FLOOR
+    return _capture.mic_level < ECHO_QUIET_RATIO * floor
 
 def set_speaking(speaking: bool):
     """Set whether AI is currently speaking"""
@@ -77,30 +160,374 @@ def set_speaking(speaking: bool):
     is_speaking = speaking
     if speaking:
         clear_queue()  # Clear queue when AI starts speaking
+        if _capture:
+            _capture.request_reset()  # Drop any half-heard words
+            _capture.barge_ring.clear()
+            _capture._barge_reset.set()
+
 
-def record_voice(prompt="🎙 I'm listening, sir..."):
+class CaptureService:
     """
-    Blocking call, returns the first recognized sentence.
-    Only records when AI is not speaking.
+    Microphone stream and recognizer opened once and kept for the whole
+    session. Audio that arrives between turns stays buffered instead of being
+    lost to a device reopen, and the recognizer is reset rather than rebuilt.
     """
-    # Clear any leftover audio before starting
-    clear_queue()
-    
-    print(prompt)
-    rec = vosk.KaldiRecognizer(model, 16000)
-    with sd.RawInputStream(samplerate=16000, blocksize=8000, dtype='int16',
-                           channels=1, callback=callback):
-        while not stop_listening_flag.is_set():
+
+    def __init__(self, model, samplerate: int = SAMPLE_RATE, profile: dict | None = None):
+        self.model = model
+        self.samplerate = samplerate
+        self.profile = profile or get_profile()
+        self.blocksize = block_size(self.profile, samplerate)
+        # Barge-in needs short callback blocks; the recognizer still reads
+        # whole profile blocks from the ring
+        self.stream_blocksize = (
+            min(self.blocksize, samplerate * BARGE_IN_BLOCK_MS // 1000) if BARGE_IN_ENABLED else self.blocksize
+        )
+        # A whole number of blocks, so reads never wrap mid-block
+        self.ring = RingBuffer(-(-RING_SECONDS * samplerate // self.blocksize) * self.blocksize)
+        self.stream = None
+        self.rec = None
+        self._reset = threading.Event()
+        self._lock = threading.Lock()
+        self._last_final = None
+        self._utterance_audio = 0.0          # seconds fed since the last final result
+        self.vad = (
+            VoiceActivityGate(samplerate, hangover_ms=int(self.profile["end_silence"] * 1000))
+            if VAD_ENABLED else None
+        )
+
+        self.wake_rec = None
+        self.awake = not WAKE_WORD_MODE
+        self.last_activity = time.monotonic()
+        self.on_mode_change = None           # called with "idle" / "active"
+        self._segment = deque(maxlen=WAKE_REPLAY_BLOCKS)
+        self._mode_since = time.monotonic()
+        self.mode_stats = {
+            mode: {"seconds": 0.0, "cpu": 0.0, "rss_max": 0, "entered": 0}
+            for mode in ("idle", "active")
+        }
+
+        self.barge_in = None                 # BargeInDetector, see enable_barge_in()
+        self.barge_ring = RingBuffer(samplerate * 2)
+        self.barge_arrived = 0.0             # perf_counter of the last block written to barge_ring
+        self.mic_level = 0.0                 # RMS of the latest block while speaking
+        self.level_buffer = np.zeros(self.stream_blocksize, dtype=np.float32)
+        self.mic_level_at = 0.0
+        self.on_interrupt = None             # called with the keyword from the barge-in thread
+        self._barge_reset = threading.Event()
+        self._barge_thread = None
+
+        self.stats = {
+            "stream_opens": 0,
+            "utterances": 0,
+            "resets": 0,
+            "status_errors": 0,
+            "turn_gap_total": 0.0,     # time the caller spent between utterances
+            "turn_gap_max": 0.0,
+            "backlog_max": 0,          # blocks buffered while the caller was busy
+            "recognizer_time": 0.0,    # CPU seconds spent in AcceptWaveform
+            "recognizer_audio": 0.0,   # audio seconds given to the recognizer
+        }
+
+    def start(self):
+        with self._lock:
+            if self.stream is not None:
+                return
+            if self.awake:
+                self.rec = self._make_recognizer()
+            else:
+                self.wake_rec = self._make_recognizer(WAKE_WORDS + ["[unk]"])
+            self.stream = sd.RawInputStream(samplerate=self.samplerate, blocksize=self.stream_blocksize,
+                                            dtype='int16', channels=1, callback=callback)
+            self.stream.start()
+            self.stats["stream_opens"] += 1
+            print("🎙 Microphone stream opened")
+            if self.barge_in and self._barge_thread is None:
+                self._barge_thread = threading.Thread(target=self._barge_in_loop, daemon=True)
+                self._barge_thread.start()
+
+    def stop(self):
+        with self._lock:
+            if self.stream is None:
+                return
             try:
-                data = q.get(timeout=0.1)
-            except queue.Empty:
+                self.stream.stop()
+                self.stream.close()
+            finally:
+                self.stream = None
+
+    def _make_recognizer(self, grammar=None):
+        return create_recognizer(self.model, self.samplerate, self.profile, grammar)
+
+    def enable_barge_in(self, words, on_interrupt, output_level=None):
+        """
+        Listen for `words` while the assistant speaks and call
+        on_interrupt(word) (from a background thread) when one is heard.
+        `output_level` returns the current TTS output RMS (int16 units).
+        """
+        if not BARGE_IN_ENABLED:
+            return
+        self.on_interrupt = on_interrupt
+        self.barge_in = BargeInDetector(self._make_recognizer(list(words) + ["[unk]"]), words,
+                                        self.samplerate, output_level)
+        if self.stream is not None and self._barge_thread is None:
+            self._barge_thread = threading.Thread(target=self._barge_in_loop, daemon=True)
+            self._barge_thread.start()
+
+    def _barge_in_loop(self):
+        block = self.stream_blocksize
+        while not stop_listening_flag.is_set() and self.stream is not None:
+            data = self.barge_ring.read(block, timeout=0.1)
+            if self._barge_reset.is_set():
+                self._barge_reset.clear()
+                self.barge_in.reset()
+            if data is None or not is_speaking:
                 continue
-            if rec.AcceptWaveform(data):
-                result = json.loads(rec.Result())
-                text = result.get("text", "")
-                if text.strip():
-                    print("👤 You:", text)
-                    # Clear queue after getting text to avoid picking up echoes
-                    clear_queue()
-                    return text
-    return ""
\ No newline at end of file
+            # Arrival of this block = last write minus what is still queued behind it
+            arrived = self.barge_arrived - self.barge_ring.available() / self.samplerate
+            word = self.barge_in.process(data)
+            if word:
+                if self.on_interrupt:
+                    self.on_interrupt(word)
+                self.barge_in.record_latency(arrived)
+                print(f"✋ Barge-in: \"{word}\"")
+        self._barge_thread = None
+
+    @property
+    def mode(self) -> str:
+        return "active" if self.awake else "idle"
+
+    def _account_mode(self):
+        """Add the time / CPU / memory since the last call to the current mode."""
+        now = time.monotonic()
+        stats = self.mode_stats[self.mode]
+        stats["seconds"] += now - self._mode_since
+        self._mode_since = now
+        if psutil:
+            stats["rss_max"] = max(stats["rss_max"], psutil.Process().memory_info().rss)
+
+    def _set_awake(self, awake: bool):
+        if awake == self.awake:
+            return
+        self._account_mode()
+        self.awake = awake
+        self.mode_stats[self.mode]["entered"] += 1
+        self.last_activity = time.monotonic()
+
+        if awake:
+            print("👂 Wake word heard")
+            if self.rec is None:
+                self.rec = self._make_recognizer()
+        else:
+            print(f"💤 Idle, say \"{WAKE_WORDS[0]}\" to wake me")
+            # Free the full recognizer while idle
+            self.rec = None
+            if self.wake_rec is None:
+                self.wake_rec = self._make_recognizer(WAKE_WORDS + ["[unk]"])
+            self.wake_rec.Reset()
+            self._segment.clear()
+
+        if self.on_mode_change:
+            self.on_mode_change(self.mode)
+
+    def _check_idle(self):
+        if not WAKE_WORD_MODE or not self.awake:
+            return
+        if is_speaking:
+            self.last_activity = time.monotonic()
+        elif time.monotonic() - self.last_activity > WAKE_IDLE_TIMEOUT:
+            self._set_awake(False)
+
+    def _heard_wake_word(self, data: bytes, ended: bool) -> bool:
+        """Feed the grammar recognizer; True once a wake word is heard."""
+        text = ""
+        final = ended
+        if data:
+            self._segment.append(data)
+            if self.wake_rec.AcceptWaveform(data):
+                text = json.loads(self.wake_rec.Result()).get("text", "")
+                final = True
+            else:
+                text = json.loads(self.wake_rec.PartialResult()).get("partial", "")
+        if ended and not text:
+            text = json.loads(self.wake_rec.FinalResult()).get("text", "")
+
+        if any(word in WAKE_WORDS for word in text.split()):
+            self.wake_rec.Reset()
+            return True
+        if final:
+            # That phrase had no wake word; don't replay it later
+            self._segment.clear()
+        return False
+
+    def request_reset(self):
+        """Reset the recognizer before the next block (thread-safe)."""
+        self._reset.set()
+
+    def next_utterance(self, on_partial=None) -> str:
+        """Blocking; returns the next finalized utterance ("" when stopped)."""
+        self.start()
+
+        if self._last_final is not None:
+            gap = time.perf_counter() - self._last_final
+            self.stats["turn_gap_total"] += gap
+            self.stats["turn_gap_max"] = max(self.stats["turn_gap_max"], gap)
+            self.stats["backlog_max"] = max(self.stats["backlog_max"], self.ring.available() // self.blocksize)
+
+        cpu = time.thread_time()
+        while not stop_listening_flag.is_set():
+            now_cpu = time.thread_time()
+            self.mode_stats[self.mode]["cpu"] += now_cpu - cpu
+            cpu = now_cpu
+            self._check_idle()
+
+            data = self.ring.read(self.blocksize, timeout=0.1)
+            if data is None:
+                continue
+
+            text = self.process_block(data, on_partial)
+            if text:
+                self._last_final = time.perf_counter()
+                self.stats["utterances"] += 1
+                return text
+        return ""
+
+    def process_block(self, data, on_partial=None) -> str | None:
+        """
+        Run one captured block (bytes or a ring buffer view) through the
+        VAD and the recognizers. Returns the finalized utterance text, or None.
+        """
+        if self._reset.is_set():
+            self._reset.clear()
+            for rec in (self.rec, self.wake_rec):
+                if rec is not None:
+                    rec.Reset()
+            if self.vad:
+                self.vad.reset()
+            self._segment.clear()
+            self._utterance_audio = 0.0
+            self.stats["resets"] += 1
+
+        # Silence never reaches the recognizer; when a speech segment
+        # closes, the recognizer is asked for its final result.
+        ended = False
+        if self.vad:
+            data, ended = self.vad.process(data)
+            if not data and not ended:
+                return None
+        else:
+            data = bytes(data)
+
+        if not self.awake:
+            if not self._heard_wake_word(data, ended):
+                return None
+            self._set_awake(True)
+            # Replay the speech that held the wake word, so a command
+            # spoken in the same breath is recognized too
+            data = b"".join(self._segment)
+            self._segment.clear()
+
+        text = None
+        if data:
+            self.last_activity = time.monotonic()
+            start = time.thread_time()
+            final = self.rec.AcceptWaveform(data)
+            self.stats["recognizer_time"] += time.thread_time() - start
+            seconds = len(data) / 2 / self.samplerate
+            self.stats["recognizer_audio"] += seconds
+            self._utterance_audio += seconds
+            if final:
+                text = json.loads(self.rec.Result()).get("text", "")
+
+        # End of speech (VAD) or an over-long utterance finalizes it now
+        if text is None and (ended or self._utterance_audio >= self.profile["max_utterance"]):
+            text = json.loads(self.rec.FinalResult()).get("text", "")
+
+        if text is None:
+            if on_partial:
+                on_partial(strip_wake_words(json.loads(self.rec.PartialResult()).get("partial", "")))
+            return None
+
+        self._utterance_audio = 0.0
+        self.last_activity = time.monotonic()
+        return strip_wake_words(text) or None
+
+    def utterances(self, on_partial=None):
+        """Generator of finalized utterances until stop_listening_flag is set."""
+        while not stop_listening_flag.is_set():
+            text = self.next_utterance(on_partial)
+            if text:
+                yield text
+
+    async def listen(self, on_partial=None):
+        """Async iterator of finalized utterances (recognition runs in a thread)."""
+        while not stop_listening_flag.is_set():
+            text = await asyncio.to_thread(self.next_utterance, on_partial)
+            if text:
+                yield text
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        gaps = max(stats["utterances"] - 1, 0)
+        stats["turn_gap_avg"] = stats["turn_gap_total"] / gaps if gaps else 0.0
+
+        stats["ring"] = self.ring.get_stats()
+
+        self._account_mode()
+        stats["modes"] = {}
+        for mode, m in self.mode_stats.items():
+            stats["modes"][mode] = dict(m, cpu_percent=100 * m["cpu"] / m["seconds"] if m["seconds"] else 0.0)
+
+        if self.barge_in:
+            stats["barge_in"] = self.barge_in.get_stats()
+
+        if self.vad:
+            vad = self.vad.get_stats()
+            # CPU saved = recognizer cost per audio second x audio it never saw
+            cost = stats["recognizer_time"] / stats["recognizer_audio"] if stats["recognizer_audio"] else 0.0
+            stats["vad_skipped_ratio"] = vad["skipped_ratio"]
+            stats["vad_cpu_saved"] = max(cost * vad["skipped_seconds"] - vad["vad_time"], 0.0)
+            stats["vad"] = vad
+        return stats
+
+
+def strip_wake_words(text: str) -> str:
+    """Drop a leading wake word ("jarvis open chrome" -> "open chrome")."""
+    if not WAKE_WORD_MODE:
+        return text.strip()
+    words = text.split()
+    while words and words[0] in WAKE_WORDS:
+        words.pop(0)
+    return " ".join(words)
+
+
+_capture: CaptureService | None = None
+
+def get_capture_service() -> CaptureService:
+    """The session-wide capture service (created on first use)."""
+    global _capture
+    if _capture is None:
+        _capture = CaptureService(get_model())
+    return _capture
+
+def stop_capture():
+    if _capture:
+        _capture.stop()
+
+def get_capture_stats() -> dict | None:
+    """Capture stats, or None when capture never started (e.g. no model)."""
+    return _capture.get_stats() if _capture else None
+
+def record_voice(prompt="🎙 I'm listening, sir...", on_partial=None):
+    """
+    Blocking call, returns the next recognized sentence.
+    Only records when AI is not speaking.
+
+    on_partial(text) is called with the partial transcript after every
+    audio chunk that doesn't finish the utterance.
+    """
+    print(prompt)
+    text = get_capture_service().next_utterance(on_partial)
+    if text:
+        print("👤 You:", text)
+    return text
@@ -0,0 +1,73 @@
+"""
+Speech-to-text tuning profiles - capture block size, end-of-utterance
+silence and maximum utterance length.
+
+    STT_PROFILE = "low-latency"
+
+"block_ms"        audio per capture callback; the recognizer sees nothing
+                  until a block is complete
+"end_silence"     seconds of silence that end an utterance (VAD hangover
+                  and, where supported, Kaldi's endpointer)
+"max_utterance"   seconds after which an utterance is finalized anyway
+"start_timeout"   seconds of leading silence Kaldi waits for speech
+"""
+import json
+
+STT_PROFILE = "default"
+
+STT_PROFILES = {
+    # The original 0.5 s blocks
+    "default": {
+        "block_ms": 500,
+        "end_silence": 0.6,
+        "max_utterance": 20.0,
+        "start_timeout": 5.0,
+    },
+    # Short blocks and a short tail: answers start sooner, but a long
+    # pause mid-sentence can split an utterance
+    "low-latency": {
+        "block_ms": 100,
+        "end_silence": 0.3,
+        "max_utterance": 10.0,
+        "start_timeout": 3.0,
+    },
+    # Longer tail so background noise and hesitations don't cut the user off
+    "noisy-room": {
+        "block_ms": 250,
+        "end_silence": 0.9,
+        "max_utterance": 15.0,
+        "start_timeout": 5.0,
+    },
+}
+
+
+def get_profile(name: str | None = None) -> dict:
+    """The named profile (STT_PROFILE by default); unknown names fall back to "default"."""
+    name = name or STT_PROFILE
+    if name not in STT_PROFILES:
+        print(f"⚠️ Unknown STT profile '{name}', using 'default'")
+        name = "default"
+    return dict(STT_PROFILES[name], name=name)
+
+
+def block_size(profile: dict, samplerate: int) -> int:
+    """Capture block size in frames."""
+    return samplerate * profile["block_ms"] // 1000
+
+
+def create_recognizer(model, samplerate: int, profile: dict | None = None, grammar=None):
+    """
+    KaldiRecognizer configured for `profile`. The endpointer delays are only
+    set on Vosk versions that expose them (0.3.50+); older versions keep
+    Kaldi's defaults and rely on the VAD hangover.
+    """
+    import vosk
+
+    if grammar:
+        rec = vosk.KaldiRecognizer(model, samplerate, json.dumps(grammar))
+    else:
+        rec = vosk.KaldiRecognizer(model, samplerate)
+
+    if profile and hasattr(rec, "SetEndpointerDelays"):
+        rec.SetEndpointerDelays(profile["start_timeout"], profile["end_silence"], profile["max_utterance"])
+    return rec
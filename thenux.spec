@@ -3,7 +3,7 @@ from PyInstaller.utils.hooks import collect_all
 
 datas = [('face.png', '.'), ('core/prompt.txt', 'core')]
 binaries = []
-hiddenimports = ['vosk', 'sounddevice', 'soundfile', 'edge_tts', 'serpapi', 'PIL.Image', 'PIL.ImageTk', 'PIL.ImageDraw', 'PIL.ImageFilter', 'requests', 'pyautogui', 'pycaw', 'comtypes']
+hiddenimports = ['vosk', 'sounddevice', 'soundfile', 'edge_tts', 'PIL.Image', 'PIL.ImageTk', 'PIL.ImageDraw', 'PIL.ImageFilter', 'requests', 'pyautogui', 'pycaw', 'comtypes']
 tmp_ret = collect_all('vosk')
 datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
 
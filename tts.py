@@ -1,9 +1,25 @@
-import io
+import json
+import re
+import sys
 import threading
+import concurrent.futures
 import asyncio
+import time
+from pathlib import Path
+import numpy as np
 import sounddevice as sd
-import soundfile as sf
-import edge_tts
+
+import tts_cache
+from audio_buffer import RingBuffer, to_int16
+from metrics import LatencyHistogram
+from tts_backends import BackendRouter, EdgeBackend, EspeakBackend, Mp3StreamDecoder, decode_mp3, av
+
+def get_base_dir():
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).parent
+    return Path(__file__).resolve().parent
+
+BASE_DIR = get_base_dir()
 
 VOICE = "en-US-AndrewMultilingualNeural"  
 
@@ -11,86 +27,675 @@ RATE = "+0%"
 VOLUME = "+0%"   
 PITCH = "+0Hz"   
 
+# Play while edge-tts is still synthesizing (needs PyAV); otherwise the
+# whole MP3 is downloaded and decoded before playback starts
+STREAMING_PLAYBACK = True
+OUTPUT_SAMPLE_RATE = 24000     # edge-tts audio is 24 kHz mono; other rates are resampled
+OUTPUT_BLOCK = 256             # frames per output callback (~11 ms)
+PREROLL_MS = 200               # buffered audio before playback starts
+JITTER_BUFFER_SECONDS = 30     # decoder waits when this much is queued
+
+# Long replies are synthesized sentence by sentence; the next sentences
+# are requested while the current one plays
+SENTENCE_PIPELINING = True
+MAX_SYNTHESIS_IN_FLIGHT = 2    # sentences requested ahead of playback (incl. the current one)
+MIN_SENTENCE_CHARS = 30        # shorter pieces are merged into the next sentence
+SENTENCE_GAP_TARGET = 0.15     # seconds of silence allowed between sentences
+
+# When the microphone comes back after a reply. "drain": once the output
+# device has actually played the last sample and the room echo has died
+# down (a tail learned per output device). "fixed": the old 0.5 s sleep.
+MIC_RELEASE_POLICY = "drain"
+FIXED_RELEASE_DELAY = 0.5
+ECHO_TAIL_DEFAULT = 0.15       # seconds, until a device has been calibrated
+ECHO_TAIL_MAX = 0.5            # never wait longer than this after play-out
+ECHO_TAIL_ADAPT = 0.2          # how fast the per-device tail follows measurements
+ECHO_TAIL_MARGIN = 1.5         # release cap = margin x calibrated tail
+DEVICE_PROFILES = BASE_DIR / "cache" / "audio_devices.json"
+
 stop_speaking_flag = threading.Event()
 
-def edge_speak(text: str, ui=None, blocking=False):
+# RMS of the block being played (int16 units), the barge-in echo reference
+_output_level = 0.0
+
+def get_output_level() -> float:
+    return _output_level
+
+# (event loop, task) of the utterance being spoken, so stop_speaking can cancel it
+_speaking = None
+
+# Speech requests play one at a time from a priority queue (lower first)
+SPEECH_PRIORITIES = {"alert": 0, "clarification": 1, "chat": 2}
+# Seconds a request may wait before it is dropped as stale (None = never)
+SPEECH_MAX_WAIT = {"alert": None, "clarification": 30.0, "chat": 15.0}
+# Queued requests of these priorities are joined into one utterance
+MERGE_PRIORITIES = {"chat"}
+
+def edge_speak(text: str, ui=None, blocking=False, priority: str = "chat"):
+    """
+    Queue `text` for the speech worker. Returns a future that resolves to
+    True once it has been spoken, or False if it was dropped or stopped.
+    """
     if not text or not text.strip():
-        return
+        return None
 
-    finished_event = threading.Event()
+    future = get_speech_worker().submit(text, ui, priority)
+    if blocking:
+        future.result()
+    return future
 
-    def _thread():
-        # Import here to avoid circular import
+
+class AudioPlayer:
+    """
+    Output stream opened once and fed through a jitter buffer. The device
+    callback plays silence until PREROLL_MS is buffered (or the utterance
+    is complete), then drains the buffer; running dry mid-utterance is
+    counted as an underrun.
+    """
+
+    def __init__(self, samplerate: int = OUTPUT_SAMPLE_RATE):
+        self.samplerate = samplerate
+        self.buffer = RingBuffer(JITTER_BUFFER_SECONDS * samplerate, np.int16)
+        self.preroll = samplerate * PREROLL_MS // 1000
+        self.stream = None
+        self._started = False
+        self._ended = True
+        self._done = threading.Event()
+        self._done.set()
+        self._request_time = 0.0
+        self.played_out_at = 0.0       # perf_counter when the last sample leaves the speaker
+        self.level_buffer = np.zeros(OUTPUT_BLOCK, dtype=np.float32)
+
+        self.time_to_first_audio = {
+            mode: LatencyHistogram() for mode in ("cached", "streaming", "buffered")
+        }
+        self.sentence_gap = LatencyHistogram()
+        self._mode = "streaming"
+        self.stats = {"utterances": 0, "underruns": 0, "stream_opens": 0, "gaps_over_target": 0}
+
+    def open(self):
+        """
+        Start the output stream. It stays open at one rate for the whole
+        session; audio at other rates (espeak-ng) is resampled in feed(),
+        so a backend switch never reopens it and drops buffered audio.
+        """
+        if self.stream is not None:
+            return
+        self.stream = sd.OutputStream(samplerate=self.samplerate, channels=1, dtype="int16",
+                                      blocksize=OUTPUT_BLOCK, callback=self._callback)
+        self.stream.start()
+        self.stats["stream_opens"] += 1
+
+    def close(self):
+        if self.stream is not None:
+            try:
+                self.stream.stop()
+                self.stream.close()
+            finally:
+                self.stream = None
+
+    def begin(self, mode: str, request_time: float):
+        """New utterance; `request_time` is when speech was asked for."""
+        self.buffer.clear()
+        self._mode = mode
+        self._request_time = request_time
+        self._started = False
+        self._ended = False
+        self._done.clear()
+        self.stats["utterances"] += 1
+
+    async def feed(self, samples: np.ndarray, samplerate: int | None = None):
+        """
+        Queue mono samples, waiting while the buffer is full. int16 (raw PCM,
+        cache hits) is copied in as it is; float32 is converted on the way.
+        """
+        if samplerate and samplerate != self.samplerate:
+            samples = resample(samples, samplerate, self.samplerate)
+        samples = to_int16(samples)
+        step = self.samplerate // 10
+        for start in range(0, len(samples), step):
+            part = samples[start:start + step]
+            while self.buffer.available() + len(part) > self.buffer.capacity:
+                if stop_speaking_flag.is_set():
+                    return
+                await asyncio.sleep(0.01)
+            self.buffer.write(part)
+
+    def buffered_seconds(self) -> float:
+        return self.buffer.available() / self.samplerate
+
+    def record_gap(self, seconds: float):
+        """Silence between two sentences of one utterance."""
+        self.sentence_gap.record(seconds)
+        if seconds > SENTENCE_GAP_TARGET:
+            self.stats["gaps_over_target"] += 1
+
+    def end(self):
+        """No more audio for this utterance; play out what is buffered."""
+        self._ended = True
+
+    def flush(self):
+        """Stop right away (barge-in / stop_speaking)."""
+        self.buffer.clear()
+        self._ended = True
+
+    async def wait_done(self):
+        while not self._done.is_set():
+            if stop_speaking_flag.is_set():
+                self.flush()
+                break
+            await asyncio.sleep(0.01)
+
+    def _callback(self, outdata, frames, time_info, status):
+        global _output_level
+        out = outdata[:, 0]
+        if self._done.is_set():
+            outdata.fill(0)
+            return
+        if not self._started:
+            available = self.buffer.available()
+            if available < self.preroll and not self._ended:
+                outdata.fill(0)
+                return
+            self._started = True
+            if available:
+                self.time_to_first_audio[self._mode].record(time.perf_counter() - self._request_time)
+
+        filled = 0
+        while filled < frames:
+            chunk = self.buffer.read(frames - filled, timeout=0)
+            if chunk is None:
+                # Less than requested is buffered: take what there is
+                available = self.buffer.available()
+                if not available:
+                    break
+                chunk = self.buffer.read(available, timeout=0)
+            out[filled:filled + len(chunk)] = chunk
+            filled += len(chunk)
+        out[filled:] = 0
+
+        # (squares go into a preallocated buffer: no allocation per block)
+        if frames > len(self.level_buffer):
+            self.level_buffer = np.zeros(frames, dtype=np.float32)
+        squares = self.level_buffer[:frames]
+        np.multiply(out, out, out=squares, dtype=np.float32)
+        _output_level = float(np.sqrt(squares.mean())) if frames else 0.0
+        if filled < frames:
+            if self._ended:
+                self.played_out_at = time.perf_counter() + self._output_delay(time_info) + filled / self.samplerate
+                self._done.set()
+                _output_level = 0.0
+            else:
+                self.stats["underruns"] += 1
+
+    def _output_delay(self, time_info) -> float:
+        """Seconds until this callback's block reaches the speaker."""
         try:
-            from speech_to_text import set_speaking
-            set_speaking(True)  # Tell microphone to stop listening
-        except:
+            delay = time_info.outputBufferDacTime - time_info.currentTime
+            if 0 < delay < 1:
+                return delay
+        except AttributeError:
             pass
-            
-        if ui:
-            ui.start_speaking()
+        # Host APIs that don't report DAC times: the stream's nominal latency
+        latency = getattr(self.stream, "latency", 0.0)
+        return latency if isinstance(latency, float) else 0.0
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        stats["time_to_first_audio"] = {
+            mode: h.summary() for mode, h in self.time_to_first_audio.items() if h.count
+        }
+        stats["sentence_gap"] = self.sentence_gap.summary()
+        return stats
+
+
+def resample(samples: np.ndarray, from_rate: int, to_rate: int) -> np.ndarray:
+    """Linear-interpolation resampling of one chunk, keeping the sample type."""
+    count = int(round(len(samples) * to_rate / from_rate))
+    positions = np.arange(count) * (from_rate / to_rate)
+    resampled = np.interp(positions, np.arange(len(samples)), samples) if len(samples) else np.zeros(0)
+    if samples.dtype == np.int16:
+        return np.rint(resampled).astype(np.int16)
+    return resampled.astype(np.float32)
+
+
+_player: AudioPlayer | None = None
+
+def get_player() -> AudioPlayer:
+    global _player
+    if _player is None:
+        _player = AudioPlayer()
+    return _player
+
+def get_tts_stats() -> dict | None:
+    """Playback stats, or None when nothing was spoken."""
+    return _player.get_stats() if _player else None
+
+
+_router: BackendRouter | None = None
+
+def get_router() -> BackendRouter:
+    """edge-tts plus the local engine (created on first use)."""
+    global _router
+    if _router is None:
+        _router = BackendRouter(EdgeBackend(VOICE, RATE, VOLUME, PITCH), EspeakBackend())
+    return _router
+
+def get_backend_stats() -> dict | None:
+    return _router.get_stats() if _router else None
+
+def synthesize(text: str):
+    """Async iterator of the MP3 chunks edge-tts sends for `text`."""
+    return get_router().cloud.mp3_chunks(text)
+
+
+def cache_key(text: str) -> str | None:
+    return tts_cache.make_key(text, VOICE, RATE, VOLUME, PITCH)
+
+
+async def render(text: str) -> tuple[np.ndarray, int]:
+    """
+    Synthesize and fully decode `text` with edge-tts (cache warm-up). No
+    failover: the result is cached under the edge voice settings.
+    """
+    parts, samplerate = [], None
+    async for pcm, samplerate in get_router().cloud.stream(text, STREAMING_PLAYBACK and av is not None):
+        parts.append(pcm)
+    if not parts:
+        raise RuntimeError("no audio received")
+    return np.concatenate(parts), samplerate
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+
+def split_sentences(text: str) -> list[str]:
+    """Sentences to synthesize separately; short fragments ride along with the next one."""
+    sentences = []
+    for piece in _SENTENCE_END.split(text.strip()):
+        piece = piece.strip()
+        if not piece:
+            continue
+        if sentences and len(sentences[-1]) < MIN_SENTENCE_CHARS:
+            sentences[-1] += " " + piece
+        else:
+            sentences.append(piece)
+    return sentences
+
+
+async def _synthesize_pcm(text: str, queue: asyncio.Queue, streaming: bool, key: str | None = None,
+                          policy: str | None = None):
+    """
+    Put (mono int16 or float32 samples, samplerate) for one sentence on `queue`,
+    then None. With a cache `key`, a complete edge-tts sentence is stored
+    (the local engine's voice is never cached under the edge voice key).
+    """
+    parts, samplerate, backend = [], None, None
+    try:
+        async for pcm, samplerate, backend in get_router().stream(text, streaming, policy):
+            parts.append(pcm)
+            queue.put_nowait((pcm, samplerate))
+
+        if key and parts and backend == "edge":
+            await asyncio.to_thread(tts_cache.store, key, text, np.concatenate(parts), samplerate)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print("EDGE TTS ERROR:", e)
+    finally:
+        queue.put_nowait(None)
 
-        stop_speaking_flag.clear()
 
+async def _speak_async(text: str):
+    global _speaking
+    request_time = time.perf_counter()
+    player = get_player()
+    streaming = STREAMING_PLAYBACK and av is not None
+    sentences = split_sentences(text) if SENTENCE_PIPELINING else [text.strip()]
+
+    _speaking = (asyncio.get_running_loop(), asyncio.current_task())
+    queues, tasks = [], []
+    # One voice per reply: "cloud" or "local", fixed by the first sentence
+    # (a cache hit is the cloud voice)
+    voice = None
+
+    def request_next():
+        nonlocal voice
+        if len(queues) == len(sentences):
+            return
+        sentence = sentences[len(queues)]
+        queue = asyncio.Queue()
+        queues.append(queue)
+        key = cache_key(sentence)
+        cached = tts_cache.lookup(key) if voice != "local" else None
+        if voice is None:
+            voice = "cloud" if cached is not None else get_router().policy_for(text)
+        if cached is not None:
+            queue.put_nowait(cached)
+            queue.put_nowait(None)
+        else:
+            tasks.append(asyncio.create_task(_synthesize_pcm(sentence, queue, streaming, key, voice)))
+        return cached is not None
+
+    try:
+        if stop_speaking_flag.is_set():
+            return
+        first_cached = request_next()
+        for _ in range(MAX_SYNTHESIS_IN_FLIGHT - 1):
+            request_next()
+        player.begin("cached" if first_cached else "streaming" if streaming else "buffered", request_time)
+
+        runs_dry_at = None   # when the previous sentence's audio finishes playing
+        for queue in queues:
+            first = True
+            while (item := await queue.get()) is not None:
+                pcm, samplerate = item
+                player.open()
+                if first and runs_dry_at is not None:
+                    player.record_gap(max(time.perf_counter() - runs_dry_at, 0.0))
+                first = False
+                await player.feed(pcm, samplerate)
+                if stop_speaking_flag.is_set():
+                    return
+            request_next()
+            if not first:
+                runs_dry_at = time.perf_counter() + player.buffered_seconds()
+
+        player.end()
+        if player.stream is not None:
+            await player.wait_done()
+    except asyncio.CancelledError:
+        player.flush()   # stop_speaking()
+    finally:
+        _speaking = None
+        player.end()
+        for task in tasks:
+            task.cancel()
+
+def output_device_name() -> str:
+    try:
+        return sd.query_devices(kind="output")["name"]
+    except Exception:
+        return "default"
+
+
+class EchoTail:
+    """
+    Per output device: how long the microphone keeps hearing a reply after
+    its last sample was played (speaker latency jitter + room reverb).
+    Learned from the mic level after each reply and kept on disk.
+    """
+
+    def __init__(self, path: Path = DEVICE_PROFILES):
+        self.path = path
+        self.device = None
+        self.tail = ECHO_TAIL_DEFAULT
+        self.measurements = 0
+        self._profiles = None
+
+    def _load(self):
+        if self._profiles is None:
+            try:
+                self._profiles = json.loads(self.path.read_text(encoding="utf-8"))
+            except Exception:
+                self._profiles = {}
+        device = output_device_name()
+        if device != self.device:
+            self.device = device
+            profile = self._profiles.get(device, {})
+            self.tail = profile.get("echo_tail", ECHO_TAIL_DEFAULT)
+            self.measurements = profile.get("measurements", 0)
+
+    def current(self) -> float:
+        self._load()
+        return self.tail
+
+    def update(self, measured: float, censored: bool = False):
+        """`censored`: the echo had not died out when we stopped waiting."""
+        self._load()
+        if censored:
+            # The real tail is longer than we allowed: raise it straight away
+            self.tail = min(max(self.tail, measured), ECHO_TAIL_MAX)
+        elif self.measurements:
+            self.tail += ECHO_TAIL_ADAPT * (measured - self.tail)
+        else:
+            self.tail = measured
+        self.measurements += 1
+        self._profiles[self.device] = {"echo_tail": round(self.tail, 4), "measurements": self.measurements}
         try:
-            asyncio.run(_speak_async(text))
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(self._profiles, indent=2), encoding="utf-8")
         except Exception as e:
-            print("EDGE TTS ERROR:", e)
-        finally:
-            if ui:
-                ui.stop_speaking()
-            
-            # Wait a bit before allowing microphone to listen again
-            import time
-            time.sleep(0.5)
-            
-            try:
-                from speech_to_text import set_speaking
-                set_speaking(False)  # Tell microphone it can listen again
-            except:
-                pass
-                
-            finished_event.set()
+            print(f"⚠️ Could not save audio device profile: {e}")
 
-    threading.Thread(target=_thread, daemon=True).start()
 
-    if blocking:
-        finished_event.wait()
+_echo_tail = EchoTail()
 
-async def _speak_async(text: str):
-    communicate = edge_tts.Communicate(
-        text=text.strip(),
-        voice=VOICE,
-        rate=RATE,
-        volume=VOLUME,
-        pitch=PITCH,
-    )
 
-    audio_bytes = io.BytesIO()
+async def wait_for_release(player: AudioPlayer, mic_quiet=None) -> float:
+    """
+    Sleep until it is safe to listen again after a reply; returns the
+    seconds waited after the last sample was played. `mic_quiet()` returns
+    True / False for the latest mic block, or None without live capture.
+    """
+    if MIC_RELEASE_POLICY == "fixed":
+        await asyncio.sleep(FIXED_RELEASE_DELAY)
+        return max(time.perf_counter() - player.played_out_at, 0.0)
+
+    # The device still holds up to its output latency of audio
+    await asyncio.sleep(max(player.played_out_at - time.perf_counter(), 0.0))
+    start = time.perf_counter()
+    tail = _echo_tail.current()
+    limit = min(max(tail * ECHO_TAIL_MARGIN, 0.05), ECHO_TAIL_MAX)
 
-    async for chunk in communicate.stream():
+    quiet = mic_quiet() if mic_quiet else None
+    if quiet is None:
+        await asyncio.sleep(tail)
+        return time.perf_counter() - start
+
+    while not quiet and time.perf_counter() - start < limit:
         if stop_speaking_flag.is_set():
+            break
+        await asyncio.sleep(0.01)
+        quiet = mic_quiet()
+
+    waited = time.perf_counter() - start
+    if not stop_speaking_flag.is_set():
+        _echo_tail.update(waited, censored=not quiet)
+    return waited
+
+
+class SpeechItem:
+    def __init__(self, text: str, ui, priority: str, seq: int):
+        self.text = text
+        self.ui = ui
+        self.priority = priority
+        self.seq = seq
+        self.queued_at = time.perf_counter()
+        self.future = concurrent.futures.Future()
+        self.started = False
+
+    def __lt__(self, other):
+        return (SPEECH_PRIORITIES[self.priority], self.seq) < (SPEECH_PRIORITIES[other.priority], other.seq)
+
+
+class SpeechWorker:
+    """
+    One thread with a persistent event loop that speaks queued requests in
+    priority order (alerts, then clarifications, then chat), so overlapping
+    edge_speak calls take turns on the shared output stream.
+    """
+
+    def __init__(self):
+        self.loop = None
+        self._queue = None
+        self._pending: list[SpeechItem] = []      # queued, not started yet
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._seq = 0
+        self._mic_muted = False
+
+        self.wait_time = {priority: LatencyHistogram() for priority in SPEECH_PRIORITIES}
+        self.release_delay = LatencyHistogram()   # deaf time after the last sample played
+        self.stats = {"queued": 0, "spoken": 0, "merged": 0, "deduplicated": 0,
+                      "dropped_stale": 0, "dropped_stopped": 0, "max_depth": 0}
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        self._ready.wait()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._queue = asyncio.PriorityQueue()
+        self._ready.set()
+        self.loop.run_until_complete(self._serve())
+
+    def submit(self, text: str, ui, priority: str) -> concurrent.futures.Future:
+        if priority not in SPEECH_PRIORITIES:
+            priority = "chat"
+        text = text.strip()
+        with self._lock:
+            for item in self._pending:
+                if item.text == text:
+                    self.stats["deduplicated"] += 1
+                    return item.future
+            for item in reversed(self._pending):
+                if item.priority == priority and priority in MERGE_PRIORITIES and item.ui is ui:
+                    item.text += " " + text
+                    self.stats["merged"] += 1
+                    return item.future
+
+            self._seq += 1
+            item = SpeechItem(text, ui, priority, self._seq)
+            self._pending.append(item)
+            self.stats["queued"] += 1
+            self.stats["max_depth"] = max(self.stats["max_depth"], len(self._pending))
+        self.loop.call_soon_threadsafe(self._queue.put_nowait, item)
+        return item.future
+
+    def _take(self, item: SpeechItem) -> bool:
+        """Mark `item` as started; False if it should not be spoken."""
+        with self._lock:
+            if item not in self._pending:
+                return False
+            self._pending.remove(item)
+            item.started = True
+        waited = time.perf_counter() - item.queued_at
+        self.wait_time[item.priority].record(waited)
+        max_wait = SPEECH_MAX_WAIT.get(item.priority)
+        if max_wait is not None and waited > max_wait:
+            self.stats["dropped_stale"] += 1
+            print(f"🔇 Dropped stale speech ({waited:.0f}s old): {item.text[:40]}")
+            item.future.set_result(False)
+            return False
+        return True
+
+    def drop_queued(self, keep=("alert",)):
+        """Drop everything waiting except the `keep` priorities (stop_speaking)."""
+        with self._lock:
+            dropped = [item for item in self._pending if item.priority not in keep]
+            for item in dropped:
+                self._pending.remove(item)
+                item.future.set_result(False)
+            self.stats["dropped_stopped"] += len(dropped)
+
+    def _has_pending(self) -> bool:
+        # Not self._queue: dropped items stay in it until _serve skips them
+        with self._lock:
+            return bool(self._pending)
+
+    def _set_mic_muted(self, muted: bool):
+        # Import here to avoid circular import
+        try:
+            from speech_to_text import set_speaking
+        except Exception:
             return
+        set_speaking(muted)
+        self._mic_muted = muted
+
+    async def _serve(self):
+        while True:
+            item = await self._queue.get()
+            if not self._take(item):
+                # Dropped or stale: if it was what kept the mic muted, unmute
+                if self._mic_muted and not self._has_pending():
+                    self._set_mic_muted(False)
+                continue
+            try:
+                await self._speak(item)
+            except Exception as e:
+                print("EDGE TTS ERROR:", e)
+            finally:
+                if not item.future.done():
+                    item.future.set_result(not stop_speaking_flag.is_set())
+                self.stats["spoken"] += 1
 
-        if chunk["type"] == "audio":
-            audio_bytes.write(chunk["data"])
+    async def _speak(self, item: SpeechItem):
+        # Import here to avoid circular import
+        try:
+            from speech_to_text import is_mic_quiet
+        except Exception:
+            is_mic_quiet = None
 
-    audio_bytes.seek(0)
+        self._set_mic_muted(True)  # Tell microphone to stop listening
+        if item.ui:
+            item.ui.start_speaking()
+        stop_speaking_flag.clear()
+        started = time.perf_counter()
 
-    data, samplerate = sf.read(audio_bytes, dtype="float32")
+        try:
+            # Own task, so stop_speaking() cancels the utterance, not the worker
+            await asyncio.wait([asyncio.create_task(_speak_async(item.text))])
+        finally:
+            if item.ui:
+                item.ui.stop_speaking()
 
-    channels = data.shape[1] if len(data.shape) > 1 else 1
+            # More speech queued: keep the microphone muted and go straight on
+            if not self._has_pending():
+                # Wait for the speaker and the room to go quiet, unless the
+                # user interrupted (they are already talking)
+                if not stop_speaking_flag.is_set() and get_player().played_out_at > started:
+                    self.release_delay.record(await wait_for_release(get_player(), is_mic_quiet))
+                if not self._has_pending():
+                    self._set_mic_muted(False)  # Tell microphone it can listen again
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["depth"] = len(self._pending)
+        stats["wait_time"] = {p: h.summary() for p, h in self.wait_time.items() if h.count}
+        stats["release_delay"] = self.release_delay.summary()
+        stats["echo_tail"] = {"device": _echo_tail.device, "seconds": _echo_tail.tail,
+                              "measurements": _echo_tail.measurements}
+        return stats
+
+
+_worker: SpeechWorker | None = None
+_worker_lock = threading.Lock()
+
+def get_speech_worker() -> SpeechWorker:
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = SpeechWorker()
+            _worker.start()
+        return _worker
+
+def get_speech_queue_stats() -> dict | None:
+    return _worker.get_stats() if _worker else None
 
-    with sd.OutputStream(
-        samplerate=samplerate,
-        channels=channels,
-        dtype="float32",
-    ) as stream:
-        block_size = 1024
-        for start in range(0, len(data), block_size):
-            if stop_speaking_flag.is_set():
-                break
-            stream.write(data[start:start + block_size])
 
 def stop_speaking():
-    stop_speaking_flag.set()
\ No newline at end of file
+    """Stop playback, cancel any synthesis still in flight and drop queued chat."""
+    stop_speaking_flag.set()
+    if _worker:
+        _worker.drop_queued()
+    if _player:
+        _player.flush()
+    current = _speaking
+    if current:
+        loop, task = current
+        try:
+            loop.call_soon_threadsafe(task.cancel)
+        except RuntimeError:
+            pass   # the utterance just finished and its loop is closed
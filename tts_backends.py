@@ -0,0 +1,375 @@
+"""
+TTS backends - edge-tts in the cloud and espeak-ng on the local CPU -
+behind one interface, with a router that picks a backend per reply and
+fails over when the first audio is too slow to arrive.
+
+    TTS_BACKEND_POLICY = "auto"    # short replies local, long answers cloud
+    TTS_BACKEND_POLICY = "cloud"   # edge-tts first, espeak-ng on failure
+    TTS_BACKEND_POLICY = "local"   # espeak-ng first, edge-tts on failure
+
+Every backend yields (mono samples, samplerate) chunks: int16 views of the
+received bytes where the engine sends raw PCM, float32 in [-1, 1] where
+MP3 has to be decoded. Health and time-to-first-audio are tracked per
+backend (the same circuit breaker as model_pool) and feed the routing: a
+cloud backend whose recent latency is poor is passed over for the local one.
+"""
+import abc
+import asyncio
+import inspect
+import io
+import shutil
+import threading
+import time
+
+import numpy as np
+import soundfile as sf
+import edge_tts
+
+from metrics import LatencyHistogram
+
+try:
+    import av   # optional, decodes the MP3 stream as it arrives
+except ImportError:
+    av = None
+
+TTS_BACKEND_POLICY = "auto"
+LOCAL_MAX_CHARS = 60            # "auto": replies up to this long go to the local engine
+CLOUD_SLOW_P90 = 1.5            # "auto": cloud p90 first-audio above this -> prefer local
+
+# Failover: give up on a backend when its first audio takes longer than
+# FIRST_AUDIO_TIMEOUT (adapted to its own p90 once it has history)
+FIRST_AUDIO_TIMEOUT = 2.5
+FIRST_AUDIO_MIN_TIMEOUT = 1.0
+FIRST_AUDIO_MAX_TIMEOUT = 5.0
+TIMEOUT_P90_FACTOR = 2.0
+MIN_SAMPLES = 5
+
+# Circuit breaker
+FAILURE_THRESHOLD = 3
+COOLDOWN = 60.0
+
+# edge-tts output. Raw PCM needs no decoding and is played straight from
+# the received bytes; it is only requested when the installed edge-tts lets
+# the caller choose the format (current releases always ask for MP3).
+EDGE_RAW_PCM = True
+EDGE_PCM_FORMAT = "raw-24khz-16bit-mono-pcm"
+EDGE_PCM_SAMPLE_RATE = 24000
+
+# Local engine
+ESPEAK_VOICE = "en-us"
+ESPEAK_SPEED = 175              # words per minute
+ESPEAK_CHUNK_BYTES = 8192
+
+
+class Mp3StreamDecoder:
+    """Incremental MP3 -> mono float32 decoding with PyAV."""
+
+    def __init__(self):
+        self.codec = av.CodecContext.create("mp3", "r")
+        self.samplerate = None
+
+    def _frames(self, packets) -> np.ndarray:
+        out = []
+        for packet in packets:
+            try:
+                frames = self.codec.decode(packet)
+            except av.InvalidDataError:
+                continue   # ID3 tag or a damaged frame; the parser resyncs
+            for frame in frames:
+                self.samplerate = frame.sample_rate
+                pcm = frame.to_ndarray()
+                if pcm.dtype != np.float32:
+                    pcm = pcm.astype(np.float32) / 32768
+                if frame.format.is_planar:
+                    pcm = pcm.mean(axis=0)
+                else:
+                    pcm = pcm.reshape(-1, len(frame.layout.channels)).mean(axis=1)
+                out.append(pcm.astype(np.float32, copy=False))
+        return np.concatenate(out) if out else np.zeros(0, np.float32)
+
+    def decode(self, chunk: bytes) -> np.ndarray:
+        return self._frames(self.codec.parse(chunk))
+
+    def flush(self) -> np.ndarray:
+        return self._frames(self.codec.parse(None) + [None])
+
+
+class Int16Chunker:
+    """Byte chunks -> int16 views of them; an odd trailing byte waits for the next chunk."""
+
+    def __init__(self):
+        self._carry = b""
+
+    def feed(self, chunk: bytes) -> np.ndarray:
+        if self._carry:
+            chunk = self._carry + chunk
+        usable = len(chunk) // 2 * 2
+        self._carry = chunk[usable:]
+        return np.frombuffer(chunk, dtype=np.int16, count=usable // 2)
+
+
+def decode_mp3(data: bytes) -> tuple[np.ndarray, int]:
+    """Whole-file decode to mono float32."""
+    pcm, samplerate = sf.read(io.BytesIO(data), dtype="float32")
+    if pcm.ndim > 1:
+        pcm = pcm.mean(axis=1)
+    return pcm, samplerate
+
+
+class TTSBackend(abc.ABC):
+    name = "base"
+
+    def __init__(self):
+        self.latency = LatencyHistogram()    # request -> first audio chunk
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def installed(self) -> bool:
+        return True
+
+    def is_available(self, now: float) -> bool:
+        return self.installed() and now >= self.open_until
+
+    def first_audio_timeout(self) -> float:
+        if self.latency.count < MIN_SAMPLES:
+            return FIRST_AUDIO_TIMEOUT
+        p = self.latency.percentile(90) or FIRST_AUDIO_TIMEOUT
+        return min(max(p * TIMEOUT_P90_FACTOR, FIRST_AUDIO_MIN_TIMEOUT), FIRST_AUDIO_MAX_TIMEOUT)
+
+    @abc.abstractmethod
+    def stream(self, text: str, streaming: bool = True):
+        """Async iterator of (mono int16 or float32 samples, samplerate)."""
+
+    def get_stats(self) -> dict:
+        return {
+            "installed": self.installed(),
+            "successes": self.successes,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "circuit_open": not self.is_available(time.monotonic()) and self.installed(),
+            "first_audio_timeout": self.first_audio_timeout(),
+            "latency": self.latency.summary(),
+        }
+
+
+class EdgeBackend(TTSBackend):
+    """edge-tts (cloud): natural voice, needs the network."""
+
+    name = "edge"
+
+    def __init__(self, voice: str, rate: str, volume: str, pitch: str):
+        super().__init__()
+        self.voice = voice
+        self.rate = rate
+        self.volume = volume
+        self.pitch = pitch
+        self.raw_pcm = None            # decided on first use
+        self.stats = {"pcm": 0, "mp3": 0, "pcm_fallbacks": 0}
+
+    @staticmethod
+    def supports_output_format() -> bool:
+        try:
+            return "output_format" in inspect.signature(edge_tts.Communicate).parameters
+        except (AttributeError, TypeError, ValueError):
+            return False
+
+    async def audio_chunks(self, text: str, output_format: str | None = None):
+        """Async iterator of the audio chunks edge-tts sends for `text`."""
+        options = {"output_format": output_format} if output_format else {}
+        communicate = edge_tts.Communicate(
+            text=text.strip(),
+            voice=self.voice,
+            rate=self.rate,
+            volume=self.volume,
+            pitch=self.pitch,
+            **options,
+        )
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                yield chunk["data"]
+
+    def mp3_chunks(self, text: str):
+        """Async iterator of the MP3 chunks edge-tts sends for `text`."""
+        return self.audio_chunks(text)
+
+    async def stream(self, text: str, streaming: bool = True):
+        if self.raw_pcm is None:
+            self.raw_pcm = EDGE_RAW_PCM and self.supports_output_format()
+        if self.raw_pcm:
+            chunker = Int16Chunker()
+            received = False
+            try:
+                async for chunk in self.audio_chunks(text, EDGE_PCM_FORMAT):
+                    pcm = chunker.feed(chunk)
+                    if len(pcm):
+                        received = True
+                        yield pcm, EDGE_PCM_SAMPLE_RATE
+            except Exception as e:
+                if received:
+                    raise
+                # The service (or this edge-tts) won't send PCM: MP3 from now on
+                self.raw_pcm = False
+                self.stats["pcm_fallbacks"] += 1
+                print(f"⚠️ edge-tts raw PCM unavailable ({e}), decoding MP3 instead")
+            else:
+                self.stats["pcm"] += 1
+                return
+
+        self.stats["mp3"] += 1
+        if streaming and av is not None:
+            decoder = Mp3StreamDecoder()
+            async for chunk in self.mp3_chunks(text):
+                pcm = decoder.decode(chunk)
+                if len(pcm):
+                    yield pcm, decoder.samplerate
+            tail = decoder.flush()
+            if len(tail):
+                yield tail, decoder.samplerate
+        else:
+            # Whole MP3 first, then decode
+            data = b"".join([chunk async for chunk in self.mp3_chunks(text)])
+            yield decode_mp3(data)
+
+    def get_stats(self) -> dict:
+        stats = super().get_stats()
+        stats["formats"] = dict(self.stats)
+        return stats
+
+
+class EspeakBackend(TTSBackend):
+    """espeak-ng (local CPU): robotic but instant and offline."""
+
+    name = "local"
+
+    def __init__(self, voice: str = ESPEAK_VOICE, speed: int = ESPEAK_SPEED):
+        super().__init__()
+        self.voice = voice
+        self.speed = speed
+        self.command = shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def installed(self) -> bool:
+        return self.command is not None
+
+    async def stream(self, text: str, streaming: bool = True):
+        proc = await asyncio.create_subprocess_exec(
+            self.command, "--stdout", "-v", self.voice, "-s", str(self.speed),
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            proc.stdin.write(text.strip().encode("utf-8"))
+            proc.stdin.close()
+
+            # WAV header (sizes are unknown when writing to a pipe), then PCM
+            data = b""
+            while b"data" not in data or len(data) < data.index(b"data") + 8:
+                chunk = await proc.stdout.read(ESPEAK_CHUNK_BYTES)
+                if not chunk:
+                    raise RuntimeError(f"{self.command} produced no audio")
+                data += chunk
+            samplerate = int.from_bytes(data[24:28], "little")
+            chunker = Int16Chunker()
+            pcm = chunker.feed(data[data.index(b"data") + 8:])
+            while True:
+                if len(pcm):
+                    yield pcm, samplerate
+                chunk = await proc.stdout.read(ESPEAK_CHUNK_BYTES)
+                if not chunk:
+                    break
+                pcm = chunker.feed(chunk)
+            await proc.wait()
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+
+
+class BackendRouter:
+
+    def __init__(self, cloud: TTSBackend, local: TTSBackend):
+        self.cloud = cloud
+        self.local = local
+        self.backends = {cloud.name: cloud, local.name: local}
+        self.stats = {"failovers": 0, "routed": {cloud.name: 0, local.name: 0}}
+        self._lock = threading.Lock()
+
+    def order(self, text: str, policy: str | None = None) -> list[TTSBackend]:
+        """Backends to try for `text`, best first, skipping tripped / missing ones."""
+        policy = policy or TTS_BACKEND_POLICY
+        if policy == "local":
+            order = [self.local, self.cloud]
+        elif policy == "cloud":
+            order = [self.cloud, self.local]
+        else:
+            slow = (self.cloud.latency.count >= MIN_SAMPLES
+                    and (self.cloud.latency.percentile(90) or 0.0) > CLOUD_SLOW_P90)
+            short = len(text) <= LOCAL_MAX_CHARS
+            order = [self.local, self.cloud] if short or slow else [self.cloud, self.local]
+
+        now = time.monotonic()
+        available = [b for b in order if b.is_available(now)]
+        # Never end up with nothing to try
+        return available or [b for b in order if b.installed()] or order
+
+    def policy_for(self, text: str, policy: str | None = None) -> str:
+        """"cloud" or "local": the voice for a whole reply, so it never switches mid-reply."""
+        return "local" if self.order(text, policy)[0] is self.local else "cloud"
+
+    def _record_success(self, backend: TTSBackend, seconds: float):
+        backend.latency.record(seconds)
+        with self._lock:
+            backend.successes += 1
+            backend.consecutive_failures = 0
+            backend.open_until = 0.0
+            self.stats["routed"][backend.name] += 1
+
+    def _record_failure(self, backend: TTSBackend, timeout: bool = False):
+        with self._lock:
+            backend.failures += 1
+            if timeout:
+                backend.timeouts += 1
+            backend.consecutive_failures += 1
+            if backend.consecutive_failures >= FAILURE_THRESHOLD:
+                backend.open_until = time.monotonic() + COOLDOWN
+                print(f"⚠️ TTS backend {backend.name} skipped for {COOLDOWN:.0f}s after "
+                      f"{backend.consecutive_failures} failures")
+
+    async def stream(self, text: str, streaming: bool = True, policy: str | None = None):
+        """
+        Async iterator of (samples, samplerate, backend name). Falls over to
+        the next backend when one fails or its first audio is too slow;
+        once audio has been yielded the sentence stays on that backend.
+        """
+        candidates = self.order(text, policy)
+        for i, backend in enumerate(candidates):
+            chunks = backend.stream(text, streaming)
+            start = time.perf_counter()
+            try:
+                first = await asyncio.wait_for(chunks.__anext__(), backend.first_audio_timeout())
+            except Exception as e:   # error, timeout or no audio at all (StopAsyncIteration)
+                await chunks.aclose()
+                timeout = isinstance(e, asyncio.TimeoutError)
+                self._record_failure(backend, timeout=timeout)
+                if i + 1 < len(candidates):
+                    with self._lock:
+                        self.stats["failovers"] += 1
+                    reason = "timed out" if timeout else (str(e) or type(e).__name__)
+                    print(f"⚠️ TTS {backend.name} {reason}, using {candidates[i + 1].name}")
+                continue
+
+            self._record_success(backend, time.perf_counter() - start)
+            yield first + (backend.name,)
+            async for pcm, samplerate in chunks:
+                yield pcm, samplerate, backend.name
+            return
+
+        raise RuntimeError("no TTS backend produced audio")
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = {"failovers": self.stats["failovers"], "routed": dict(self.stats["routed"])}
+        stats["backends"] = {name: b.get_stats() for name, b in self.backends.items()}
+        return stats
@@ -0,0 +1,307 @@
+"""
+TTS phrase cache - decoded PCM on disk, memory-mapped on use.
+
+Fixed and templated lines ("Noted, sir.", "No active timers, sir.") are
+synthesized once and kept as int16 .npy files under cache/tts, keyed on
+the normalized text and the edge-tts voice settings. A hit skips the
+edge-tts round trip and any decoding; the file is memory-mapped in the
+player's sample format, so playback can start straight away. The least
+recently used files are deleted once the cache grows past
+TTS_CACHE_MAX_BYTES.
+
+Pre-synthesize the common phrases:
+    python tts_cache.py warm
+    python tts_cache.py warm --file my_phrases.txt
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from audio_buffer import to_int16
+
+
+def get_base_dir():
+    if getattr(sys, "frozen", False):
+        return Path(sys.executable).parent
+    return Path(__file__).resolve().parent
+
+
+BASE_DIR = get_base_dir()
+CACHE_DIR = BASE_DIR / "cache" / "tts"
+CACHE_DB = CACHE_DIR / "index.sqlite3"
+
+TTS_CACHE_ENABLED = True
+TTS_CACHE_MAX_BYTES = 200 * 2**20    # total size of the PCM files
+TTS_CACHE_MAX_CHARS = 200            # longer sentences are never cached
+MEMORY_MAX_ENTRIES = 64              # memory-mapped arrays kept open
+
+# Pre-synthesized by `python tts_cache.py warm`
+TTS_WARM_PHRASES = [
+    "Noted, sir.",
+    "No active timers, sir.",
+    "You have no notes, sir.",
+    "Volume increased, sir.",
+    "Volume decreased, sir.",
+    "Muted, sir.",
+    "Unmuted, sir.",
+    "Locking the screen, sir.",
+    "Sir, what would you like me to do?",
+    "Sir, who should I send the message to?",
+    "Sir, what should I say?",
+    "Sir, which platform should I use? (WhatsApp, Telegram, etc.)",
+    "Sir, what would you like me to note?",
+    "Sir, how long should I set the timer for?",
+    "Sir, which note should I delete?",
+    "Sir, what should I name the file?",
+    "Sir, what should I name the folder?",
+    "Sir, which file should I delete?",
+]
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def make_key(text: str, voice: str, rate: str, volume: str, pitch: str) -> str | None:
+    """Cache key for a sentence, or None when it should not be cached."""
+    if not TTS_CACHE_ENABLED:
+        return None
+    text = normalize_text(text)
+    if not text or len(text) > TTS_CACHE_MAX_CHARS:
+        return None
+    data = json.dumps([text, voice, rate, volume, pitch], ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+
+    def __init__(self, directory: Path = CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES,
+                 memory_max: int = MEMORY_MAX_ENTRIES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.memory_max = memory_max
+
+        self._open: OrderedDict[str, tuple[np.ndarray, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "stores": 0,
+            "evictions": 0,
+            "lookup_time": 0.0,
+        }
+
+    def _conn(self):
+        if self._db is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.directory / CACHE_DB.name), check_same_thread=False)
+            # Access-time updates happen on every hit; WAL keeps them off the fsync path
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS tts_cache ("
+                " key TEXT PRIMARY KEY,"
+                " text TEXT NOT NULL,"
+                " samplerate INTEGER NOT NULL,"
+                " bytes INTEGER NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS tts_cache_accessed ON tts_cache(accessed)")
+            self._db.commit()
+        return self._db
+
+    def _file(self, key: str) -> Path:
+        return self.directory / f"{key}.npy"
+
+    def get(self, key: str) -> tuple[np.ndarray, int] | None:
+        """(read-only int16 samples, samplerate) or None."""
+        start = time.perf_counter()
+        with self._lock:
+            try:
+                entry = self._open.get(key)
+                if entry is None:
+                    row = self._conn().execute(
+                        "SELECT samplerate FROM tts_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None:
+                        try:
+                            entry = (np.load(self._file(key), mmap_mode="r"), row[0])
+                        except (OSError, ValueError):
+                            # File gone or damaged: forget the entry
+                            self._conn().execute("DELETE FROM tts_cache WHERE key = ?", (key,))
+                            self._conn().commit()
+                if entry is None:
+                    self.stats["misses"] += 1
+                    return None
+
+                self._remember(key, entry)
+                self._conn().execute("UPDATE tts_cache SET accessed = ? WHERE key = ?", (time.time(), key))
+                self._conn().commit()
+                self.stats["hits"] += 1
+                return entry
+            except Exception as e:
+                print(f"⚠️ TTS cache read failed: {e}")
+                self.stats["misses"] += 1
+                return None
+            finally:
+                self.stats["lookup_time"] += time.perf_counter() - start
+
+    def put(self, key: str, text: str, pcm: np.ndarray, samplerate: int):
+        pcm = np.ascontiguousarray(to_int16(pcm))
+        with self._lock:
+            try:
+                self._conn()
+                path = self._file(key)
+                tmp = path.with_suffix(".tmp")
+                with open(tmp, "wb") as f:
+                    np.save(f, pcm)
+                os.replace(tmp, path)
+                self._conn().execute(
+                    "INSERT OR REPLACE INTO tts_cache (key, text, samplerate, bytes, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, normalize_text(text), samplerate, path.stat().st_size, time.time())
+                )
+                self._evict()
+                self._conn().commit()
+                self.stats["stores"] += 1
+            except Exception as e:
+                print(f"⚠️ TTS cache write failed: {e}")
+
+    def _evict(self):
+        db = self._conn()
+        total = db.execute("SELECT COALESCE(SUM(bytes), 0) FROM tts_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in db.execute("SELECT key, bytes FROM tts_cache ORDER BY accessed").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._delete(key)
+            total -= size
+            self.stats["evictions"] += 1
+
+    def _delete(self, key: str):
+        self._open.pop(key, None)
+        self._conn().execute("DELETE FROM tts_cache WHERE key = ?", (key,))
+        try:
+            self._file(key).unlink()
+        except OSError:
+            pass   # still mapped by a sound being played (Windows); clear() removes it later
+
+    def _remember(self, key: str, entry: tuple[np.ndarray, int]):
+        self._open[key] = entry
+        self._open.move_to_end(key)
+        while len(self._open) > self.memory_max:
+            self._open.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._open.clear()
+            try:
+                self._conn().execute("DELETE FROM tts_cache")
+                self._conn().commit()
+                for path in self.directory.glob("*.npy"):
+                    path.unlink(missing_ok=True)
+            except Exception:
+                pass
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            stats["avg_lookup_ms"] = 1000 * stats["lookup_time"] / lookups if lookups else 0.0
+            try:
+                stats["entries"], stats["bytes"] = self._conn().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM tts_cache"
+                ).fetchone()
+            except Exception:
+                stats["entries"] = stats["bytes"] = 0
+            return stats
+
+
+_cache = TTSCache()
+
+
+def lookup(key: str | None) -> tuple[np.ndarray, int] | None:
+    if key is None:
+        with _cache._lock:
+            _cache.stats["bypassed"] += 1
+        return None
+    return _cache.get(key)
+
+
+def store(key: str | None, text: str, pcm: np.ndarray, samplerate: int):
+    if key is None or not len(pcm):
+        return
+    _cache.put(key, text, pcm, samplerate)
+
+
+def get_tts_cache_stats() -> dict:
+    return _cache.get_stats()
+
+
+def clear_tts_cache():
+    _cache.clear()
+
+
+def warm_up(phrases=None) -> int:
+    """Synthesize every sentence of `phrases` that isn't cached yet; returns how many were added."""
+    import asyncio
+    import tts
+
+    added = 0
+    for phrase in phrases or TTS_WARM_PHRASES:
+        for sentence in tts.split_sentences(phrase):
+            key = tts.cache_key(sentence)
+            if key is None or lookup(key) is not None:
+                continue
+            try:
+                pcm, samplerate = asyncio.run(tts.render(sentence))
+            except Exception as e:
+                print(f"⚠️ Could not synthesize '{sentence}': {e}")
+                continue
+            store(key, sentence, pcm, samplerate)
+            added += 1
+            print(f"✓ {sentence}")
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS phrase cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+    warm = sub.add_parser("warm", help="pre-synthesize phrases")
+    warm.add_argument("--file", help="extra phrases, one per line")
+    sub.add_parser("stats", help="show cache size and hit rate")
+    sub.add_parser("clear", help="delete every cached phrase")
+    args = parser.parse_args()
+
+    if args.command == "warm":
+        phrases = list(TTS_WARM_PHRASES)
+        if args.file:
+            phrases += [line.strip() for line in Path(args.file).read_text(encoding="utf-8").splitlines()
+                        if line.strip()]
+        added = warm_up(phrases)
+        print(f"🔊 {added} phrases added to the TTS cache")
+    elif args.command == "clear":
+        clear_tts_cache()
+        print("🗑 TTS cache cleared")
+
+    stats = get_tts_cache_stats()
+    print(f"💾 TTS cache: {stats['entries']} phrases, {stats['bytes'] / 2**20:.1f} MB "
+          f"(limit {TTS_CACHE_MAX_BYTES / 2**20:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -494,6 +494,13 @@ class ThenuxUI:
         self.text_box.see(tk.END)
         self.text_box.configure(state="disabled")
 
+    def set_mic_status(self, text: str, color: str = "#666666"):
+        """Update the microphone status (safe to call from any thread)"""
+        def update():
+            self.status_label.config(text=text, fg=color)
+            self.status_indicators['mic'].config(text=text, fg=color)
+        self.root.after(0, update)
+
     def start_speaking(self):
         """Called when AI starts speaking"""
         self.speaking = True
@@ -0,0 +1,137 @@
+"""
+Voice activity gate - keeps silent audio away from the Kaldi recognizer.
+
+Each capture block is split into short frames. Frame RMS and zero-crossing
+rate are computed with NumPy over the whole int16 block at once, and
+compared against an adaptive noise floor. Only speech (plus a pre-roll
+before it and a hangover after it) is passed on; word onsets and the
+silence Vosk needs to end an utterance are kept.
+"""
+import time
+from collections import deque
+
+import numpy as np
+
+VAD_ENABLED = True
+
+FRAME_MS = 20
+SPEECH_RATIO = 3.0           # frame RMS must be this many times the noise floor
+MIN_SPEECH_RMS = 150.0       # ... and at least this loud (int16 units)
+MAX_ZCR = 0.35               # above this the frame looks like hiss, not voice
+LOUD_RATIO = 8.0             # ... unless it is this far above the floor (fricatives)
+
+INITIAL_NOISE_FLOOR = 100.0
+NOISE_ADAPT = 0.2            # floor follows quiet blocks at this rate
+NOISE_RISE = 0.005           # and creeps up this slowly during long speech
+
+HANGOVER_MS = 600            # keep passing audio this long after speech
+PRE_ROLL_MS = 300            # audio passed from before the speech onset
+
+
+class VoiceActivityGate:
+
+    def __init__(self, samplerate: int = 16000, frame_ms: int = FRAME_MS,
+                 hangover_ms: int = HANGOVER_MS, pre_roll_ms: int = PRE_ROLL_MS):
+        self.samplerate = samplerate
+        self.frame = samplerate * frame_ms // 1000
+        self.frame_seconds = frame_ms / 1000
+        self.hangover_frames = max(hangover_ms // frame_ms, 1)
+        self.pre_roll = deque(maxlen=max(pre_roll_ms // frame_ms, 0))
+
+        self.noise_floor = INITIAL_NOISE_FLOOR
+        self.active = False          # gate open
+        self.hangover = 0
+        self._tail = np.zeros(0, dtype=np.int16)   # samples short of a full frame
+
+        self.stats = {
+            "frames": 0,
+            "speech_frames": 0,
+            "passed_frames": 0,
+            "skipped_frames": 0,
+            "segments": 0,
+            "vad_time": 0.0,
+        }
+
+    def reset(self):
+        """Close the gate and drop buffered audio (the noise floor is kept)."""
+        self.active = False
+        self.hangover = 0
+        self.pre_roll.clear()
+        self._tail = np.zeros(0, dtype=np.int16)
+
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        """Speech flag per frame for an int16 array of shape (n, frame)."""
+        frames = frames.astype(np.float32)
+
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.frame
+
+        floor = self.noise_floor
+        loud = (rms > floor * SPEECH_RATIO) & (rms > MIN_SPEECH_RMS)
+        speech = loud & ((zcr < MAX_ZCR) | (rms > floor * LOUD_RATIO))
+
+        # Adapt the floor: quickly in quiet blocks, very slowly during speech
+        quiet = float(np.percentile(rms, 20))
+        rate = NOISE_ADAPT if not speech.any() or quiet < floor else NOISE_RISE
+        self.noise_floor = max(floor + rate * (quiet - floor), 1.0)
+
+        return speech
+
+    def process(self, data) -> tuple[bytes, bool]:
+        """
+        Return (audio for the recognizer, ended). `data` is any buffer of
+        int16 samples (bytes, or a view from the capture ring buffer).
+        `ended` is True when a speech segment closed in this block (after
+        its hangover).
+        """
+        start = time.perf_counter()
+
+        samples = np.frombuffer(data, dtype=np.int16)
+        if len(self._tail):
+            samples = np.concatenate([self._tail, samples])
+        usable = len(samples) // self.frame * self.frame
+        # Keep a copy: views from the ring buffer are reused by the writer
+        self._tail = samples[usable:].copy()
+        if not usable:
+            return b"", False
+
+        frames = samples[:usable].reshape(-1, self.frame)
+        speech = self.classify(frames)
+
+        out = []
+        ended = False
+        for frame, is_speech in zip(frames, speech.tolist()):
+            if is_speech:
+                if not self.active:
+                    self.active = True
+                    self.stats["segments"] += 1
+                    out.extend(self.pre_roll)
+                    self.pre_roll.clear()
+                self.hangover = self.hangover_frames
+                out.append(frame)
+            elif self.active:
+                out.append(frame)
+                self.hangover -= 1
+                if self.hangover <= 0:
+                    self.active = False
+                    ended = True
+            elif self.pre_roll.maxlen:
+                self.pre_roll.append(frame.copy())
+
+        s = self.stats
+        s["frames"] += len(speech)
+        s["speech_frames"] += int(np.count_nonzero(speech))
+        s["passed_frames"] += len(out)
+        s["skipped_frames"] = s["frames"] - s["passed_frames"]
+        s["vad_time"] += time.perf_counter() - start
+
+        return b"".join(out), ended
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        frames = stats["frames"]
+        stats["skipped_ratio"] = stats["skipped_frames"] / frames if frames else 0.0
+        stats["skipped_seconds"] = stats["skipped_frames"] * self.frame_seconds
+        stats["noise_floor"] = self.noise_floor
+        return stats